@@ -3,18 +3,52 @@
 # Copyright (C) 2025 Alberto Buffolino
 # Released under GPL 2
 
-import api
+import importlib
 
-from .labelFromObj import getLabelFromObj, getAllStaticHandles
-from .labelFromText import getLabelFromText
-from .labelFromUWPObj import getLabelFromUWPObj
-from .labelFromWeb import getLabelFromWeb
-from .search import SearchConfig, SearchDirections
+from .asyncLabel import stopLabelAsync, submitLabelRequest
+from .capture import captureLabel, disableCapture, enableCapture, startRecording, stopRecording
+from .detection import detectStrategy, getStrategyMemo, invalidateStrategyMemo
+from .explorers import LabelResult
+from .labelMemory import disableLabelMemory, enableLabelMemory, recallResult, rememberResult, saveLabelMemory
+from .prefetch import NOT_PREFETCHED, disablePrefetch, enablePrefetch, getPrefetchedResult, prefetchForeground
+from .resultCache import NOT_CACHED, cacheResult, disableResultCache, enableResultCache, getCachedResult, getResultCacheEntry, invalidateResultCache
+from .search import ResolvedSearchConfig, SearchConfig, SearchDirections
+from .strategies import getOverviewFunction, getStrategyFunction, getStrategyNames, isBuiltinStrategy, registerStrategy
+from .tracing import dumpStats, getStats, resetStats, span
 from .utils import debugLog, measureTime, refreshTextContent
 
 
 __version__ = "2025-05-08"
 
+# public names of strategy modules, imported at first access (see __getattr__),
+# so that strategies never used are never loaded
+lazyNames = {
+	"getLabelFromObj": ".labelFromObj",
+	"getAllStaticHandles": ".labelFromObj",
+	"getAllStaticWindows": ".labelFromObj",
+	"invalidateStaticWindows": ".labelFromObj",
+	"getLabelFromText": ".labelFromText",
+	"invalidateRowIndexes": ".labelFromText",
+	"getLabelFromUWPObj": ".labelFromUWPObj",
+	"getStaticUIACandidates": ".labelFromUWPObj",
+	"invalidateUIACandidates": ".labelFromUWPObj",
+	"getLabelFromWeb": ".labelFromWeb",
+	"installWebCacheHooks": ".labelFromWeb",
+	"invalidateWebCache": ".labelFromWeb",
+	"removeWebCacheHooks": ".labelFromWeb",
+	"updateWebCache": ".labelFromWeb",
+	"webCache": ".labelFromWeb",
+}
+
+def __getattr__(name):
+	moduleName = lazyNames.get(name)
+	if moduleName is None:
+		raise AttributeError("module %r has no attribute %r"%(__name__, name))
+	value = getattr(importlib.import_module(moduleName, __name__), name)
+	# next times, found without __getattr__
+	globals()[name] = value
+	return value
+
 def getLabel(obj=None, config=None, overview=False):
 	"""main method to call, returns label of passed object, if found, None otherwise.
 	@param obj: object to label, default to None;
@@ -31,30 +65,7 @@ def getLabel(obj=None, config=None, overview=False):
 	@return: label if overview=False, (distance, label) tuple if True;
 	@rtype: str or tuple(int, str).
 	"""
-	# recreate config to store obj and simplify comparisons
-	config = SearchConfig(oldConfig=config, obj=obj)
-	debugLog("Start labelling for direction %s"%repr(config.directions))
-	strategy = config.strategy
-	if strategy == "auto":
-		# determine real strategy
-		treeInterceptor = config.obj.treeInterceptor
-		if config.obj.windowClassName == "Windows.UI.Core.CoreWindow":
-			strategy = "uwp"
-		elif treeInterceptor:
-			strategy = "web"
-		else:
-			fg = api.getForegroundObject()
-			strategy = "obj" if getAllStaticHandles(fg.windowHandle) else "text"
-	debugLog("Established strategy: %s"%strategy)
-	if strategy == "obj":
-		res = getLabelFromObj(obj, config)
-	elif strategy == "text":
-		res = getLabelFromText(obj, config)
-	elif strategy == "uwp":
-		res = getLabelFromUWPObj(obj, config)
-	elif strategy == "web":
-		res = getLabelFromWeb(obj, config)
-	debugLog("End labelling for direction %s"%repr(config.directions))
+	res = getLabelResult(obj, config)
 	if not res:
 		return
 	distance, label = res
@@ -62,3 +73,169 @@ def getLabel(obj=None, config=None, overview=False):
 		return res
 	else:
 		return label
+
+def getLabelAsync(obj=None, config=None, callback=None, timeout=2, overview=False):
+	"""like getLabel, but searches the label in background, without blocking NVDA;
+	the label is passed to callback on NVDA main thread, as soon as it's ready.
+	@param obj: object to label, default to None, as for getLabel;
+	@type obj: NVDAObject or None;
+	@param config: config to consider for label search, default to None, as for getLabel;
+	@type config: SearchConfig or None;
+	@param callback: required, called as callback(obj, label), with label (or tuple, see overview) as getLabel returns it;
+		it gets None if label is not found, or not found in time;
+		a later request for the same object supersedes this one, that gets no callback;
+	@type callback: callable;
+	@param timeout: seconds to wait for label, default to 2; None to wait forever;
+	@type timeout: int, float or None;
+	@param overview: as for getLabel, default to False;
+	@type overview: boolean;
+	@return: the request, with a cancel method, to avoid the callback;
+	@rtype: LabelRequest.
+	"""
+	if not callable(callback):
+		raise TypeError("getLabelAsync needs a callback, to get the label")
+	if obj is None:
+		# resolved here, focus could change meanwhile
+		obj = SearchConfig(oldConfig=config).obj
+	return submitLabelRequest(obj, config, callback, timeout, overview)
+
+def getLabelResult(obj, config):
+	# returns (distance, label) tuple, or None,
+	# cached, prefetched, remembered or searched
+	res, source, cacheEntry = findLabelResult(obj, config)
+	storeLabelResult(obj, config, res, source, cacheEntry)
+	return res
+
+def findLabelResult(obj, config):
+	# like getLabelResult, but without storing the result;
+	# returns (result, its source, result cache entry),
+	# where source is "cache", "prefetch", "memory" or "search"
+	# result cache is checked first, being just a lookup (when enabled)
+	cacheEntry = getResultCacheEntry(obj, config)
+	if cacheEntry:
+		res = getCachedResult(cacheEntry)
+		if res is not NOT_CACHED:
+			return (res, "cache", cacheEntry)
+	# label could be already prefetched (with the same config),
+	# or remembered (with default config)
+	if obj is not None:
+		res = getPrefetchedResult(obj, config)
+		if res is not NOT_PREFETCHED:
+			return (res, "prefetch", cacheEntry)
+		if config is None:
+			res = recallResult(obj, NOT_PREFETCHED)
+			if res is not NOT_PREFETCHED:
+				return (res, "memory", cacheEntry)
+	return (searchLabel(obj, config), "search", cacheEntry)
+
+def storeLabelResult(obj, config, res, source, cacheEntry):
+	# remembers and caches result found by findLabelResult;
+	# in main thread, for getLabelAsync too
+	if source == "search" and config is None and obj is not None:
+		rememberResult(obj, res)
+	if cacheEntry and source != "cache":
+		cacheResult(cacheEntry, res)
+
+def searchLabel(obj, config):
+	# returns (distance, label) tuple, or None
+	# recreate config to store obj and simplify comparisons
+	config = SearchConfig(oldConfig=config, obj=obj)
+	debugLog("Start labelling for direction %r", config.directions)
+	strategy = detectStrategy(config)
+	debugLog("Established strategy: %s", strategy)
+	# evaluate config once, for strategy and explorers
+	config = SearchConfig(oldConfig=config, strategy=strategy).resolve()
+	# scene is recorded only when captured, see capture module
+	recorder = startRecording(config)
+	res = None
+	failed = True
+	try:
+		# whole search, stages are traced separately
+		with span("labelling"):
+			# strategy module is imported at first use
+			res = getStrategyFunction(strategy)(obj, config)
+		debugLog("End labelling for direction %r", config.directions)
+		if res:
+			# registered strategies could return plain tuples
+			if not isinstance(res, LabelResult):
+				res = LabelResult(*res)
+			res.strategy = strategy
+		failed = False
+	finally:
+		# recorder is never left active, also when strategy fails
+		if recorder:
+			stopRecording(recorder, res, failed)
+	return res
+
+def getLabelOverview(obj=None, config=None, k=3):
+	"""returns the k nearest labels in each direction, with a single scan of candidates;
+	useful to test different configs, or to offer alternative labels.
+	@param obj: object to label, default to None, as for getLabel;
+	@type obj: NVDAObject or None;
+	@param config: config to consider for label search, default to None;
+		if it has no directions, all directions are explored;
+	@type config: SearchConfig or None;
+	@param k: max labels for each direction, default to 3;
+	@type k: int;
+	@return: a dict with a list of (distance, label) tuples for each explored direction, nearest first;
+		directions are SearchDirections values (e.g. SearchDirections.LEFT[0]);
+	@rtype: dict.
+	"""
+	config = SearchConfig(oldConfig=config, obj=obj)
+	if "directions" not in config.config:
+		config = SearchConfig(oldConfig=config, directions=SearchDirections.ALL)
+	strategy = detectStrategy(config)
+	debugLog("Established strategy: %s", strategy)
+	config = SearchConfig(oldConfig=config, strategy=strategy).resolve()
+	with span("labelling"):
+		return getOverviewFunction(strategy)(obj, config, k)
+
+def getLabels(objs, config=None):
+	"""labels many objects at once, e.g. all unnamed controls of a dialog when it opens;
+	candidate labels are enumerated and retrieved once, and shared by all objects with the same maxParent.
+	@param objs: objects to label;
+	@type objs: iterable of NVDAObject;
+	@param config: config to consider for label search, default to None;
+		as for getLabel, it's completed for each object;
+	@type config: SearchConfig or None;
+	@return: a dict with a (distance, label) tuple for each object, or None where no label was found;
+	@rtype: dict.
+	"""
+	results = {}
+	# (strategy, maxParent window handle) -> (candidate label objs, spatial index)
+	sharedCandidates = {}
+	# text of labelContainers, for text strategy
+	infoCache = {}
+	for obj in objs:
+		objConfig = SearchConfig(oldConfig=config, obj=obj)
+		# detection is memoized, so done once
+		strategy = detectStrategy(objConfig)
+		debugLog("Established strategy: %s", strategy)
+		objConfig = SearchConfig(oldConfig=objConfig, strategy=strategy).resolve()
+		strategyFunction = getStrategyFunction(strategy)
+		if not isBuiltinStrategy(strategy, strategyFunction):
+			# replaced or added with registerStrategy, it gets just obj and config
+			res = strategyFunction(obj, objConfig)
+		elif strategy in ("obj", "uwp"):
+			maxParent = objConfig.maxParent
+			key = (strategy, maxParent.windowHandle)
+			if key not in sharedCandidates:
+				# searched again, cached ones could be changed,
+				# and cached with their index for next getLabel
+				if strategy == "obj":
+					from .labelFromObj import getStaticWindowsEntry
+					entry = getStaticWindowsEntry(maxParent.windowHandle, refresh=True)
+					sharedCandidates[key] = (entry.staticWindows, entry.index)
+				else:
+					from .labelFromUWPObj import getCachedUIACandidates
+					entry = getCachedUIACandidates(objConfig, refresh=True)
+					sharedCandidates[key] = (entry.candidates, entry.index)
+			staticObjs, index = sharedCandidates[key]
+			res = strategyFunction(obj, objConfig, staticObjs, index)
+		elif strategy == "text":
+			res = strategyFunction(obj, objConfig, infoCache)
+		else:
+			# web strategy has its own cache of label objs
+			res = strategyFunction(obj, objConfig)
+		results[obj] = res or None
+	return results
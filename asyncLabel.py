@@ -0,0 +1,223 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# label search in background, for getLabelAsync:
+# searches run in worker threads with COM initialized, using objs created there,
+# and results are delivered (and stored) on NVDA main thread
+import api
+import core
+import queueHandler
+import threading
+
+from logHandler import log
+from NVDAObjects import NVDAObject
+
+from .prefetch import initWorker
+from .search import SearchConfig
+from .tracing import count
+from .utils import debugLog, setThreadForeground
+
+
+# workers of the labeller, set before first getLabelAsync
+maxWorkers = 1
+# workers left running timed out searches, before skipping further requests
+# (each one is a thread, that NVDA waits for on exit)
+maxAbandonedWorkers = 2
+
+# request states
+PENDING = "pending"
+DONE = "done"
+SUPERSEDED = "superseded"
+TIMED_OUT = "timedOut"
+CANCELLED = "cancelled"
+SKIPPED = "skipped"
+
+
+class LabelRequest:
+
+	__slots__ = ("obj", "config", "foreground", "callback", "overview", "state", "future")
+
+	def __init__(self, obj, config, callback, overview):
+		# obj as passed, given back to callback
+		self.obj = obj
+		self.config = config
+		# at request time, created again in worker thread
+		self.foreground = api.getForegroundObject()
+		self.callback = callback
+		self.overview = overview
+		self.state = PENDING
+		self.future = None
+
+	def cancel(self):
+		# no callback for this request, if not already delivered
+		if labeller:
+			labeller.finish(self, CANCELLED)
+
+
+class AsyncLabeller:
+
+	def __init__(self, maxWorkers=1, maxAbandonedWorkers=2):
+		self.maxWorkers = maxWorkers
+		self.maxAbandonedWorkers = maxAbandonedWorkers
+		self.executor = self.createExecutor()
+		self.lock = threading.Lock()
+		# pending requests, few at a time
+		self.pending = []
+		# futures of timed out searches still running in abandoned workers
+		self.abandoned = []
+
+	def createExecutor(self):
+		# imported here, async labelling is optional
+		from concurrent.futures import ThreadPoolExecutor
+		return ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix="labelAutofinderAsync", initializer=initWorker)
+
+	def submit(self, obj, config, callback, timeout, overview):
+		request = LabelRequest(obj, config, callback, overview)
+		with self.lock:
+			# a later request for the same obj supersedes earlier ones
+			previous = [pendingRequest for pendingRequest in self.pending if pendingRequest.obj == obj]
+			self.pending.append(request)
+		for pendingRequest in previous:
+			if self.finish(pendingRequest, SUPERSEDED):
+				count("async.superseded")
+		if self.isAtAbandonedLimit():
+			# no more threads for now, until abandoned searches end
+			self.skip(request)
+			return request
+		with self.lock:
+			request.future = self.executor.submit(self.search, request)
+		if timeout:
+			core.callLater(int(timeout*1000), self.onTimeout, request)
+		return request
+
+	def search(self, request):
+		# in worker thread
+		if request.state != PENDING:
+			return
+		# import here, package imports this module
+		from . import findLabelResult
+		# objs of main thread can't be used here
+		setThreadForeground(getWorkerObj(request.foreground))
+		try:
+			found = findLabelResult(getWorkerObj(request.obj), getWorkerConfig(request.config))
+		except Exception:
+			log.error("Error searching label in background", exc_info=True)
+			found = (None, None, None)
+		finally:
+			setThreadForeground(None)
+		queueHandler.queueFunction(queueHandler.eventQueue, self.deliver, request, found)
+
+	def deliver(self, request, found):
+		# in main thread
+		res, source, cacheEntry = found
+		if source:
+			from . import storeLabelResult
+			# stored also when not delivered, it's still valid
+			storeLabelResult(request.obj, request.config, res, source, cacheEntry)
+		if not self.finish(request, DONE):
+			debugLog("Dropped result of %s request", request.state)
+			count("async.dropped")
+			return
+		count("async.delivered")
+		if res and not request.overview:
+			res = res[1]
+		request.callback(request.obj, res or None)
+
+	def skip(self, request):
+		# callback gets None, later in main thread as for searched requests
+		if self.finish(request, SKIPPED):
+			count("async.skipped")
+			queueHandler.queueFunction(queueHandler.eventQueue, request.callback, request.obj, None)
+
+	def onTimeout(self, request):
+		# in main thread
+		if self.finish(request, TIMED_OUT):
+			count("async.timeouts")
+			if request.future and request.future.running():
+				self.replaceExecutor(request.future)
+			request.callback(request.obj, None)
+
+	def isAtAbandonedLimit(self):
+		with self.lock:
+			self.abandoned = [future for future in self.abandoned if not future.done()]
+			return len(self.abandoned) >= self.maxAbandonedWorkers
+
+	def replaceExecutor(self, runningFuture):
+		# a running search can't be stopped: its worker is left to end alone,
+		# and a new executor takes waiting and later requests
+		count("async.abandonedWorkers")
+		with self.lock:
+			self.abandoned.append(runningFuture)
+			oldExecutor = self.executor
+			self.executor = self.createExecutor()
+			# cancel succeeds only for requests not started yet
+			waiting = [request for request in self.pending if request.future and request.future.cancel()]
+		atLimit = self.isAtAbandonedLimit()
+		for request in waiting:
+			if atLimit:
+				self.skip(request)
+				continue
+			with self.lock:
+				request.future = self.executor.submit(self.search, request)
+		oldExecutor.shutdown(wait=False)
+
+	def finish(self, request, state):
+		# returns whether request was pending, now in state
+		with self.lock:
+			if request.state != PENDING:
+				return False
+			request.state = state
+			self.pending.remove(request)
+		if state != DONE and request.future:
+			# not yet started, so not needed anymore
+			request.future.cancel()
+		return True
+
+	def stop(self):
+		with self.lock:
+			for request in self.pending:
+				request.state = CANCELLED
+			self.pending = []
+		self.executor.shutdown(wait=False)
+
+
+def getWorkerObj(obj):
+	# IAccessible objs are bound to the thread that created them,
+	# so obj is created again from its event params, when known
+	# (UIA objs can be used from any thread)
+	windowHandle = getattr(obj, "event_windowHandle", None)
+	objectID = getattr(obj, "event_objectID", None)
+	childID = getattr(obj, "event_childID", None)
+	if windowHandle is None or objectID is None or childID is None:
+		return obj
+	from NVDAObjects.IAccessible import getNVDAObjectFromEvent
+	return getNVDAObjectFromEvent(windowHandle, objectID, childID) or obj
+
+def getWorkerConfig(config):
+	# config with its objs (labelContainer, maxParent) created again in worker thread
+	if config is None:
+		return None
+	workerObjs = {
+		key: getWorkerObj(value) for key, value in config.config.items()
+		if key != "obj" and isinstance(value, NVDAObject)
+	}
+	return SearchConfig(oldConfig=config, **workerObjs)
+
+
+# labeller, created at first request
+labeller = None
+
+def submitLabelRequest(obj, config, callback, timeout, overview):
+	global labeller
+	if not labeller:
+		labeller = AsyncLabeller(maxWorkers, maxAbandonedWorkers)
+	return labeller.submit(obj, config, callback, timeout, overview)
+
+def stopLabelAsync():
+	# to call when terminating, e.g. in app module terminate
+	global labeller
+	if labeller:
+		labeller.stop()
+		labeller = None
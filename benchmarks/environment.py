@@ -0,0 +1,42 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# prepares a plain CPython (also on Linux) to import the module without NVDA:
+# stub NVDA modules go on sys.path, Windows-only ctypes parts are faked
+import ctypes
+import ctypes.wintypes
+import importlib.util
+import os
+import sys
+
+benchmarksDir = os.path.dirname(os.path.abspath(__file__))
+stubsDir = os.path.join(benchmarksDir, "stubs")
+packageDir = os.path.dirname(benchmarksDir)
+# name expected by add-ons including the module
+packageName = "labelAutofinderCore"
+
+
+def setup():
+	if stubsDir not in sys.path:
+		sys.path.insert(0, stubsDir)
+	import winUser
+	ctypes.windll = winUser.windll
+	if not hasattr(ctypes, "WINFUNCTYPE"):
+		ctypes.WINFUNCTYPE = ctypes.CFUNCTYPE
+
+
+def loadPackage():
+	# imports the module from this checkout, under its usual name
+	if packageName in sys.modules:
+		return sys.modules[packageName]
+	setup()
+	spec = importlib.util.spec_from_file_location(
+		packageName, os.path.join(packageDir, "__init__.py"),
+		submodule_search_locations=[packageDir]
+	)
+	package = importlib.util.module_from_spec(spec)
+	sys.modules[packageName] = package
+	spec.loader.exec_module(package)
+	return package
@@ -0,0 +1,179 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# evaluation of a corpus of captured scenes (see replay.py) across processes:
+# accuracy against expected labels, latency percentiles and throughput,
+# for each strategy and in total, optionally compared with a previous run;
+# usage (from repo root or benchmarks dir):
+# python benchmarks/evaluate.py path/to/scenes [--save run.json]
+# python benchmarks/evaluate.py path/to/scenes --compare before.json [--tolerance 0.25]
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import replay  # noqa: E402
+
+# percentiles reported, besides accuracy and throughput
+percentiles = (50, 95, 99)
+
+
+def evaluateScene(task):
+	# runs in a worker process; returns the result of a scene
+	path, name, repeat = task
+	try:
+		scene = replay.loadScene(path)
+		label = replay.replayScene(scene)
+		ms = replay.timeScene(scene, repeat)*1000
+	except Exception as e:
+		return {"scene": name, "strategy": "error", "correct": False, "ms": None, "label": None, "expected": None, "error": repr(e)}
+	# a scene can have a hand corrected "expected" label, otherwise the captured one is expected
+	expected = scene.get("expected", scene["result"])
+	return {
+		"scene": name,
+		"strategy": scene["config"]["strategy"],
+		"correct": label == expected,
+		"ms": ms,
+		"label": label,
+		"expected": expected,
+	}
+
+
+def iterTasks(paths, repeat):
+	# (path, name, repeat), where name is relative to passed folder,
+	# so that runs on copies of the corpus can be compared
+	for path in paths:
+		if os.path.isdir(path):
+			for folder, dirNames, fileNames in os.walk(path):
+				dirNames.sort()
+				for fileName in sorted(fileNames):
+					if fileName.endswith(".json"):
+						scenePath = os.path.join(folder, fileName)
+						yield (scenePath, os.path.relpath(scenePath, path).replace(os.sep, "/"), repeat)
+		else:
+			yield (path, os.path.basename(path), repeat)
+
+
+def evaluate(paths, processes, repeat):
+	# returns (scene results, wall-clock seconds of the pool evaluating them)
+	tasks = list(iterTasks(paths, repeat))
+	with multiprocessing.Pool(processes) as pool:
+		# worker start up is not measured
+		start = time.perf_counter()
+		results = list(pool.imap_unordered(evaluateScene, tasks, chunksize=max(1, len(tasks)//(processes*8))))
+		seconds = time.perf_counter()-start
+	results.sort(key=lambda result: result["scene"])
+	return results, seconds
+
+
+def percentile(sortedValues, p):
+	# linear interpolation between closest ranks
+	if not sortedValues:
+		return float("nan")
+	position = (len(sortedValues)-1)*p/100
+	lower = int(position)
+	upper = min(lower+1, len(sortedValues)-1)
+	return sortedValues[lower]+(sortedValues[upper]-sortedValues[lower])*(position-lower)
+
+
+def summarize(results):
+	# strategy (and "total") -> summary;
+	# throughput is scenes per second of search, from summed per-call timings
+	# (so without timing calibration, repeats and process overhead)
+	groups = {}
+	for result in results:
+		groups.setdefault(result["strategy"], []).append(result)
+	groups["total"] = results
+	summaries = {}
+	for strategy, group in groups.items():
+		timings = sorted(result["ms"] for result in group if result["ms"] is not None)
+		summary = {
+			"scenes": len(group),
+			"accuracy": sum(result["correct"] for result in group)/len(group) if group else float("nan"),
+		}
+		for p in percentiles:
+			summary["p%d"%p] = percentile(timings, p)
+		searchSeconds = sum(timings)/1000
+		summary["throughput"] = len(timings)/searchSeconds if searchSeconds else float("nan")
+		summaries[strategy] = summary
+	return summaries
+
+
+def report(summaries, seconds):
+	print("%-10s %7s %9s %10s %10s %10s %10s"%(("strategy", "scenes", "accuracy")+tuple("p%d ms"%p for p in percentiles)+("scenes/s",)))
+	for strategy, summary in summaries.items():
+		print("%-10s %7d %8.2f%% %10.4f %10.4f %10.4f %10.1f"%(
+			(strategy, summary["scenes"], summary["accuracy"]*100)
+			+tuple(summary["p%d"%p] for p in percentiles)
+			+(summary["throughput"],)
+		))
+	print("%d scenes evaluated in %.1f s"%(summaries["total"]["scenes"], seconds))
+
+
+def reportComparison(results, summaries, baseline, tolerance):
+	# returns number of regressions: scenes no more correct, and slower strategies
+	print("\nComparison with %s"%baseline["path"])
+	print("%-10s %20s %24s %24s"%("strategy", "accuracy", "p50 ms", "p95 ms"))
+	regressions = 0
+	for strategy, summary in summaries.items():
+		old = baseline["summaries"].get(strategy)
+		if not old:
+			print("%-10s (new)"%strategy)
+			continue
+		slower = summary["p50"] > old["p50"]*(1+tolerance)
+		print("%-10s %8.2f%% -> %7.2f%% %10.4f -> %10.4f %10.4f -> %10.4f%s"%(
+			strategy, old["accuracy"]*100, summary["accuracy"]*100,
+			old["p50"], summary["p50"], old["p95"], summary["p95"],
+			"  SLOWER" if slower else ""
+		))
+		if slower and strategy != "total":
+			regressions += 1
+	oldResults = {result["scene"]: result for result in baseline["results"]}
+	for result in results:
+		old = oldResults.get(result["scene"])
+		if not old or old["correct"] == result["correct"]:
+			continue
+		if result["correct"]:
+			print("FIXED %s: %r"%(result["scene"], result["label"]))
+		else:
+			regressions += 1
+			print("BROKEN %s: %r, expected %r%s"%(result["scene"], result["label"], result["expected"], " (%s)"%result["error"] if "error" in result else ""))
+	return regressions
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Parallel evaluation of captured labelAutofinderCore scenes")
+	parser.add_argument("paths", nargs="+", help="scene files, or folders of scene files (also in subfolders)")
+	parser.add_argument("--processes", type=int, default=os.cpu_count(), help="worker processes (default: one per CPU)")
+	parser.add_argument("--repeat", type=int, default=3, help="timed runs for each scene (median is reported)")
+	parser.add_argument("--save", help="write results to this JSON file")
+	parser.add_argument("--compare", help="JSON file of a previous run, to compare with")
+	parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown against compared run (0.25 = 25%%)")
+	args = parser.parse_args(argv)
+	results, seconds = evaluate(args.paths, max(1, args.processes), args.repeat)
+	if not results:
+		parser.error("no scenes found")
+	summaries = summarize(results)
+	report(summaries, seconds)
+	for result in results:
+		if "error" in result:
+			print("ERROR %s: %s"%(result["scene"], result["error"]))
+	if args.save:
+		with open(args.save, "w", encoding="utf-8") as f:
+			json.dump({"summaries": summaries, "results": results}, f, ensure_ascii=False, indent=1)
+	if args.compare:
+		with open(args.compare, encoding="utf-8") as f:
+			baseline = json.load(f)
+		baseline["path"] = args.compare
+		if reportComparison(results, summaries, baseline, args.tolerance):
+			return 1
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,239 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# generators for synthetic labelling scenes, built on stub NVDA modules:
+# dialogs with N statics, display model panes with M chars,
+# web forms with K static texts, UWP pages with K TextBlocks
+import itertools
+import random
+
+import api
+import displayModel
+import UIAHandler
+import winUser
+
+from comInterfaces.IAccessible2Lib import FakeIAccessibleObject
+from controlTypes import Role
+from locationHelper import RectLTRB
+from NVDAObjects import NVDAObject, comStats
+from NVDAObjects.IAccessible import IAccessible, addPointTarget, clearPointTargets, clearSharedChildren, getNVDAObjectFromEvent
+from NVDAObjects.UIA import UIA
+from textInfos import ControlField, FieldCommand
+from virtualBuffers import VirtualBuffer
+
+# geometry of a form row: label on the left, field on the right
+rowHeight = 24
+labelWidth = 100
+fieldWidth = 160
+charWidth = 8
+# runtime IDs of UWP pages, unique as in UIA
+pageIDs = itertools.count(1)
+
+
+def _reset():
+	winUser.clearWindows()
+	displayModel.chunks.clear()
+	clearPointTargets()
+	clearSharedChildren()
+
+
+def randomRects(count, seed=0, width=1600, height=1200):
+	# label sized rects scattered over a screen,
+	# with an obj rect in the middle
+	rng = random.Random(seed)
+	rects = []
+	for n in range(count):
+		left = rng.randrange(0, width)
+		top = rng.randrange(0, height)
+		rects.append(RectLTRB(left, top, left+rng.randrange(20, 200), top+rng.randrange(12, 30)))
+	objRect = RectLTRB(width//2, height//2, width//2+fieldWidth, height//2+rowHeight)
+	return objRect, rects
+
+
+def randomCharRects(count, seed=0, width=1600):
+	# char rects laid out in lines of text, with an obj rect among them
+	rng = random.Random(seed)
+	perLine = width//charWidth
+	rects = []
+	for n in range(count):
+		line, column = divmod(n, perLine)
+		left = column*charWidth
+		top = line*rowHeight+4
+		rects.append(RectLTRB(left, top, left+charWidth, top+rowHeight-8))
+	lines = count//perLine+1
+	objTop = (lines//2)*rowHeight
+	objLeft = rng.randrange(0, width-fieldWidth)
+	objRect = RectLTRB(objLeft, objTop, objLeft+fieldWidth, objTop+rowHeight)
+	return objRect, rects
+
+
+def makeForeground(width, height, className="#32770"):
+	_reset()
+	handle = winUser.createWindow(0, className, (0, 0, width, height), name="Dialog")
+	fg = IAccessible(event_windowHandle=handle, name="Dialog", location=(0, 0, width, height), role=Role.DIALOG, windowHandle=handle, windowClassName=className)
+	api.setForegroundObject(fg)
+	api.setDesktopObject(NVDAObject(name="Desktop", location=(0, 0, 100000, 100000)))
+	return fg
+
+
+def formGeometry(rows, columns=None):
+	# returns (label rect, field rect) for each form row,
+	# arranged on columns of rows
+	columns = columns or max(1, int(rows**0.5)//4)
+	perColumn = -(-rows//columns)
+	for n in range(rows):
+		column, row = divmod(n, perColumn)
+		left = 10+column*(labelWidth+fieldWidth+40)
+		top = 10+row*(rowHeight+6)
+		yield (
+			(left, top, left+labelWidth, top+rowHeight),
+			(left+labelWidth+4, top, left+labelWidth+4+fieldWidth, top+rowHeight)
+		)
+
+
+def makeDialog(statics):
+	# dialog with a static window on the left of each edit field
+	geometry = list(formGeometry(statics))
+	width = max(r[1][2] for r in geometry)+10
+	height = max(r[1][3] for r in geometry)+10
+	fg = makeForeground(width, height)
+	fields = []
+	for n, (labelRect, fieldRect) in enumerate(geometry):
+		winUser.createWindow(fg.windowHandle, "Static", labelRect, name="Label %d"%n)
+		fieldHandle = winUser.createWindow(fg.windowHandle, "Edit", fieldRect, style=winUser.WS_TABSTOP, controlID=1000+n)
+		fields.append(fieldHandle)
+	objs = [getNVDAObjectFromEvent(handle, winUser.OBJID_CLIENT, 0) for handle in fields]
+	for obj in objs:
+		obj.parent = fg
+	return fg, objs
+
+
+def makeTextPane(chars):
+	# pane with labels drawn as text (no static windows)
+	# and edit windows as children
+	rows = max(1, chars//(labelWidth//charWidth))
+	geometry = list(formGeometry(rows))
+	width = max(r[1][2] for r in geometry)+10
+	height = max(r[1][3] for r in geometry)+10
+	fg = makeForeground(width, height, className="TForm")
+	paneHandle = winUser.createWindow(fg.windowHandle, "TPanel", (0, 0, width, height))
+	pane = IAccessible(event_windowHandle=paneHandle, location=(0, 0, width, height), role=Role.PANE, windowHandle=paneHandle, windowClassName="TPanel", parent=fg)
+	chunks = displayModel.chunks.setdefault(paneHandle, [])
+	objs = []
+	for n, (labelRect, fieldRect) in enumerate(geometry):
+		text = ("Label %d"%n).ljust(labelWidth//charWidth, ".")
+		left, top, right, bottom = labelRect
+		charRects = [(left+i*charWidth, top+4, left+(i+1)*charWidth, bottom-4) for i in range(len(text))]
+		chunks.append((text, charRects))
+		fieldHandle = winUser.createWindow(paneHandle, "TEdit", fieldRect, style=winUser.WS_TABSTOP, controlID=1000+n)
+		obj = getNVDAObjectFromEvent(fieldHandle, winUser.OBJID_CLIENT, 0)
+		obj.parent = pane
+		objs.append(obj)
+	return fg, objs
+
+
+class FakeTreeInterceptor(VirtualBuffer):
+
+	def makeTextInfo(self, position):
+		return FakeVBufTextInfo(self, position)
+
+
+class FakeVBufTextInfo:
+	# virtual buffer text of an obj subtree, with control fields;
+	# static texts are drawn with chars of equal width over their rects
+
+	encoding = "utf_16_le"
+
+	def __init__(self, treeInterceptor, obj):
+		self.obj = obj
+		self._startOffset = 0
+		self.items = []
+		self.charRects = []
+		self._addObj(obj)
+
+	def _addObj(self, obj):
+		self.items.append(FieldCommand("controlStart", ControlField(role=obj.role)))
+		if obj.role == Role.STATICTEXT and obj._name:
+			left, top, right, bottom = obj._location.toLTRB()
+			text = obj._name
+			width = (right-left)/len(text)
+			for i in range(len(text)):
+				self.charRects.append(RectLTRB(int(left+i*width), top, int(left+(i+1)*width), bottom))
+			self.items.append(text)
+		for child in obj.children:
+			self._addObj(child)
+		self.items.append(FieldCommand("controlEnd", None))
+
+	def getTextWithFields(self, formatConfig=None):
+		comStats["calls"] += 1
+		return self.items
+
+	def _getBoundingRectFromOffset(self, offset):
+		# as NVDA text infos
+		comStats["calls"] += 1
+		return self.charRects[offset].toLTWH()
+
+
+class FakeIA2TextInfo:
+
+	def __init__(self, obj, position):
+		self.obj = obj
+
+	def _iterTextWithEmbeddedObjects(self, withFields, formatConfig=None):
+		comStats["calls"] += 1
+		for offset, child in enumerate(self.obj.children):
+			yield "￼"
+			yield offset
+
+	def _getBoundingRectFromOffset(self, offset):
+		# as NVDA text infos
+		comStats["calls"] += 1
+		return self.obj.children[offset]._location.toLTWH()
+
+
+def makeWebForm(statics, columns=None):
+	# web form with a static text on the left of each field
+	geometry = list(formGeometry(statics, columns))
+	width = max(r[1][2] for r in geometry)+10
+	height = max(r[1][3] for r in geometry)+10
+	fg = makeForeground(width, height, className="Chrome_WidgetWin_1")
+	document = IAccessible(name="Page", location=(0, 0, width, height), role=Role.DOCUMENT, parent=fg)
+	treeInterceptor = FakeTreeInterceptor(document)
+	document.treeInterceptor = treeInterceptor
+	document._textInfoFactory = FakeIA2TextInfo
+	form = IAccessible(location=(0, 0, width, height), role=Role.FORM, parent=document, treeInterceptor=treeInterceptor)
+	form._textInfoFactory = FakeIA2TextInfo
+	objs = []
+	for n, (labelRect, fieldRect) in enumerate(geometry):
+		left, top, right, bottom = labelRect
+		label = IAccessible(name="Label %d"%n, location=(left, top, right-left, bottom-top), role=Role.STATICTEXT, parent=form, treeInterceptor=treeInterceptor)
+		addPointTarget(label)
+		left, top, right, bottom = fieldRect
+		field = IAccessible(location=(left, top, right-left, bottom-top), role=Role.EDITABLETEXT, parent=form, treeInterceptor=treeInterceptor)
+		field.IAccessibleObject = FakeIAccessibleObject(len(form.children)-1)
+		objs.append(field)
+	return fg, objs
+
+
+def makeUWPPage(statics):
+	# UWP page with a TextBlock on the left of each field
+	geometry = list(formGeometry(statics))
+	width = max(r[1][2] for r in geometry)+10
+	height = max(r[1][3] for r in geometry)+10
+	fg = makeForeground(width, height, className="ApplicationFrameWindow")
+	coreElement = UIAHandler.FakeUIAElement("Page", (0, 0, width, height), className="Windows.UI.Core.CoreWindow", runtimeID=(41, next(pageIDs)))
+	core = UIA(UIAElement=coreElement, parent=fg)
+	core.windowClassName = "Windows.UI.Core.CoreWindow"
+	objs = []
+	for n, (labelRect, fieldRect) in enumerate(geometry):
+		left, top, right, bottom = labelRect
+		coreElement.descendants.append(UIAHandler.FakeUIAElement("Label %d"%n, (left, top, right-left, bottom-top), runtimeID=(42, 2*n)))
+		left, top, right, bottom = fieldRect
+		fieldElement = UIAHandler.FakeUIAElement("", (left, top, right-left, bottom-top), className="TextBox", runtimeID=(42, 2*n+1))
+		coreElement.descendants.append(fieldElement)
+		field = UIA(UIAElement=fieldElement, parent=core)
+		field.windowClassName = "Windows.UI.Core.CoreWindow"
+		objs.append(field)
+	return fg, objs
@@ -0,0 +1,161 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# offline replay of scenes captured with captureLabel or enableCapture:
+# explorers and strategy logic run on captured data, without NVDA,
+# checking that the label is the captured one and timing the search;
+# usage (from repo root or benchmarks dir):
+# python benchmarks/replay.py scene.json [sceneDir ...] [--repeat 5]
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import environment  # noqa: E402
+
+environment.loadPackage()
+
+from locationHelper import RectLTRB  # noqa: E402
+
+from labelAutofinderCore.capture import sceneConfigKeys, snapshotVersion  # noqa: E402
+from labelAutofinderCore.explorers import LabelCandidate, ObjExplorer  # noqa: E402
+from labelAutofinderCore.labelFromText import getLabelFromTextSource  # noqa: E402
+from labelAutofinderCore.spatial import CharRectArray, RowIndex  # noqa: E402
+
+# min duration of each timed run, in seconds
+minRunTime = 0.05
+
+
+class SceneConfig:
+	# resolved config values of a scene, as read by explorers
+
+	def __init__(self, values):
+		for key in sceneConfigKeys:
+			setattr(self, key, values.get(key))
+		self.directions = tuple(self.directions)
+
+
+class CapturedTextSource:
+	# text source (see labelFromText.InfoTextSource) from a captured scene
+
+	def __init__(self, data):
+		self.text = data["text"]
+		self.charRects = CharRectArray(splitRects(data["rects"]))
+		self.isRegion = data["isRegion"]
+		self.chunks = {int(offset): tuple(chunkOffsets) for offset, chunkOffsets in data["chunks"].items()}
+		self.lines = {
+			int(offset): (CapturedTextSource(lineData) if lineData else self, lineOffset)
+			for offset, (lineData, lineOffset) in data["lines"].items()
+		}
+
+	def getChunkOffsets(self, offset):
+		try:
+			return self.chunks[offset]
+		except KeyError:
+			raise LookupError("Chunk at offset %d was not captured"%offset)
+
+	def getLine(self, offset):
+		try:
+			return self.lines[offset]
+		except KeyError:
+			raise LookupError("Line at offset %d was not captured"%offset)
+
+
+def splitRects(flatRects):
+	# (left, top, right, bottom) tuples from a flat list
+	return list(zip(*[iter(flatRects)]*4))
+
+
+def loadScene(path):
+	with open(path, encoding="utf-8") as f:
+		scene = json.load(f)
+	if scene.get("version") != snapshotVersion:
+		raise ValueError("%s: unsupported scene version %r"%(path, scene.get("version")))
+	return scene
+
+
+def prepareScene(scene):
+	# returns a callable doing the search of scene, as its strategy does
+	objRect = RectLTRB(*scene["obj"])
+	config = SceneConfig(scene["config"])
+	if "text" in scene:
+		source = CapturedTextSource(scene["text"])
+		# built once, as labelFromText reuses it while text does not change
+		index = None if source.isRegion else RowIndex(source.charRects)
+		return lambda: getLabelFromTextSource(objRect, config, source, index)
+	if "candidates" in scene:
+		names = scene["candidates"]["names"]
+		candidates = [
+			# names not read during capture are not needed for the search
+			LabelCandidate(names.get(str(labelIndex)), RectLTRB(*rect))
+			for labelIndex, rect in enumerate(splitRects(scene["candidates"]["rects"]))
+		]
+		return lambda: ObjExplorer(objRect, config).getDistanceAndLabelText(candidates)
+	# nothing to search, e.g. no text or candidates found during capture
+	return lambda: None
+
+
+def replayScene(scene):
+	res = prepareScene(scene)()
+	return list(res[:2]) if res else None
+
+
+def timeScene(scene, repeat):
+	# median seconds per search
+	call = prepareScene(scene)
+	call()
+	number = 1
+	while True:
+		start = time.perf_counter()
+		for n in range(number):
+			call()
+		if time.perf_counter()-start >= minRunTime or number >= 1 << 16:
+			break
+		number *= 2
+	timings = []
+	for r in range(repeat):
+		start = time.perf_counter()
+		for n in range(number):
+			call()
+		timings.append((time.perf_counter()-start)/number)
+	return statistics.median(timings)
+
+
+def iterScenePaths(paths):
+	for path in paths:
+		if os.path.isdir(path):
+			for fileName in sorted(os.listdir(path)):
+				if fileName.endswith(".json"):
+					yield os.path.join(path, fileName)
+		else:
+			yield path
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Replay of captured labelAutofinderCore scenes")
+	parser.add_argument("paths", nargs="+", help="scene files, or folders of scene files")
+	parser.add_argument("--repeat", type=int, default=5, help="timed runs for each scene (median is reported)")
+	args = parser.parse_args(argv)
+	print("%-40s %-6s %9s %11s  %s"%("scene", "kind", "captured", "ms/call", "label"))
+	mismatches = 0
+	for path in iterScenePaths(args.paths):
+		scene = loadScene(path)
+		res = replayScene(scene)
+		isSame = res == scene["result"]
+		if not isSame:
+			mismatches += 1
+		ms = timeScene(scene, args.repeat)*1000
+		print("%-40s %-6s %9.3f %11.4f  %r%s"%(
+			os.path.basename(path), scene["config"]["strategy"], scene.get("seconds", 0)*1000, ms,
+			res, "" if isSame else " MISMATCH, captured %r"%(scene["result"],)
+		))
+	return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
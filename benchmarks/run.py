@@ -0,0 +1,276 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# offline benchmarks of labelling hot paths, on synthetic layouts;
+# usage (from repo root or benchmarks dir):
+# python benchmarks/run.py [--sizes 100,1000] [--save results.json]
+# python benchmarks/run.py --baseline results.json [--tolerance 0.25]
+# python benchmarks/run.py --import-time
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import environment  # noqa: E402
+
+laf = environment.loadPackage()
+
+import api  # noqa: E402
+import layouts  # noqa: E402
+
+from NVDAObjects import comStats  # noqa: E402
+
+from labelAutofinderCore import geometry  # noqa: E402
+from labelAutofinderCore.explorers import CharExplorer, LabelCandidate, ObjExplorer  # noqa: E402
+from labelAutofinderCore.labelFromText import getTextFromTextContainer  # noqa: E402
+from labelAutofinderCore.labelFromWeb import getLabelsFromWebContainer, invalidateWebCache, updateWebCache  # noqa: E402
+from labelAutofinderCore.search import SearchConfig  # noqa: E402
+
+defaultSizes = (100, 1000, 5000)
+# min duration of each timed run, in seconds
+minRunTime = 0.05
+
+
+def focus(objs):
+	# middle obj of layout, as focus
+	obj = objs[len(objs)//2]
+	api.setFocusObject(obj)
+	api.setNavigatorObject(obj)
+	return obj
+
+
+# each case gets a size and returns a callable doing one call
+def objExplorerCase(size):
+	fg = layouts.makeForeground(1600, 1200)
+	objRect, rects = layouts.randomRects(size)
+	candidates = [LabelCandidate("Label %d"%n, rect) for n, rect in enumerate(rects)]
+	config = SearchConfig(obj=fg, strategy="obj").resolve()
+	return lambda: ObjExplorer(objRect, config).getDistanceAndLabelText(candidates)
+
+
+def charExplorerCase(size):
+	fg = layouts.makeForeground(1600, 1200)
+	objRect, charRects = layouts.randomCharRects(size)
+	config = SearchConfig(obj=fg, strategy="text").resolve()
+	return lambda: CharExplorer(objRect, config).getDistanceAndCharOffsets(charRects)
+
+
+def webContainerCase(size):
+	fg, objs = layouts.makeWebForm(size)
+	config = SearchConfig(obj=focus(objs), strategy="web").resolve()
+	def call():
+		# cold cache, to measure extraction
+		invalidateWebCache()
+		return getLabelsFromWebContainer(config)
+	return call
+
+
+def webUpdateCase(size):
+	fg, objs = layouts.makeWebForm(size)
+	config = SearchConfig(obj=focus(objs), strategy="web").resolve()
+	getLabelsFromWebContainer(config)
+	def call():
+		# unchanged page after an update, to measure verification
+		updateWebCache()
+		return getLabelsFromWebContainer(config)
+	return call
+
+
+def webFieldsCase(size):
+	fg, objs = layouts.makeWebForm(size)
+	config = SearchConfig(obj=focus(objs), strategy="web", webExtractor="fields").resolve()
+	def call():
+		# cold cache, to measure extraction
+		invalidateWebCache()
+		return getLabelsFromWebContainer(config)
+	return call
+
+
+def textContainerCase(size):
+	fg, objs = layouts.makeTextPane(size)
+	config = SearchConfig(obj=focus(objs), strategy="text").resolve()
+	return lambda: getTextFromTextContainer(config)
+
+
+def getLabelCase(maker, **configValues):
+	def case(size):
+		fg, objs = maker(size)
+		obj = focus(objs)
+		config = SearchConfig(**configValues) if configValues else None
+		return lambda: laf.getLabel(obj, config)
+	return case
+
+
+cases = {
+	"objExplorer": objExplorerCase,
+	"charExplorer": charExplorerCase,
+	"webContainer": webContainerCase,
+	"webUpdate": webUpdateCase,
+	"webFields": webFieldsCase,
+	"textContainer": textContainerCase,
+	"getLabel.obj": getLabelCase(layouts.makeDialog),
+	"getLabel.text": getLabelCase(layouts.makeTextPane),
+	"getLabel.textRegion": getLabelCase(layouts.makeTextPane, textExtractor="region"),
+	"getLabel.web": getLabelCase(layouts.makeWebForm),
+	"getLabel.webFields": getLabelCase(layouts.makeWebForm, webExtractor="fields"),
+	"getLabel.uwp": getLabelCase(layouts.makeUWPPage),
+}
+
+
+def measure(call, repeat):
+	# returns (seconds per call, COM objs created, property reads and COM calls per call)
+	call()
+	# calls per run, to last at least minRunTime
+	number = 1
+	while True:
+		start = time.perf_counter()
+		for n in range(number):
+			call()
+		if time.perf_counter()-start >= minRunTime or number >= 1 << 16:
+			break
+		number *= 2
+	timings = []
+	created, reads, comCalls = comStats["created"], comStats["propertyReads"], comStats["calls"]
+	for r in range(repeat):
+		start = time.perf_counter()
+		for n in range(number):
+			call()
+		timings.append((time.perf_counter()-start)/number)
+	calls = repeat*number
+	com = (
+		(comStats["created"]-created)/calls,
+		(comStats["propertyReads"]-reads)/calls,
+		(comStats["calls"]-comCalls)/calls,
+	)
+	return statistics.median(timings), com
+
+
+def runCases(names, sizes, repeat):
+	results = {}
+	for name in names:
+		results[name] = {}
+		for size in sizes:
+			seconds, com = measure(cases[name](size), repeat)
+			results[name][str(size)] = {"ms": seconds*1000, "objs": com[0], "reads": com[1], "comCalls": com[2]}
+	return results
+
+
+def scaling(results, name, sizes):
+	# exponent k of time ~ size**k, between consecutive sizes
+	exponents = []
+	for small, big in zip(sizes, sizes[1:]):
+		t1 = results[name][str(small)]["ms"]
+		t2 = results[name][str(big)]["ms"]
+		exponents.append(math.log(t2/t1)/math.log(big/small) if t1 > 0 and t2 > 0 else float("nan"))
+	return exponents
+
+
+def report(results, sizes):
+	print("%-19s %7s %11s %11s %9s %9s %9s"%("case", "size", "ms/call", "calls/s", "objs", "reads", "comCalls"))
+	for name, bySize in results.items():
+		for size in sizes:
+			row = bySize[str(size)]
+			print("%-19s %7d %11.4f %11.1f %9.1f %9.1f %9.1f"%(
+				name, size, row["ms"], 1000/row["ms"] if row["ms"] else 0, row["objs"], row["reads"], row.get("comCalls", 0)
+			))
+		exponents = scaling(results, name, sizes)
+		if exponents:
+			print("%-19s scaling: %s"%("", ", ".join("%.2f"%k for k in exponents)))
+
+
+def compare(results, baseline, tolerance):
+	# returns regressions, as (case, size, baseline ms, current ms)
+	regressions = []
+	for name, bySize in results.items():
+		for size, row in bySize.items():
+			old = baseline.get(name, {}).get(size)
+			if old and row["ms"] > old["ms"]*(1+tolerance):
+				regressions.append((name, size, old["ms"], row["ms"]))
+	return regressions
+
+
+# code timing package import in a new interpreter,
+# with NVDA modules already loaded, as when add-ons are loaded
+importSnippet = """
+import sys, time
+sys.path.insert(0, %(benchmarksDir)r)
+import environment
+environment.setup()
+import api, comtypes, controlTypes, core, displayModel, json, logHandler, queueHandler, textInfos, UIAHandler, winUser
+import NVDAObjects.IAccessible, NVDAObjects.UIA
+start = time.perf_counter()
+package = environment.loadPackage()
+%(afterImport)s
+print(time.perf_counter()-start)
+"""
+
+importCases = {
+	"package": "",
+	"package+obj": "package.getStrategyFunction('obj')",
+	"package+all strategies": "[package.getStrategyFunction(name) for name in ('obj', 'text', 'uwp', 'web')]",
+	"package+all+numpy": "[package.getStrategyFunction(name) for name in ('obj', 'text', 'uwp', 'web')]; package.geometry.loadNumpy()",
+}
+
+
+def measureImportTime(repeat):
+	# returns case -> median ms
+	results = {}
+	benchmarksDir = os.path.dirname(os.path.abspath(__file__))
+	for name, afterImport in importCases.items():
+		code = importSnippet%{"benchmarksDir": benchmarksDir, "afterImport": afterImport}
+		timings = []
+		for r in range(repeat):
+			output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+			timings.append(float(output.split()[-1])*1000)
+		results[name] = statistics.median(timings)
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Benchmarks of labelAutofinderCore hot paths")
+	parser.add_argument("--sizes", default=",".join(map(str, defaultSizes)), help="comma separated layout sizes")
+	parser.add_argument("--cases", default=",".join(cases), help="comma separated cases, among: %s"%", ".join(cases))
+	parser.add_argument("--repeat", type=int, default=5, help="timed runs for each measure (median is reported)")
+	parser.add_argument("--no-numpy", action="store_true", help="use pure Python geometry")
+	parser.add_argument("--save", help="write results to this JSON file")
+	parser.add_argument("--baseline", help="JSON file of previous results, to check regressions")
+	parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against baseline (0.25 = 25%%)")
+	parser.add_argument("--import-time", action="store_true", help="measure import time of the package and its strategies, instead")
+	args = parser.parse_args(argv)
+	if args.import_time:
+		for name, ms in measureImportTime(max(args.repeat, 5)).items():
+			print("%-24s %9.2f ms"%(name, ms))
+		return 0
+	sizes = sorted(int(size) for size in args.sizes.split(","))
+	names = [name for name in args.cases.split(",") if name]
+	unknown = [name for name in names if name not in cases]
+	if unknown:
+		parser.error("unknown cases: %s"%", ".join(unknown))
+	if args.no_numpy:
+		geometry.useNumpy = False
+	print("numpy: %s"%("yes" if geometry.isAvailable(geometry.vectorizeThreshold) else "no"))
+	results = runCases(names, sizes, args.repeat)
+	report(results, sizes)
+	if args.save:
+		with open(args.save, "w") as f:
+			json.dump(results, f, indent=1)
+	if args.baseline:
+		with open(args.baseline) as f:
+			baseline = json.load(f)
+		regressions = compare(results, baseline, args.tolerance)
+		for name, size, old, new in regressions:
+			print("REGRESSION %s size %s: %.4f -> %.4f ms/call"%(name, size, old, new))
+		if regressions:
+			return 1
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,112 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's NVDAObjects.IAccessible module
+import winUser
+
+from controlTypes import Role
+from . import NVDAObject, comStats
+
+
+# event params -> children, shared by objs created again for the same control
+# (e.g. in worker threads), as NVDA would retrieve them from the control
+sharedChildren = {}
+
+
+def clearSharedChildren():
+	sharedChildren.clear()
+
+
+class IAccessible(NVDAObject):
+
+	def __init__(self, event_windowHandle=0, event_objectID=winUser.OBJID_CLIENT, event_childID=0, **kwargs):
+		super().__init__(**kwargs)
+		self.event_windowHandle = event_windowHandle
+		self.event_objectID = event_objectID
+		self.event_childID = event_childID
+		if event_windowHandle:
+			self.children = sharedChildren.setdefault((event_windowHandle, event_objectID, event_childID), self.children)
+
+	@property
+	def parent(self):
+		# like NVDA, objs of windows get the parent window obj
+		if self._parent is None and self.event_windowHandle:
+			window = winUser.windows.get(self.event_windowHandle)
+			if window and window.parent in winUser.windows:
+				self._parent = getNVDAObjectFromEvent(window.parent, winUser.OBJID_CLIENT, 0)
+		return self._parent
+
+	@parent.setter
+	def parent(self, value):
+		self._parent = value
+
+	def _identity(self):
+		# objs without window are compared by identity
+		if not self.event_windowHandle:
+			return id(self)
+		return (self.event_windowHandle, self.event_objectID, self.event_childID)
+
+	def __eq__(self, other):
+		return isinstance(other, IAccessible) and self._identity() == other._identity()
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	def __hash__(self):
+		return hash(self._identity())
+
+
+def getNVDAObjectFromEvent(hwnd, objectID, childID):
+	window = winUser.windows.get(hwnd)
+	if not window:
+		return None
+	role = Role.STATICTEXT if "static" in window.className.lower() else Role.EDITABLETEXT
+	rect = window.rect
+	return IAccessible(
+		event_windowHandle=hwnd, event_objectID=objectID, event_childID=childID,
+		name=window.name, location=(rect.left, rect.top, rect.right-rect.left, rect.bottom-rect.top),
+		role=role, windowHandle=hwnd, windowClassName=window.className,
+		windowControlID=window.controlID,
+	)
+
+
+# objs reachable by screen hit test (web statics and so on),
+# bucketed in cells to keep hit tests cheap
+cellSize = 64
+pointTargets = {}
+
+
+def clearPointTargets():
+	pointTargets.clear()
+
+
+def addPointTarget(obj):
+	left, top, width, height = obj._location
+	for column in range(left//cellSize, (left+width)//cellSize+1):
+		for row in range(top//cellSize, (top+height)//cellSize+1):
+			pointTargets.setdefault((column, row), []).append(obj)
+
+
+def getNVDAObjectFromPoint(x, y):
+	# smallest obj containing point,
+	# or obj of smallest window containing point
+	comStats["calls"] += 1
+	best = None
+	for obj in pointTargets.get((x//cellSize, y//cellSize), ()):
+		left, top, width, height = obj._location
+		if left <= x < left+width and top <= y < top+height:
+			if best is None or width*height < best._location.width*best._location.height:
+				best = obj
+	if best:
+		return best
+	bestWindow = None
+	for window in winUser.windows.values():
+		rect = window.rect
+		if window.visible and rect.left <= x < rect.right and rect.top <= y < rect.bottom:
+			if bestWindow is None or rect.width*rect.height < bestWindow.rect.width*bestWindow.rect.height:
+				bestWindow = window
+	if bestWindow:
+		return getNVDAObjectFromEvent(bestWindow.handle, winUser.OBJID_CLIENT, 0)
+	return None
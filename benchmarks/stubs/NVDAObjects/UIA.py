@@ -0,0 +1,20 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's NVDAObjects.UIA module
+import UIAHandler
+
+from . import NVDAObject
+
+
+class UIA(NVDAObject):
+
+	def __init__(self, UIAElement=None, **kwargs):
+		rect = UIAElement.CurrentBoundingRectangle
+		super().__init__(
+			name=UIAElement.CurrentName, location=rect,
+			windowClassName=UIAElement.CurrentClassName, **kwargs
+		)
+		self.UIAElement = UIAElement
@@ -0,0 +1,65 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's NVDAObjects package
+from locationHelper import RectLTWH
+
+# simulated COM traffic, for benchmarks:
+# objs created, their property reads, and all cross-process calls
+# (property reads, hit tests, IA2 and text calls)
+comStats = {"created": 0, "propertyReads": 0, "calls": 0}
+
+
+class _AppModule:
+
+	def __init__(self, appName):
+		self.appName = appName
+
+
+class NVDAObject:
+
+	def __init__(self, name="", location=None, role=0, windowHandle=0, windowClassName="", parent=None, treeInterceptor=None, windowControlID=0, processID=1, appName="app", states=()):
+		comStats["created"] += 1
+		self._name = name
+		self._location = RectLTWH(*location) if location else None
+		self.role = role
+		self.windowHandle = windowHandle
+		self.windowClassName = windowClassName
+		self.parent = parent
+		self.children = []
+		self.treeInterceptor = treeInterceptor
+		self.windowControlID = windowControlID
+		self.processID = processID
+		self.appModule = _AppModule(appName)
+		self.states = set(states)
+		if parent is not None:
+			parent.children.append(self)
+
+	@property
+	def name(self):
+		comStats["propertyReads"] += 1
+		comStats["calls"] += 1
+		return self._name
+
+	@name.setter
+	def name(self, value):
+		self._name = value
+
+	@property
+	def location(self):
+		comStats["propertyReads"] += 1
+		comStats["calls"] += 1
+		return self._location
+
+	@location.setter
+	def location(self, value):
+		self._location = value
+
+	def objectFromPoint(self, x, y):
+		from .IAccessible import getNVDAObjectFromPoint
+		return getNVDAObjectFromPoint(x, y)
+
+	def makeTextInfo(self, position):
+		return self._textInfoFactory(self, position)
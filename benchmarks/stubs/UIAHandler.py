@@ -0,0 +1,91 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's UIAHandler module
+TreeScope_Element = 1
+TreeScope_Children = 2
+TreeScope_Descendants = 4
+TreeScope_Subtree = 7
+UIA_BoundingRectanglePropertyId = 30001
+UIA_NamePropertyId = 30005
+UIA_ClassNamePropertyId = 30012
+UIA_RuntimeIdPropertyId = 30000
+
+# simulated cross-process calls, for benchmarks
+uiaStats = {"calls": 0}
+
+
+class FakeUIAElement:
+
+	def __init__(self, name, rect, className="TextBlock", runtimeID=(0,)):
+		# rect as (left, top, width, height), like UIA BoundingRectangle
+		self.CurrentName = name
+		self.CurrentBoundingRectangle = tuple(rect)
+		self.CurrentClassName = className
+		self.runtimeID = runtimeID
+		self.descendants = []
+		self._cache = {}
+
+	def GetCachedPropertyValue(self, propertyId):
+		return self._cache[propertyId]
+
+	def GetRuntimeId(self):
+		uiaStats["calls"] += 1
+		return self.runtimeID
+
+	def FindAllBuildCache(self, scope, condition, cacheRequest):
+		uiaStats["calls"] += 1
+		propertyId, value = condition
+		found = [e for e in self.descendants if e.CurrentClassName == value]
+		for element in found:
+			element._cache = {
+				UIA_NamePropertyId: element.CurrentName,
+				UIA_BoundingRectanglePropertyId: element.CurrentBoundingRectangle,
+				UIA_ClassNamePropertyId: element.CurrentClassName,
+			}
+			element._cache = {k: v for k, v in element._cache.items() if k in cacheRequest.properties}
+		return FakeUIAElementArray(found)
+
+
+class FakeUIAElementArray:
+
+	def __init__(self, elements):
+		self._elements = elements
+		self.Length = len(elements)
+
+	def GetElement(self, index):
+		return self._elements[index]
+
+
+class FakeCacheRequest:
+
+	def __init__(self, properties=()):
+		self.properties = set(properties)
+		self.TreeScope = TreeScope_Element
+
+	def AddProperty(self, propertyId):
+		self.properties.add(propertyId)
+
+	def Clone(self):
+		return FakeCacheRequest(self.properties)
+
+
+class FakeClient:
+
+	def CreatePropertyCondition(self, propertyId, value):
+		return (propertyId, value)
+
+	def CreateCacheRequest(self):
+		return FakeCacheRequest()
+
+
+class FakeHandler:
+
+	def __init__(self):
+		self.clientObject = FakeClient()
+		self.baseCacheRequest = FakeCacheRequest((UIA_ClassNamePropertyId,))
+
+
+handler = FakeHandler()
@@ -0,0 +1,46 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's api module
+_focusObject = None
+_navigatorObject = None
+_foregroundObject = None
+_desktopObject = None
+
+
+def getFocusObject():
+	return _focusObject
+
+
+def getNavigatorObject():
+	return _navigatorObject or _focusObject
+
+
+def getForegroundObject():
+	return _foregroundObject
+
+
+def getDesktopObject():
+	return _desktopObject
+
+
+def setFocusObject(obj):
+	global _focusObject
+	_focusObject = obj
+
+
+def setNavigatorObject(obj):
+	global _navigatorObject
+	_navigatorObject = obj
+
+
+def setForegroundObject(obj):
+	global _foregroundObject
+	_foregroundObject = obj
+
+
+def setDesktopObject(obj):
+	global _desktopObject
+	_desktopObject = obj
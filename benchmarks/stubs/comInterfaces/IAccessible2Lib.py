@@ -0,0 +1,26 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for IAccessible2 COM interfaces
+from NVDAObjects import comStats
+
+
+class IAccessibleHyperlink:
+	pass
+
+
+class FakeIAccessibleObject:
+
+	def __init__(self, startIndex):
+		self._startIndex = startIndex
+
+	def QueryInterface(self, interface):
+		comStats["calls"] += 1
+		return self
+
+	@property
+	def startIndex(self):
+		comStats["calls"] += 1
+		return self._startIndex
@@ -0,0 +1,20 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for comtypes
+COINIT_MULTITHREADED = 0x0
+COINIT_APARTMENTTHREADED = 0x2
+
+
+class COMError(Exception):
+	pass
+
+
+def CoInitializeEx(flags=None):
+	pass
+
+
+def CoUninitialize():
+	pass
@@ -0,0 +1,46 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's controlTypes module
+import enum
+
+
+class Role(enum.IntEnum):
+	UNKNOWN = 0
+	WINDOW = 1
+	TITLEBAR = 2
+	PANE = 3
+	DIALOG = 4
+	CHECKBOX = 5
+	RADIOBUTTON = 6
+	STATICTEXT = 7
+	EDITABLETEXT = 8
+	BUTTON = 9
+	MENUBAR = 10
+	MENUITEM = 11
+	POPUPMENU = 12
+	COMBOBOX = 13
+	LIST = 14
+	LISTITEM = 15
+	GRAPHIC = 16
+	LINK = 19
+	SLIDER = 24
+	GROUPING = 27
+	DOCUMENT = 52
+	PARAGRAPH = 71
+	SECTION = 86
+	LABEL = 89
+	FORM = 98
+	HEADING = 40
+	TABLECELL = 29
+	MENU = 100
+	TREEVIEW = 101
+	SPINBUTTON = 50
+
+
+class State(enum.IntEnum):
+	FOCUSABLE = 0x1000000
+	INVISIBLE = 0x4000
+	UNAVAILABLE = 0x1
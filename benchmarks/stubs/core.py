@@ -0,0 +1,17 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's core module
+import threading
+
+import queueHandler
+
+
+def callLater(delay, callable, *args, **kwargs):
+	# after delay milliseconds, callable runs in main thread (see queueHandler.pumpAll)
+	timer = threading.Timer(delay/1000, queueHandler.queueFunction, (queueHandler.eventQueue, callable)+args, kwargs)
+	timer.daemon = True
+	timer.start()
+	return timer
@@ -0,0 +1,60 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's displayModel module,
+# backed by in-memory display chunks per window
+import bisect
+
+import textInfos
+import winUser
+
+from locationHelper import RectLTRB
+
+# window handle -> list of display chunks, as (text, list of char (l, t, r, b) rects)
+chunks = {}
+
+
+class DisplayModelTextInfo:
+
+	includeDescendantWindows = True
+	minHorizontalWhitespace = 8
+	minVerticalWhitespace = 32
+
+	def __init__(self, obj, position, limitRect=None):
+		if isinstance(position, RectLTRB):
+			limitRect = position
+			position = textInfos.POSITION_ALL
+		self.obj = obj
+		self._location = tuple(limitRect) if limitRect is not None else None
+		texts = []
+		rects = []
+		chunkEndOffsets = []
+		windowHandles = [obj.windowHandle]
+		if self.includeDescendantWindows:
+			windowHandles.extend(winUser.iterDescendants(obj.windowHandle))
+		windowChunks = [chunk for windowHandle in windowHandles for chunk in chunks.get(windowHandle, ())]
+		for text, charRects in windowChunks:
+			for char, rect in zip(text, charRects):
+				if self._location and not self._contains(rect):
+					continue
+				texts.append(char)
+				rects.append(RectLTRB(*rect))
+			if not chunkEndOffsets or chunkEndOffsets[-1] != len(rects):
+				chunkEndOffsets.append(len(rects))
+		self.text = "".join(texts)
+		self._storyFieldsAndRects = ([], rects, [], chunkEndOffsets)
+
+	def _contains(self, rect):
+		left, top, right, bottom = self._location
+		x = (rect[0]+rect[2])//2
+		y = (rect[1]+rect[3])//2
+		return left <= x < right and top <= y < bottom
+
+	def _getDisplayChunkOffsets(self, offset):
+		chunkEndOffsets = self._storyFieldsAndRects[3]
+		index = bisect.bisect_right(chunkEndOffsets, offset)
+		start = chunkEndOffsets[index-1] if index else 0
+		end = chunkEndOffsets[index] if index < len(chunkEndOffsets) else len(self.text)
+		return (start, end)
@@ -0,0 +1,63 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's locationHelper module
+from collections import namedtuple
+
+
+class Point(namedtuple("Point", ("x", "y"))):
+	__slots__ = ()
+
+
+class RectLTRB(namedtuple("RectLTRB", ("left", "top", "right", "bottom"))):
+	__slots__ = ()
+
+	@classmethod
+	def fromFloatCollection(cls, *floats):
+		return cls(*[int(f) for f in floats])
+
+	@property
+	def width(self):
+		return self.right-self.left
+
+	@property
+	def height(self):
+		return self.bottom-self.top
+
+	@property
+	def center(self):
+		return Point((self.left+self.right)//2, (self.top+self.bottom)//2)
+
+	def toLTRB(self):
+		return self
+
+	def toLTWH(self):
+		return RectLTWH(self.left, self.top, self.width, self.height)
+
+
+class RectLTWH(namedtuple("RectLTWH", ("left", "top", "width", "height"))):
+	__slots__ = ()
+
+	@classmethod
+	def fromFloatCollection(cls, *floats):
+		return cls(*[int(f) for f in floats])
+
+	@property
+	def right(self):
+		return self.left+self.width
+
+	@property
+	def bottom(self):
+		return self.top+self.height
+
+	@property
+	def center(self):
+		return Point(self.left+self.width//2, self.top+self.height//2)
+
+	def toLTRB(self):
+		return RectLTRB(self.left, self.top, self.right, self.bottom)
+
+	def toLTWH(self):
+		return self
@@ -0,0 +1,9 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's logHandler module
+import logging
+
+log = logging.getLogger("nvda")
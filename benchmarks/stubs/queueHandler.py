@@ -0,0 +1,27 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's queueHandler module:
+# functions are queued from any thread, and run by pumpAll,
+# that plays the role of NVDA main loop
+import queue
+
+eventQueue = queue.Queue()
+
+
+def queueFunction(functionQueue, function, *args, **kwargs):
+	functionQueue.put((function, args, kwargs))
+
+
+def pumpAll(functionQueue=eventQueue):
+	# runs queued functions, returning how many
+	pumped = 0
+	while True:
+		try:
+			function, args, kwargs = functionQueue.get_nowait()
+		except queue.Empty:
+			return pumped
+		function(*args, **kwargs)
+		pumped += 1
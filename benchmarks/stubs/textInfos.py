@@ -0,0 +1,25 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's textInfos module
+POSITION_ALL = "all"
+POSITION_FIRST = "first"
+POSITION_CARET = "caret"
+UNIT_CHARACTER = "character"
+
+
+class FieldCommand:
+
+	def __init__(self, command, field):
+		self.command = command
+		self.field = field
+
+
+class ControlField(dict):
+	pass
+
+
+class FormatField(dict):
+	pass
@@ -0,0 +1,21 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's virtualBuffers module
+
+
+class VirtualBuffer:
+
+	isAlive = True
+	isReady = True
+
+	def __init__(self, rootNVDAObject):
+		self.rootNVDAObject = rootNVDAObject
+
+	def _loadBufferDone(self, success=True):
+		self.isReady = success
+
+	def _handleUpdate(self):
+		pass
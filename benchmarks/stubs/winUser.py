@@ -0,0 +1,109 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# stand-in for NVDA's winUser module,
+# backed by an in-memory window tree
+from locationHelper import RectLTRB
+
+OBJID_CLIENT = -4
+GWL_STYLE = -16
+WS_TABSTOP = 0x00010000
+WS_VISIBLE = 0x10000000
+WS_DISABLED = 0x08000000
+
+
+class FakeWindow:
+
+	def __init__(self, handle, parent, className, rect, name="", visible=True, enabled=True, style=0, controlID=0):
+		self.handle = handle
+		self.parent = parent
+		self.className = className
+		self.rect = RectLTRB(*rect)
+		self.name = name
+		self.visible = visible
+		self.enabled = enabled
+		self.style = style
+		self.controlID = controlID
+		self.children = []
+
+
+# hwnd -> FakeWindow
+windows = {}
+_nextHandle = [0x1000]
+
+
+def clearWindows():
+	windows.clear()
+	pass
+
+
+def createWindow(parent, className, rect, **kwargs):
+	handle = _nextHandle[0]
+	_nextHandle[0] += 1
+	window = FakeWindow(handle, parent, className, rect, **kwargs)
+	windows[handle] = window
+	if parent in windows:
+		windows[parent].children.append(handle)
+	return handle
+
+
+def iterDescendants(parent):
+	for child in windows[parent].children if parent in windows else ():
+		yield child
+		yield from iterDescendants(child)
+
+
+def isWindowVisible(window):
+	# False for destroyed windows, as in Windows
+	return window in windows and windows[window].visible
+
+
+def isWindowEnabled(window):
+	return windows[window].enabled
+
+
+def getClassName(window):
+	return windows[window].className
+
+
+def getWindowStyle(window):
+	return windows[window].style
+
+
+def getWindowRect(window):
+	return windows[window].rect
+
+
+def getControlID(window):
+	return windows[window].controlID
+
+
+def getAncestor(window, flags):
+	while windows[window].parent in windows:
+		window = windows[window].parent
+	return window
+
+
+class _User32:
+
+	def EnumChildWindows(self, parent, callback, data):
+		for child in iterDescendants(parent):
+			if not callback(child, data):
+				break
+		return True
+
+	def SetWindowPos(self, *args):
+		return True
+
+	def GetWindowLongW(self, window, index):
+		return windows[window].style if window in windows else 0
+
+
+class _Windll:
+
+	user32 = _User32()
+
+
+windll = _Windll()
@@ -0,0 +1,111 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import threading
+import time
+
+from collections import OrderedDict
+
+
+# to distinguish a missing entry from a cached None
+_missing = object()
+
+
+# bounded cache, with LRU eviction, optional time to live,
+# and invalidation by token (checked at get) or by group
+class LRUCache:
+
+	def __init__(self, maxSize=64, ttl=None):
+		# max number of entries, before evicting the least recently used
+		self.maxSize = maxSize
+		# seconds after which an entry is considered stale, None for never
+		self.ttl = ttl
+		# key -> (value, expiry time, token, group)
+		self._entries = OrderedDict()
+		self._lock = threading.RLock()
+		self.resetStats()
+
+	def __len__(self):
+		return len(self._entries)
+
+	def __contains__(self, key):
+		return self.get(key, _missing, count=False) is not _missing
+
+	def get(self, key, default=None, token=None, count=True):
+		# token: if provided, must match the one stored with the entry,
+		# otherwise the entry is considered stale and dropped
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				value, expiry, entryToken, group = entry
+				if expiry is not None and time.monotonic() > expiry:
+					del self._entries[key]
+					self.expirations += 1
+				elif token is not None and entryToken != token:
+					del self._entries[key]
+					self.invalidations += 1
+				else:
+					self._entries.move_to_end(key)
+					if count:
+						self.hits += 1
+					return value
+			if count:
+				self.misses += 1
+			return default
+
+	def set(self, key, value, token=None, group=None):
+		# group: useful to invalidate related entries together
+		with self._lock:
+			expiry = time.monotonic()+self.ttl if self.ttl else None
+			self._entries[key] = (value, expiry, token, group)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.maxSize:
+				self._entries.popitem(last=False)
+				self.evictions += 1
+
+	def values(self, group=_missing):
+		# values of all entries, or of entries in group,
+		# without checking them nor affecting order and stats
+		with self._lock:
+			return [entry[0] for entry in self._entries.values() if group is _missing or entry[3] == group]
+
+	def invalidate(self, key):
+		with self._lock:
+			if self._entries.pop(key, None) is not None:
+				self.invalidations += 1
+
+	def invalidateGroup(self, group):
+		with self._lock:
+			keys = [key for key, entry in self._entries.items() if entry[3] == group]
+			for key in keys:
+				del self._entries[key]
+			self.invalidations += len(keys)
+
+	def clear(self):
+		with self._lock:
+			self.invalidations += len(self._entries)
+			self._entries.clear()
+
+	def resetStats(self):
+		self.hits = 0
+		self.misses = 0
+		# entries dropped to respect maxSize
+		self.evictions = 0
+		# entries dropped for ttl
+		self.expirations = 0
+		# entries dropped for token mismatch or explicit invalidation
+		self.invalidations = 0
+
+	def stats(self):
+		return {
+			"size": len(self._entries),
+			"maxSize": self.maxSize,
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"expirations": self.expirations,
+			"invalidations": self.invalidations,
+		}
+
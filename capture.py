@@ -0,0 +1,149 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# capture of labelling scenes: what a strategy consumed for one search
+# (obj rect, resolved config, candidate rects and read names, or text with char rects),
+# saved as a compact JSON snapshot, to replay it offline (see benchmarks/replay.py)
+import json
+import os
+import threading
+import time
+
+from itertools import chain
+from logHandler import log
+
+from .utils import debugLog
+
+
+snapshotVersion = 1
+# resolved config values used by explorers and strategies
+sceneConfigKeys = ("strategy", "directions", "maxHorizontalDistance", "maxVerticalDistance", "webExtractor", "textExtractor")
+
+# recorder of the search running in each thread, if any
+local = threading.local()
+
+# automatic capture of slow searches, when enabled
+captureFolder = None
+captureMinTime = None
+captureMaxScenes = 0
+capturedScenes = 0
+
+
+class SceneRecorder:
+
+	def __init__(self, config):
+		self.scene = {
+			"version": snapshotVersion,
+			"obj": list(config.obj.location.toLTRB()),
+			"config": {key: getattr(config, key) for key in sceneConfigKeys},
+		}
+		self.startTime = time.perf_counter()
+
+	def recordCandidates(self, labelObjRects, names):
+		# names: index -> name of label objs whose name was read
+		self.scene["candidates"] = {
+			"rects": list(chain.from_iterable(labelObjRects)),
+			"names": {str(index): name for index, name in names.items()},
+		}
+
+	def recordText(self, source):
+		self.scene["text"] = getTextScene(source)
+
+	def recordResult(self, res):
+		self.scene["seconds"] = time.perf_counter()-self.startTime
+		self.scene["result"] = list(res[:2]) if res else None
+
+
+def getTextScene(source):
+	# text source (see labelFromText.InfoTextSource) as JSON data,
+	# with chunks and lines used by the search
+	return {
+		"text": source.text,
+		"rects": list(chain.from_iterable(source.charRects)),
+		"isRegion": source.isRegion,
+		"chunks": {str(offset): list(chunkOffsets) for offset, chunkOffsets in source.chunks.items()},
+		# line source is null when the line was not found (so source itself is used)
+		"lines": {
+			str(offset): [getTextScene(lineSource) if lineSource is not source else None, lineOffset]
+			for offset, (lineSource, lineOffset) in source.lines.items()
+		},
+	}
+
+
+def getRecorder():
+	return getattr(local, "recorder", None)
+
+def startRecording(config):
+	# called by getLabel for each search; returns a recorder,
+	# if the search is captured explicitly or automatic capture is enabled
+	capturing = getattr(local, "requested", False) or captureFolder
+	local.recorder = SceneRecorder(config) if capturing else None
+	return local.recorder
+
+def stopRecording(recorder, res, failed=False):
+	local.recorder = None
+	# scene of a failed search is incomplete
+	if failed:
+		return
+	recorder.recordResult(res)
+	if getattr(local, "requested", False):
+		local.scene = recorder.scene
+	elif recorder.scene["seconds"] >= captureMinTime:
+		saveSlowScene(recorder.scene)
+
+def saveScene(scene, path):
+	with open(path, "w", encoding="utf-8") as f:
+		json.dump(scene, f, ensure_ascii=False, separators=(",", ":"))
+
+def saveSlowScene(scene):
+	global capturedScenes
+	# capture could be disabled meanwhile, e.g. from another thread
+	folder = captureFolder
+	if not folder or capturedScenes >= captureMaxScenes:
+		return
+	capturedScenes += 1
+	fileName = "scene-%s-%s-%d.json"%(time.strftime("%Y%m%d-%H%M%S"), scene["config"]["strategy"], capturedScenes)
+	path = os.path.join(folder, fileName)
+	debugLog("Capturing slow scene (%.3f s) to %s", scene["seconds"], path)
+	try:
+		os.makedirs(folder, exist_ok=True)
+		saveScene(scene, path)
+	except OSError:
+		log.error("Unable to save scene to %s"%path, exc_info=True)
+
+def captureLabel(obj=None, config=None, path=None):
+	# searches label as getLabel(obj, config, overview=True) does, capturing the scene;
+	# returns the scene, also saved to path if provided
+	# import here, package imports this module
+	from . import searchLabel
+	local.requested = True
+	local.scene = None
+	try:
+		searchLabel(obj, config)
+	finally:
+		local.requested = False
+		local.recorder = None
+	scene = local.scene
+	local.scene = None
+	if scene and path:
+		saveScene(scene, path)
+	return scene
+
+def getDefaultFolder():
+	import globalVars
+	return os.path.join(globalVars.appArgs.configPath, "labelAutofinderScenes")
+
+def enableCapture(folder=None, minTime=0.1, maxScenes=20):
+	# captures searches slower than minTime seconds, up to maxScenes files,
+	# in folder (default in NVDA user config folder)
+	global captureFolder, captureMinTime, captureMaxScenes, capturedScenes
+	captureFolder = folder or getDefaultFolder()
+	captureMinTime = minTime
+	captureMaxScenes = maxScenes
+	capturedScenes = 0
+
+def disableCapture():
+	global captureFolder
+	captureFolder = None
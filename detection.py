@@ -0,0 +1,66 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import threading
+
+from .tracing import count, span
+from .utils import debugLog, getForegroundObject
+
+
+# strategies detected in auto mode, for current foreground window only:
+# (process ID, foreground window handle, obj window class, treeInterceptor presence) -> (strategy, reason)
+strategyMemo = {}
+# foreground window handle the memo refers to
+memoForeground = None
+# memo is used also by worker threads
+memoLock = threading.RLock()
+
+def detectStrategy(config):
+	# determine real strategy, when auto
+	strategy = config.strategy
+	if strategy != "auto":
+		return strategy
+	obj = config.obj
+	fg = getForegroundObject()
+	key = (obj.processID, fg.windowHandle, obj.windowClassName, bool(obj.treeInterceptor))
+	with memoLock:
+		if fg.windowHandle != memoForeground:
+			invalidateStrategyMemo(fg.windowHandle)
+		strategyAndReason = strategyMemo.get(key)
+	if strategyAndReason:
+		count("detection.memoHits")
+		return strategyAndReason[0]
+	# detected without lock, at worst twice
+	with span("detection"):
+		strategyAndReason = getStrategyAndReason(obj, fg)
+	with memoLock:
+		if fg.windowHandle == memoForeground:
+			strategyMemo[key] = strategyAndReason
+	debugLog("Detected strategy: %s (%s)", *strategyAndReason)
+	return strategyAndReason[0]
+
+def getStrategyAndReason(obj, fg):
+	if obj.windowClassName == "Windows.UI.Core.CoreWindow":
+		return ("uwp", "obj in UWP core window")
+	if obj.treeInterceptor:
+		return ("web", "obj with treeInterceptor")
+	# imported here, to load obj strategy only when needed
+	from .labelFromObj import hasStaticWindows
+	if hasStaticWindows(fg.windowHandle):
+		return ("obj", "static windows in foreground window")
+	return ("text", "no static windows in foreground window")
+
+def invalidateStrategyMemo(foregroundHandle=None):
+	# to call e.g. on foreground change, or when window content changes deeply
+	global memoForeground
+	with memoLock:
+		strategyMemo.clear()
+		memoForeground = foregroundHandle
+
+def getStrategyMemo():
+	# to see which strategy was picked, and why;
+	# returns a copy of the memo for current foreground window
+	with memoLock:
+		return dict(strategyMemo)
@@ -3,10 +3,42 @@
 # Copyright (C) 2025 Alberto Buffolino
 # Released under GPL 2
 
+import heapq
+
+from array import array
+
+from . import geometry
+from .capture import getRecorder
 from .search import SearchDirections
+from .spatial import CharRectArray
+from .tracing import count, span
 from .utils import debugLog
 
 
+# plain label obj, with name and location already known,
+# for candidates not backed by NVDAObjects
+class LabelCandidate:
+
+	__slots__ = ("name", "location")
+
+	def __init__(self, name, location):
+		self.name = name
+		# any rect with toLTRB method (e.g. RectLTRB)
+		self.location = location
+
+
+# (distance, label) tuple returned by explorers and strategies,
+# with label rect, in (left, top, right, bottom) representation,
+# and strategy (set by getLabel) as attributes
+class LabelResult(tuple):
+
+	def __new__(cls, distance, label, rect=None, strategy=None):
+		res = super().__new__(cls, (distance, label))
+		res.rect = rect
+		res.strategy = strategy
+		return res
+
+
 # explorer for obj and web strategy
 class ObjExplorer:
 
@@ -21,37 +53,44 @@ class ObjExplorer:
 		self.maxVerticalDistance = config.maxVerticalDistance
 		# methods for checking on each direction
 		checkerMethods = (self.leftCheck, self.topCheck, self.rightCheck, self.bottomCheck)
-		# point distances and labels collected for each direction
-		self.distancesAndLabels = {}
 		# checker methods to be invoked (according to passed directions)
 		self.checkers = {}
 		# initialize  for each passed direction
 		for direction, checker in zip(SearchDirections.ALL, checkerMethods):
 			if direction in searchDirections:
-				self.distancesAndLabels[direction] = []
 				self.checkers[direction] = checker
 
-	def getDistanceAndLabelText(self, labelObjs):
-		debugLog("Labels to analyze: %d"%len(labelObjs))
+	def getDistanceAndLabelText(self, labelObjs, index=None):
+		# index: optional spatial.GridIndex built on labelObjs,
+		# to reuse for all objs in the same container
+		debugLog("Labels to analyze: %d", len(labelObjs))
+		labelObjRects = index.rects if index is not None else [labelObj.location.toLTRB() for labelObj in labelObjs]
 		# check proximity for each label obj
 		# around obj in specified directions,
-		# saving distance if in the neighborhood
-		for labelObj in labelObjs:
-			labelText = labelObj.name
-			labelObjRect = labelObj.location.toLTRB()
-			for direction, checker in self.checkers.items():
-				distance = checker(labelObjRect)
-				if distance:
-					self.distancesAndLabels[direction].append((distance, labelText,))
-		if not any(self.distancesAndLabels.values()):
+		# keeping the nearest one in the neighborhood
+		nearestIndexes = self.getNearestIndexes(labelObjRects, index)
+		recorder = getRecorder()
+		if recorder:
+			# names read by chooseLabel, read again for the scene
+			recorder.recordCandidates(labelObjRects, {labelIndex: labelObjs[labelIndex].name for distance, labelIndex in nearestIndexes.values()})
+		if not nearestIndexes:
 			debugLog("No label obj found!")
 			return
-		# establish nearest label for each direction
+		nearestLabelObjs = {direction: (distance, labelObjs[labelIndex], labelObjRects[labelIndex]) for direction, (distance, labelIndex) in nearestIndexes.items()}
+		return self.chooseLabel(nearestLabelObjs)
+
+	def chooseLabel(self, nearestLabelObjs):
+		# establish nearest label for each direction,
+		# reading names of chosen label objs only;
+		# nearestLabelObjs: direction -> (distance, label obj, label obj rect)
 		minDistancesAndLabels = {}
 		for direction in self.checkers.keys():
-			distancesAndLabels = self.distancesAndLabels[direction]
-			debugLog("Distances and labels for direction %d: %s"%(direction, distancesAndLabels))
-			minDistanceAndLabel = min(distancesAndLabels, key=lambda i: i[0]) if distancesAndLabels else (10000, None)
+			if direction in nearestLabelObjs:
+				distance, labelObj, labelObjRect = nearestLabelObjs[direction]
+				minDistanceAndLabel = (distance, labelObj.name,)
+			else:
+				minDistanceAndLabel = (10000, None)
+			debugLog("Distance and label for direction %d: %s", direction, minDistanceAndLabel)
 			minDistancesAndLabels[direction] = minDistanceAndLabel
 		# establish the direction with nearest label
 		chosenDirection = min(minDistancesAndLabels, key=minDistancesAndLabels.get)
@@ -59,12 +98,117 @@ class ObjExplorer:
 		if minDistance == 10000:
 			debugLog("Unable to establish label position")
 			return
-		debugLog("Min distance: %d"%minDistance)
+		debugLog("Min distance: %d", minDistance)
 		if not labelText or labelText.isspace():
 			# TODO: manage image with OCR and AI
 			debugLog("Found label obj, but no text (maybe it's an image?)")
 			return
-		return (minDistance, labelText)
+		return LabelResult(minDistance, labelText, tuple(nearestLabelObjs[chosenDirection][2]))
+
+	def getNearestLabels(self, labelObjs, index=None, k=3):
+		# overview: up to k nearest labels for each direction, with one scan,
+		# as direction -> list of (distance, label text), nearest first
+		labelObjRects = index.rects if index is not None else [labelObj.location.toLTRB() for labelObj in labelObjs]
+		nearestIndexes = self.getKNearestIndexes(labelObjRects, index, k)
+		nearestLabels = {}
+		for direction, distancesAndIndexes in nearestIndexes.items():
+			nearestLabels[direction] = []
+			for distance, labelIndex in distancesAndIndexes:
+				labelText = labelObjs[labelIndex].name
+				if labelText and not labelText.isspace():
+					nearestLabels[direction].append((distance, labelText))
+		return nearestLabels
+
+	def getKNearestIndexes(self, labelObjRects, index=None, k=3):
+		# returns up to k (distance, index) of nearest label rects for each direction,
+		# nearest first and, with same distance, first found first
+		with span("geometry"):
+			candidateIndexes = self.getCandidateIndexes(labelObjRects, index)
+			count("candidatesScanned", len(candidateIndexes))
+			# bounded heaps of (-distance, -index), with the farthest on top
+			heaps = {direction: [] for direction in self.checkers.keys()}
+			for labelIndex in candidateIndexes:
+				labelObjRect = labelObjRects[labelIndex]
+				for direction, checker in self.checkers.items():
+					distance = checker(labelObjRect)
+					if not distance:
+						continue
+					heap = heaps[direction]
+					item = (-distance, -labelIndex)
+					if len(heap) < k:
+						heapq.heappush(heap, item)
+					elif item > heap[0]:
+						heapq.heapreplace(heap, item)
+			return {direction: sorted((-distance, -labelIndex) for distance, labelIndex in heap) for direction, heap in heaps.items()}
+
+	# incremental exploration, for label objs produced one by one:
+	# call startStream, then consider for each label obj,
+	# and finally getStreamedDistanceAndLabelText
+	def startStream(self):
+		# direction -> (distance, order, label obj, label obj rect) of nearest label obj so far
+		self.streamed = {}
+		# (order, label obj rect) of all considered label objs, when scene is captured
+		self.considered = [] if getRecorder() else None
+
+	def consider(self, labelObjRect, labelObj, order):
+		# order: position of label obj in the whole sequence,
+		# so to prefer the first one with same distance
+		if self.considered is not None:
+			self.considered.append((order, labelObjRect))
+		for direction, checker in self.checkers.items():
+			distance = checker(labelObjRect)
+			if distance and (direction not in self.streamed or (distance, order) < self.streamed[direction][:2]):
+				self.streamed[direction] = (distance, order, labelObj, labelObjRect)
+
+	def couldMatch(self, labelObjRect):
+		# whether a rect passes checks in any direction
+		return any(checker(labelObjRect) for checker in self.checkers.values())
+
+	def hasNearerThan(self, direction, distance):
+		# whether a label obj was already found in direction, not farther than distance
+		nearest = self.streamed.get(direction)
+		return bool(nearest and nearest[0] <= distance)
+
+	def getStreamedDistanceAndLabelText(self):
+		if self.considered is not None:
+			# in order, so that first found wins as in streaming
+			self.considered.sort(key=lambda orderAndRect: orderAndRect[0])
+			positions = {order: position for position, (order, labelObjRect) in enumerate(self.considered)}
+			getRecorder().recordCandidates(
+				[labelObjRect for order, labelObjRect in self.considered],
+				{positions[order]: labelObj.name for distance, order, labelObj, labelObjRect in self.streamed.values()}
+			)
+		if not self.streamed:
+			debugLog("No label obj found!")
+			return
+		nearestLabelObjs = {direction: (distance, labelObj, labelObjRect) for direction, (distance, order, labelObj, labelObjRect) in self.streamed.items()}
+		return self.chooseLabel(nearestLabelObjs)
+
+	def getNearestIndexes(self, labelObjRects, index=None):
+		# returns (distance, index) of nearest label rect for each direction
+		with span("geometry"):
+			candidateIndexes = self.getCandidateIndexes(labelObjRects, index)
+			count("candidatesScanned", len(candidateIndexes))
+			if geometry.isAvailable(len(candidateIndexes)):
+				candidateRects = [labelObjRects[i] for i in candidateIndexes]
+				nearestIndexes = geometry.objNearest(self.objRect, candidateRects, self.checkers.keys(), self.maxHorizontalDistance, self.maxVerticalDistance)
+				return {direction: (distance, candidateIndexes[i]) for direction, (distance, i) in nearestIndexes.items()}
+			nearestIndexes = {}
+			for labelIndex in candidateIndexes:
+				labelObjRect = labelObjRects[labelIndex]
+				for direction, checker in self.checkers.items():
+					distance = checker(labelObjRect)
+					# first found wins with same distance, like min()
+					if distance and (direction not in nearestIndexes or distance < nearestIndexes[direction][0]):
+						nearestIndexes[direction] = (distance, labelIndex,)
+			return nearestIndexes
+
+	def getCandidateIndexes(self, labelObjRects, index=None):
+		if index is not None:
+			candidateIndexes = index.query(self.objRect, self.checkers.keys(), self.maxHorizontalDistance, self.maxVerticalDistance)
+			debugLog("Candidates from index: %d", len(candidateIndexes))
+			return candidateIndexes
+		return range(len(labelObjRects))
 
 	def leftCheck(self, labelObjRect):
 		objLeft, objTop, objRight, objBottom = self.objRect
@@ -147,27 +291,23 @@ class CharExplorer:
 		self.maxVerticalDistance = config.maxVerticalDistance
 		# methods for checking on each direction
 		checkerMethods = (self.leftCheck, self.topCheck, self.rightCheck, self.bottomCheck)
-		# char distances and offsets collected for each direction
+		# min char distance and its offsets for each direction
 		self.distancesAndOffsets = {}
 		# checker methods to be invoked (according to passed directions)
 		self.checkers = {}
 		# initialize  for each passed direction
 		for direction, checker in zip(SearchDirections.ALL, checkerMethods):
 			if direction in searchDirections:
-				self.distancesAndOffsets[direction] = {}
 				self.checkers[direction] = checker
 
-	def getDistanceAndCharOffsets(self, charRects):
-		debugLog("Rects to analyze: %d"%len(charRects))
+	def getDistanceAndCharOffsets(self, charRects, index=None):
+		# index: optional spatial index built on charRects
+		debugLog("Rects to analyze: %d", len(charRects))
 		# check proximity for each char rect
 		# around obj in specified directions,
-		# saving offset and distance if in the neighborhood
-		for offset, charRect in enumerate(charRects):
-			for direction, checker in self.checkers.items():
-				distance = checker(charRect)
-				if distance:
-					self.distancesAndOffsets[direction].setdefault(distance, []).append(offset)
-		if not any(self.distancesAndOffsets.values()):
+		# saving offsets and distance of the nearest chars in the neighborhood
+		self.distancesAndOffsets = self.getNearestOffsets(charRects, index)
+		if not self.distancesAndOffsets:
 			debugLog("No chunk offset found!")
 			return
 		# establish best direction to consider
@@ -176,18 +316,87 @@ class CharExplorer:
 			debugLog("No direction found!")
 			return
 		distance, chosenDirection = distanceAndDirection
-		debugLog("Chosen direction: %s"%chosenDirection)
+		debugLog("Chosen direction: %s", chosenDirection)
 		# and return min distance and the collected offsets in that direction
-		offsets = self.distancesAndOffsets[chosenDirection][distance]
+		offsets = self.distancesAndOffsets[chosenDirection][1]
 		return (distance, offsets)
 
+	def getNearestOffsets(self, charRects, index=None):
+		# returns (distance, offsets) of nearest chars for each direction
+		with span("geometry"):
+			if index is not None:
+				candidateOffsets = index.query(self.objRect, self.checkers.keys(), self.maxHorizontalDistance, self.maxVerticalDistance)
+				debugLog("Candidates from index: %d", len(candidateOffsets))
+			else:
+				candidateOffsets = range(len(charRects))
+			count("candidatesScanned", len(candidateOffsets))
+			if geometry.isAvailable(len(candidateOffsets)):
+				if index is None:
+					candidateRects = charRects
+				elif isinstance(charRects, CharRectArray):
+					candidateRects = charRects.select(candidateOffsets)
+				else:
+					candidateRects = [charRects[offset] for offset in candidateOffsets]
+				nearestOffsets = geometry.charNearest(self.objRect, candidateRects, self.checkers.keys(), self.maxHorizontalDistance, self.maxVerticalDistance)
+				return {direction: (distance, array("i", [candidateOffsets[i] for i in offsets])) for direction, (distance, offsets) in nearestOffsets.items()}
+			nearestOffsets = {}
+			for offset, charRect in self.iterCharRects(charRects, index, candidateOffsets):
+				for direction, checker in self.checkers.items():
+					distance = checker(charRect)
+					if not distance:
+						continue
+					minDistanceAndOffsets = nearestOffsets.get(direction)
+					if not minDistanceAndOffsets or distance < minDistanceAndOffsets[0]:
+						nearestOffsets[direction] = (distance, array("i", [offset]))
+					elif distance == minDistanceAndOffsets[0]:
+						minDistanceAndOffsets[1].append(offset)
+			return nearestOffsets
+
+	def getKNearestOffsets(self, charRects, index=None, k=3):
+		# overview: up to k nearest distances for each direction, with one scan,
+		# as direction -> list of (distance, offsets), nearest first
+		with span("geometry"):
+			if index is not None:
+				candidateOffsets = index.query(self.objRect, self.checkers.keys(), self.maxHorizontalDistance, self.maxVerticalDistance)
+			else:
+				candidateOffsets = range(len(charRects))
+			count("candidatesScanned", len(candidateOffsets))
+			# bounded heaps of -distance, with the farthest on top,
+			# and offsets for each distance in heap
+			heaps = {direction: [] for direction in self.checkers.keys()}
+			offsetsByDistance = {direction: {} for direction in self.checkers.keys()}
+			for offset, charRect in self.iterCharRects(charRects, index, candidateOffsets):
+				for direction, checker in self.checkers.items():
+					distance = checker(charRect)
+					if not distance:
+						continue
+					offsets = offsetsByDistance[direction]
+					if distance in offsets:
+						offsets[distance].append(offset)
+						continue
+					heap = heaps[direction]
+					if len(heap) < k:
+						heapq.heappush(heap, -distance)
+					elif distance < -heap[0]:
+						del offsets[-heapq.heapreplace(heap, -distance)]
+					else:
+						continue
+					offsets[distance] = array("i", [offset])
+			return {direction: sorted(offsets.items()) for direction, offsets in offsetsByDistance.items()}
+
+	def iterCharRects(self, charRects, index, candidateOffsets):
+		# (offset, rect) pairs of candidates, reading columns of a CharRectArray directly
+		if isinstance(charRects, CharRectArray):
+			return charRects.iterItems(candidateOffsets if index is not None else None)
+		return ((offset, charRects[offset]) for offset in candidateOffsets)
+
 	def getDistanceAndDirection(self):
 		# find minimum distance in specified directions
 		# or set a no-sense, giant one instead (when no offsets)
 		minDistanceInDirection = {}
 		for direction in self.checkers.keys():
-			distances = self.distancesAndOffsets[direction].keys()
-			minDistanceInDirection[direction] = min(distances) if distances else 10000
+			distanceAndOffsets = self.distancesAndOffsets.get(direction)
+			minDistanceInDirection[direction] = distanceAndOffsets[0] if distanceAndOffsets else 10000
 		# get direction with minimum distance
 		# and check whether it's valid
 		chosenDirection = min(minDistanceInDirection, key=minDistanceInDirection.get)
@@ -195,7 +404,7 @@ class CharExplorer:
 		if minDistance == 10000:
 			debugLog("Unable to establish label position")
 			return
-		debugLog("Min distance: %d"%minDistance)
+		debugLog("Min distance: %d", minDistance)
 		# return best direction where retrieve offsets
 		res = (minDistance, chosenDirection)
 		return res
@@ -216,7 +425,7 @@ class CharExplorer:
 	def topCheck(self, charRect):
 		objLeft, objTop, objRight, objBottom = self.objRect
 		charLeft, charTop, charRight, charBottom = charRect
-		maxVerticalDistance = self.maxVerticalDistance if self.maxVerticalDistance else charRect.height
+		maxVerticalDistance = self.maxVerticalDistance if self.maxVerticalDistance else charBottom-charTop
 		if (
 			(objLeft<=charLeft<objRight)
 			and
@@ -243,7 +452,7 @@ class CharExplorer:
 	def bottomCheck(self, charRect):
 		objLeft, objTop, objRight, objBottom = self.objRect
 		charLeft, charTop, charRight, charBottom = charRect
-		maxVerticalDistance = self.maxVerticalDistance if self.maxVerticalDistance else charRect.height
+		maxVerticalDistance = self.maxVerticalDistance if self.maxVerticalDistance else charBottom-charTop
 		if (
 			(objLeft<=charLeft<objRight)
 			and
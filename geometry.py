@@ -0,0 +1,117 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# batched versions of the explorer checks,
+# available only if NumPy can be imported
+from .search import SearchDirections
+
+
+# imported at first need, being slow to import
+numpy = None
+numpyChecked = False
+# set to False to force the pure Python checks
+useNumpy = True
+# below this number of rects, the pure Python checks are faster
+vectorizeThreshold = 32
+# to keep config distances (e.g. sys.maxsize) into int64 range
+maxDistance = 2**62
+
+def loadNumpy():
+	global numpy, numpyChecked
+	if not numpyChecked:
+		numpyChecked = True
+		try:
+			import numpy as numpyModule
+			numpy = numpyModule
+		except ImportError:
+			pass
+	return numpy
+
+def isAvailable(rectsNumber):
+	return bool(useNumpy and rectsNumber >= vectorizeThreshold and loadNumpy() is not None)
+
+def packRects(rects):
+	# Nx4 array of (left, top, right, bottom) rows
+	columns = getattr(rects, "columns", None)
+	if columns is not None:
+		# int columns of a CharRectArray, without per-rect tuples
+		return numpy.column_stack([numpy.frombuffer(column, dtype=numpy.intc) for column in columns]).astype(numpy.int64)
+	return numpy.array(rects, dtype=numpy.int64).reshape(-1, 4)
+
+def clampDistance(distance):
+	return distance if distance is None else min(distance, maxDistance)
+
+# returns a dict with (distance, index) of nearest rect for each direction,
+# following ObjExplorer checks
+def objNearest(objRect, rects, directions, maxHorizontalDistance, maxVerticalDistance):
+	rectArray = rects if isinstance(rects, numpy.ndarray) else packRects(rects)
+	left, top, right, bottom = rectArray.T
+	objLeft, objTop, objRight, objBottom = objRect
+	maxHorizontalDistance = clampDistance(maxHorizontalDistance)
+	maxVerticalDistance = clampDistance(maxVerticalDistance)
+	# common conditions for horizontal and vertical directions
+	verticalOverlap = (objTop <= bottom) & (objBottom > top)
+	horizontalOverlap = (objLeft < right) & (objRight > left)
+	nearest = {}
+	for direction in directions:
+		if direction in SearchDirections.LEFT:
+			distances = numpy.abs(objLeft-right)
+			mask = verticalOverlap & (
+				((objLeft > right) & (objLeft-right <= maxHorizontalDistance))
+				# overlapping edges
+				| ((objLeft <= right) & (right < objRight))
+			)
+		elif direction in SearchDirections.TOP:
+			distances = objTop-bottom
+			mask = horizontalOverlap & (objTop > bottom) & (distances <= maxVerticalDistance)
+		elif direction in SearchDirections.RIGHT:
+			distances = numpy.abs(left-objRight)
+			mask = verticalOverlap & (
+				((objRight < left) & (left-objRight <= maxHorizontalDistance))
+				# overlapping edges
+				| ((objLeft < left) & (left <= objRight))
+			)
+		else:
+			distances = top-objBottom
+			mask = horizontalOverlap & (objBottom < top) & (distances <= maxVerticalDistance)
+		# zero distances are discarded, like in pure Python checks
+		indexes = numpy.flatnonzero(mask & (distances != 0))
+		if indexes.size:
+			# argmin returns the first minimum, like min()
+			index = indexes[numpy.argmin(distances[indexes])]
+			nearest[direction] = (int(distances[index]), int(index))
+	return nearest
+
+# returns a dict with (distance, offsets) of nearest chars for each direction,
+# following CharExplorer checks
+def charNearest(objRect, charRects, directions, maxHorizontalDistance, maxVerticalDistance):
+	rectArray = charRects if isinstance(charRects, numpy.ndarray) else packRects(charRects)
+	left, top, right, bottom = rectArray.T
+	objLeft, objTop, objRight, objBottom = objRect
+	maxHorizontalDistance = clampDistance(maxHorizontalDistance)
+	# without a max vertical distance, char height is used
+	maxVerticalDistance = clampDistance(maxVerticalDistance) if maxVerticalDistance else bottom-top
+	sameLine = (objTop < bottom) & (bottom <= objBottom)
+	sameColumn = (objLeft <= left) & (left < objRight)
+	nearest = {}
+	for direction in directions:
+		if direction in SearchDirections.LEFT:
+			distances = objLeft-right
+			mask = sameLine & (objLeft > right) & (distances <= maxHorizontalDistance)
+		elif direction in SearchDirections.TOP:
+			distances = objTop-bottom
+			mask = sameColumn & (objTop > bottom) & (distances <= maxVerticalDistance)
+		elif direction in SearchDirections.RIGHT:
+			distances = left-objRight
+			mask = sameLine & (left > objRight) & (distances <= maxHorizontalDistance)
+		else:
+			distances = top-objBottom
+			mask = sameColumn & (top > objBottom) & (distances <= maxVerticalDistance)
+		mask &= distances != 0
+		if mask.any():
+			minDistance = distances[mask].min()
+			offsets = numpy.flatnonzero(mask & (distances == minDistance)).tolist()
+			nearest[direction] = (int(minDistance), offsets)
+	return nearest
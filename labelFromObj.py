@@ -6,30 +6,145 @@
 import ctypes
 import winUser
 
+from locationHelper import RectLTRB
 from NVDAObjects.IAccessible import getNVDAObjectFromEvent
 
+from .cache import LRUCache
 from .explorers import ObjExplorer
-from .search import SearchConfig
+from .search import resolveConfig
+from .spatial import GridIndex
+from .tracing import count, span
 from .utils import debugLog
 
 
-def getLabelFromObj(obj, config):
-	# recreate config, to specify strategy
-	config = SearchConfig(oldConfig=config, obj=obj, strategy="obj")
-	staticHandles = getAllStaticHandles(config.maxParent.windowHandle)
-	if not staticHandles:
+def getLabelFromObj(obj, config, staticWindows=None, index=None):
+	# staticWindows and index can be provided by getLabels,
+	# to share them between objs with the same maxParent
+	# resolve config for this strategy, if not already done
+	config = resolveConfig(config, obj, "obj")
+	if staticWindows is not None:
+		return searchStaticWindows(config, staticWindows, index)
+	# index built once for each enumeration, like candidates
+	entry = getStaticWindowsEntry(config.maxParent.windowHandle)
+	res = searchStaticWindows(config, entry.staticWindows, entry.index)
+	if res and not entry.isCurrent(res):
+		# e.g. another tab page shown, so enumerate again
+		debugLog("Cached static window changed: %s", res[1])
+		count("staticWindowsCache.stale")
+		entry = getStaticWindowsEntry(config.maxParent.windowHandle, refresh=True)
+		res = searchStaticWindows(config, entry.staticWindows, entry.index)
+	return res
+
+def searchStaticWindows(config, staticWindows, index):
+	if not staticWindows:
 		debugLog("No handles found!")
 		return
 	objRect = config.obj.location.toLTRB()
-	# explorer that looks for labels around obj
+	# explorer that looks for labels around obj;
+	# it checks window rects of all static windows,
+	# but creates NVDAObjects only for the nearest ones, to read their names
 	explorer = ObjExplorer(objRect, config)
-	staticObjs = [getNVDAObjectFromEvent(handle, winUser.OBJID_CLIENT, 0) for handle in staticHandles]
-	res = explorer.getDistanceAndLabelText(staticObjs)
-	return res
+	return explorer.getDistanceAndLabelText(staticWindows, index)
+
+def getOverviewFromObj(obj, config, k=3):
+	# up to k nearest labels for each direction, see getLabelOverview
+	config = resolveConfig(config, obj, "obj")
+	staticWindows = getAllStaticWindows(config.maxParent.windowHandle)
+	if not staticWindows:
+		debugLog("No handles found!")
+		return {}
+	explorer = ObjExplorer(config.obj.location.toLTRB(), config)
+	return explorer.getNearestLabels(staticWindows, k=k)
 
 # to collect handles of all static objs
-WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.wintypes.BOOL, ctypes.wintypes.HWND, ctypes.wintypes.LPARAM)
 def getAllStaticHandles(parent):
+	return [staticWindow.handle for staticWindow in getAllStaticWindows(parent)]
+
+# static window found by enumeration,
+# with what is needed to filter it without further Win32 calls;
+# usable as label obj by ObjExplorer
+class StaticWindow:
+
+	__slots__ = ("handle", "className", "rect")
+
+	def __init__(self, handle, className, rect):
+		self.handle = handle
+		self.className = className
+		# in (left, top, right, bottom) representation
+		self.rect = rect
+
+	@property
+	def location(self):
+		return RectLTRB(*self.rect)
+
+	@property
+	def name(self):
+		# not cached, label text could change
+		with span("materialization"):
+			count("comObjects")
+			staticObj = getNVDAObjectFromEvent(self.handle, winUser.OBJID_CLIENT, 0)
+			# window destroyed after (cached) enumeration
+			if not staticObj:
+				return None
+			return staticObj.name
+
+# static windows of a parent window, with their spatial index
+class StaticWindowsEntry:
+
+	__slots__ = ("staticWindows", "index", "windowsByRect")
+
+	def __init__(self, staticWindows):
+		self.staticWindows = staticWindows
+		self.index = GridIndex([staticWindow.rect for staticWindow in staticWindows])
+		# to find the window of a chosen label
+		self.windowsByRect = {staticWindow.rect: staticWindow for staticWindow in staticWindows}
+
+	def isCurrent(self, res):
+		# whether the window of chosen label is still visible there,
+		# with two Win32 calls (no cross-process ones)
+		staticWindow = self.windowsByRect.get(res.rect)
+		if not staticWindow or not winUser.isWindowVisible(staticWindow.handle):
+			return False
+		rect = winUser.getWindowRect(staticWindow.handle)
+		return (rect.left, rect.top, rect.right, rect.bottom) == staticWindow.rect
+
+# parent window handle -> StaticWindowsEntry;
+# entries are valid for the current generation only,
+# that callers can bump on window events (see invalidateStaticWindows),
+# and a chosen label is verified before it's returned
+staticWindowsCache = LRUCache(maxSize=16, ttl=5)
+staticWindowsGeneration = 0
+
+def invalidateStaticWindows():
+	# to call on window create/destroy/show/hide or location change events,
+	# or whenever static windows could be changed
+	global staticWindowsGeneration
+	staticWindowsGeneration += 1
+
+def getAllStaticWindows(parent):
+	return getStaticWindowsEntry(parent).staticWindows
+
+def getStaticWindowsEntry(parent, refresh=False):
+	# refresh: to enumerate again, e.g. when windows changed
+	entry = None if refresh else staticWindowsCache.get(parent, token=staticWindowsGeneration)
+	if entry is None:
+		count("staticWindowsCache.misses")
+		entry = StaticWindowsEntry(enumStaticWindows(parent))
+		staticWindowsCache.set(parent, entry, token=staticWindowsGeneration)
+	else:
+		count("staticWindowsCache.hits")
+	return entry
+
+def hasStaticWindows(parent):
+	# like bool(getAllStaticHandles(parent)),
+	# but stopping at first static window, when not cached
+	cached = staticWindowsCache.get(parent, token=staticWindowsGeneration)
+	if cached is not None:
+		return bool(cached.staticWindows)
+	return bool(enumStaticWindows(parent, firstOnly=True))
+
+WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.wintypes.BOOL, ctypes.wintypes.HWND, ctypes.wintypes.LPARAM)
+def enumStaticWindows(parent, firstOnly=False):
 	results = []
 	@WNDENUMPROC
 	def callback(window, data):
@@ -37,10 +152,14 @@ def getAllStaticHandles(parent):
 		isWindowEnabled = winUser.isWindowEnabled(window)
 		className = winUser.getClassName(window)
 		if isWindowVisible and isWindowEnabled and "static" in className.lower():
-			results.append(window)
+			rect = winUser.getWindowRect(window)
+			results.append(StaticWindow(window, className, (rect.left, rect.top, rect.right, rect.bottom)))
+			# returning False stops enumeration
+			return not firstOnly
 		return True
 	# call previous func until it returns True,
-	# thus always, getting all windows
-	ctypes.windll.user32.EnumChildWindows(parent, callback, 0)
+	# thus always (unless firstOnly), getting all windows
+	with span("enumeration"):
+		ctypes.windll.user32.EnumChildWindows(parent, callback, 0)
 	# return all results
 	return results
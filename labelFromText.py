@@ -4,20 +4,22 @@
 # Released under GPL 2
 
 from displayModel import DisplayModelTextInfo as DMTI
+from locationHelper import RectLTRB
 
-from .explorers import CharExplorer
-from .search import SearchConfig
+from .cache import LRUCache
+from .capture import getRecorder
+from .explorers import CharExplorer, LabelResult
+from .search import SearchDirections, resolveConfig
+from .spatial import CharRectArray, RowIndex
+from .tracing import count, span
 from .utils import debugLog, getReversedAncestors
 
 
-def getLabelFromText(obj, config):
-	# recreate config, to specify strategy
-	config = SearchConfig(oldConfig=config, obj=obj, strategy="text")
-	# get text from obj that contains it (labelContainer), provided or discovered automatically
-	info = getTextFromTextContainer(config)
-	if not info:
-		debugLog("No text found!")
-		return
+def getLabelFromText(obj, config, infoCache=None):
+	# infoCache can be provided by getLabels,
+	# to share text of labelContainers between objs
+	# resolve config for this strategy, if not already done
+	config = resolveConfig(config, obj, "text")
 	# rectangle of obj to label, in (left, top, right, bottom) representation
 	# Remember:
 	# x (left and right coordinates) goes from 0 to positive integers,
@@ -25,28 +27,107 @@ def getLabelFromText(obj, config):
 	# y (top and bottom coordinates) does the same but
 	# moving from top to bottom on the screen;
 	objRect = config.obj.location.toLTRB()
+	# in region mode, read only text where label chars could be
+	searchRect = getSearchRect(objRect, config) if config.textExtractor == "region" else None
+	# get text from obj that contains it (labelContainer), provided or discovered automatically
+	info = getTextFromTextContainer(config, infoCache, searchRect)
+	if not info:
+		debugLog("No text found!")
+		return
+	source = InfoTextSource(info, searchRect is not None)
+	# few chars in region, no index needed
+	index = getRowIndex(info) if searchRect is None else None
+	res = getLabelFromTextSource(objRect, config, source, index)
+	recorder = getRecorder()
+	if recorder:
+		recorder.recordText(source)
+	return res
+
+def getLabelFromTextSource(objRect, config, source, index=None):
+	# label search on text already retrieved, without NVDA objects
+	# (so also on text of a captured scene, see benchmarks/replay.py)
 	# explorer that looks for chars around obj
 	explorer = CharExplorer(objRect, config)
-	# rectangles for each char in labelContainer
-	charRects = info._storyFieldsAndRects[1]
 	# get possible offsets of label
-	res = explorer.getDistanceAndCharOffsets(charRects)
+	res = explorer.getDistanceAndCharOffsets(source.charRects, index)
 	if not res:
 		debugLog("No chars around obj!")
 		return
 	distance, charOffsets	= res
+	label, labelRect = getChunkLabel(source, charOffsets)
+	debugLog("Label: %s", label)
+	res = LabelResult(distance, label, labelRect)
+	return res
+
+def getOverviewFromText(obj, config, k=3):
+	# up to k nearest labels for each direction, see getLabelOverview
+	config = resolveConfig(config, obj, "text")
+	objRect = config.obj.location.toLTRB()
+	searchRect = getSearchRect(objRect, config) if config.textExtractor == "region" else None
+	info = getTextFromTextContainer(config, searchRect=searchRect)
+	if not info:
+		debugLog("No text found!")
+		return {}
+	explorer = CharExplorer(objRect, config)
+	source = InfoTextSource(info, searchRect is not None)
+	index = getRowIndex(info) if searchRect is None else None
+	overview = {}
+	for direction, distancesAndOffsets in explorer.getKNearestOffsets(source.charRects, index, k).items():
+		overview[direction] = []
+		# chars at different distances can belong to the same chunk
+		labelRects = set()
+		for distance, charOffsets in distancesAndOffsets:
+			label, labelRect = getChunkLabel(source, charOffsets)
+			if labelRect not in labelRects:
+				labelRects.add(labelRect)
+				overview[direction].append((distance, label))
+	return overview
+
+def getChunkLabel(source, charOffsets):
+	# text and rect of chunk containing charOffsets
 	# calculate a mean of found offsets, to avoid spurious results
 	chunkCenterOffset = sum(charOffsets)//len(charOffsets)
+	if source.isRegion:
+		# label could continue outside region
+		source, chunkCenterOffset = source.getLine(chunkCenterOffset)
 	# get start and end offsets for whole label
-	labelStartOffset, labelEndOffset = info._getDisplayChunkOffsets(chunkCenterOffset)
+	labelStartOffset, labelEndOffset = source.getChunkOffsets(chunkCenterOffset)
 	# finally, get label text from labelContainer
-	label = info.text[labelStartOffset:labelEndOffset]
-	debugLog("Label: %s"%label)
-	res = (distance, label)
-	return res
+	label = source.text[labelStartOffset:labelEndOffset]
+	return label, getTextRect(source.charRects, labelStartOffset, labelEndOffset)
+
+
+# text of a labelContainer as used by text strategy:
+# text, char rects, display chunks and (in region mode) whole lines;
+# chunks and lines used are kept, to capture the scene
+class InfoTextSource:
 
-def getTextFromTextContainer(config):
-	# find a labelContainer in obj ancestors that could provide labels
+	def __init__(self, info, isRegion=False):
+		self.info = info
+		self.text = info.text
+		# rectangles for each char in labelContainer, as int columns
+		self.charRects = getCharRects(info)
+		# whether text is restricted to a region, so labels could continue outside it
+		self.isRegion = isRegion
+		# offset -> (start, end) offsets of its chunk
+		self.chunks = {}
+		# offset -> (source of its line, offset in line)
+		self.lines = {}
+
+	def getChunkOffsets(self, offset):
+		chunkOffsets = self.chunks[offset] = self.info._getDisplayChunkOffsets(offset)
+		return chunkOffsets
+
+	def getLine(self, offset):
+		lineInfo, lineOffset = getLineInfo(self.info, offset)
+		lineSource = InfoTextSource(lineInfo) if lineInfo is not self.info else self
+		line = self.lines[offset] = (lineSource, lineOffset)
+		return line
+
+def getTextFromTextContainer(config, infoCache=None, searchRect=None):
+	# find a labelContainer in obj ancestors that could provide labels;
+	# infoCache, if provided, maps (window handle, rect) of ancestors to their text info;
+	# searchRect, if provided, restricts text to that part of ancestors
 	info = None
 	# obj containing labels as simple text
 	labelContainer = config.labelContainer
@@ -59,16 +140,130 @@ def getTextFromTextContainer(config):
 		# useful to avoid obj parent that would provide obj content as text
 		if ancestor.windowHandle != obj.windowHandle:
 			# get text restricted to that ancestor, without children
-			tempInfo = RestrictedDMTI(ancestor, ancestor.location.toLTRB())
-			if tempInfo.text:
+			ancestorRect = ancestor.location.toLTRB()
+			if searchRect is not None:
+				ancestorRect = getIntersection(ancestorRect, searchRect)
+				if not ancestorRect:
+					if ancestor == maxParent:
+						break
+					continue
+			cacheKey = (ancestor.windowHandle, ancestorRect)
+			if infoCache is not None and cacheKey in infoCache:
+				count("infoCache.hits")
+				tempInfo = infoCache[cacheKey]
+				hasText = bool(tempInfo.text)
+			else:
+				with span("textExtraction"):
+					tempInfo = RestrictedDMTI(ancestor, ancestorRect)
+					# text is retrieved from display model here
+					hasText = bool(tempInfo.text)
+				if infoCache is not None:
+					infoCache[cacheKey] = tempInfo
+			if hasText:
 				info = tempInfo
 				break
 		if ancestor == maxParent:
 			break
 	return info
 
+def getSearchRect(objRect, config):
+	# rect around obj where checks of CharExplorer could pass,
+	# in requested directions; char sizes are unknown,
+	# so obj height is used as (generous) char height and width
+	objLeft, objTop, objRight, objBottom = objRect
+	charSize = objBottom-objTop
+	maxHorizontalDistance = config.maxHorizontalDistance
+	# with None, CharExplorer uses char height
+	maxVerticalDistance = config.maxVerticalDistance or charSize
+	directions = config.directions
+	# chars beside obj can start above it, chars above or below can end after it
+	left, top, right, bottom = objLeft, objTop-charSize, objRight+charSize, objBottom
+	if SearchDirections.LEFT[0] in directions:
+		left = objLeft-maxHorizontalDistance-charSize
+	if SearchDirections.RIGHT[0] in directions:
+		right = objRight+maxHorizontalDistance+charSize
+	if SearchDirections.TOP[0] in directions:
+		top = objTop-maxVerticalDistance-charSize
+	if SearchDirections.BOTTOM[0] in directions:
+		bottom = objBottom+maxVerticalDistance+charSize
+	return RectLTRB(left, top, right, bottom)
+
+def getTextRect(charRects, startOffset, endOffset):
+	# rect enclosing chars (of a CharRectArray) from startOffset to endOffset
+	lefts, tops, rights, bottoms = (column[startOffset:endOffset] for column in charRects.columns)
+	if not lefts:
+		return None
+	return (min(lefts), min(tops), max(rights), max(bottoms))
+
+def getCharRects(info):
+	# char rects of info as CharRectArray, converted once for each text snapshot
+	# (infos are shared by getLabels, and text is read again when it could be changed);
+	# rect objects are released after conversion, so use this instead of _storyFieldsAndRects
+	if info._charRectArray is None:
+		with span("indexing"):
+			rects = info._storyFieldsAndRects[1]
+			info._charRectArray = CharRectArray(rects)
+			del rects[:]
+	return info._charRectArray
+
+def getIntersection(rect, otherRect):
+	left = max(rect[0], otherRect[0])
+	top = max(rect[1], otherRect[1])
+	right = min(rect[2], otherRect[2])
+	bottom = min(rect[3], otherRect[3])
+	if left >= right or top >= bottom:
+		return None
+	return RectLTRB(left, top, right, bottom)
+
+def getLineInfo(info, offset):
+	# text info of the whole line (across labelContainer) of char at offset in info,
+	# with the offset of that char in it; info and offset if char is not found
+	charRect = getCharRects(info)[offset]
+	left, top, right, bottom = charRect
+	containerRect = info.obj.location.toLTRB()
+	lineRect = RectLTRB(containerRect.left, top, containerRect.right, bottom)
+	with span("textExtraction"):
+		lineInfo = RestrictedDMTI(info.obj, lineRect)
+	try:
+		return (lineInfo, getCharRects(lineInfo).index(charRect))
+	except ValueError:
+		debugLog("Char not found in line")
+		return (info, offset)
+
+# (labelContainer window handle, char count) -> row index of its text;
+# entries are valid for the current generation only,
+# that callers can bump on text change events (see invalidateRowIndexes)
+rowIndexCache = LRUCache(maxSize=8, ttl=5)
+rowIndexGeneration = 0
+
+def invalidateRowIndexes():
+	# to call when text drawn in windows changes
+	global rowIndexGeneration
+	rowIndexGeneration += 1
+
+def getRowIndex(info):
+	# already converted for the search, see InfoTextSource
+	charRects = getCharRects(info)
+	# offsets of a text of another length would be wrong
+	cacheKey = (info.obj.windowHandle, len(charRects))
+	index = rowIndexCache.get(cacheKey, token=rowIndexGeneration)
+	if index is not None:
+		# text moved (e.g. scrolled) without changing its length;
+		# int columns are compared in C, much faster than building the index
+		if index.rects == charRects:
+			count("rowIndex.hits")
+			return index
+		count("rowIndex.stale")
+	debugLog("Building row index")
+	with span("indexing"):
+		index = RowIndex(charRects)
+	rowIndexCache.set(cacheKey, index, token=rowIndexGeneration)
+	return index
+
 
 # class to exclude children objects from text retrieval
 class RestrictedDMTI(DMTI):
 
 	includeDescendantWindows = False
+	# see getCharRects
+	_charRectArray = None
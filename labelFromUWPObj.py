@@ -5,32 +5,140 @@
 
 import UIAHandler
 
-from NVDAObjects.UIA import UIA
+from locationHelper import RectLTWH
 
-from .explorers import ObjExplorer
-from .search import SearchConfig
-from .utils import debugLog, measureTime
+from .cache import LRUCache
+from .explorers import LabelCandidate, ObjExplorer
+from .search import resolveConfig
+from .spatial import GridIndex
+from .tracing import count, span
+from .utils import debugLog
 
 
-def getLabelFromUWPObj(obj, config):
-	# recreate config, to specify strategy
-	config = SearchConfig(oldConfig=config, obj=obj, strategy="uwp")
-	staticUIAElements = getAllStaticUIAElements(config.maxParent)
-	if not staticUIAElements:
+def getLabelFromUWPObj(obj, config, staticObjs=None, index=None):
+	# staticObjs and index can be provided by getLabels,
+	# to share them between objs with the same maxParent
+	# resolve config for this strategy, if not already done
+	config = resolveConfig(config, obj, "uwp")
+	if staticObjs is not None:
+		return searchCandidates(config, staticObjs, index)
+	entry = getCachedUIACandidates(config)
+	res = searchCandidates(config, entry.candidates, entry.index)
+	if res and not entry.isCurrent(res):
+		# page changed meanwhile, so search again on current elements
+		debugLog("Cached label not found: %s", res[1])
+		count("uiaCandidatesCache.stale")
+		entry = getCachedUIACandidates(config, refresh=True)
+		res = searchCandidates(config, entry.candidates, entry.index)
+	return res
+
+def searchCandidates(config, staticObjs, index):
+	if not staticObjs:
 		debugLog("No UIA elements found!")
 		return
 	objRect = config.obj.location.toLTRB()
 	# explorer that looks for labels around obj
 	explorer = ObjExplorer(objRect, config)
-	staticObjs = [UIA(UIAElement=element) for element in staticUIAElements]
-	res = explorer.getDistanceAndLabelText(staticObjs)
-	return res
+	return explorer.getDistanceAndLabelText(staticObjs, index)
+
+def getOverviewFromUWPObj(obj, config, k=3):
+	# up to k nearest labels for each direction, see getLabelOverview
+	config = resolveConfig(config, obj, "uwp")
+	staticObjs = getStaticUIACandidates(config)
+	if not staticObjs:
+		debugLog("No UIA elements found!")
+		return {}
+	explorer = ObjExplorer(config.obj.location.toLTRB(), config)
+	return explorer.getNearestLabels(staticObjs, k=k)
+
+def getStaticUIACandidates(config, elements=None):
+	# label candidates from cached properties of TextBlock elements,
+	# retrieved with a single UIA call, without UIA objs;
+	# elements: optional list, filled with the element of each candidate
+	staticUIAElements = getAllStaticUIAElements(config.maxParent, getLabelCacheRequest())
+	candidates = []
+	with span("materialization"):
+		for element in staticUIAElements:
+			rect = element.GetCachedPropertyValue(UIAHandler.UIA_BoundingRectanglePropertyId)
+			# offscreen elements could have no rect
+			if not rect or len(rect) != 4:
+				continue
+			name = element.GetCachedPropertyValue(UIAHandler.UIA_NamePropertyId)
+			candidates.append(LabelCandidate(name, RectLTWH.fromFloatCollection(*rect)))
+			if elements is not None:
+				elements.append(element)
+	return candidates
+
+
+# candidates of a maxParent, with their spatial index,
+# to label objs one by one (e.g. tabbing) without a UIA search each time
+class UIACandidatesEntry:
+
+	__slots__ = ("candidates", "index", "elementsByRect")
+
+	def __init__(self, candidates, elements):
+		self.candidates = candidates
+		self.index = GridIndex.fromObjs(candidates)
+		# to find the element of a chosen label
+		self.elementsByRect = dict(zip(self.index.rects, elements))
+
+	def isCurrent(self, res):
+		# whether chosen label is still there, with two UIA calls
+		element = self.elementsByRect.get(res.rect)
+		if element is None:
+			return False
+		try:
+			rect = RectLTWH.fromFloatCollection(*element.CurrentBoundingRectangle).toLTRB()
+			return tuple(rect) == res.rect and element.CurrentName == res[1]
+		except Exception:
+			# element not available anymore
+			return False
+
+# maxParent runtime ID -> UIACandidatesEntry;
+# valid for the current generation only (see invalidateUIACandidates),
+# and a chosen label is verified before it's returned
+uiaCandidatesCache = LRUCache(maxSize=16, ttl=5)
+uiaCandidatesGeneration = 0
+
+def invalidateUIACandidates():
+	# to call on UIA structure changed events,
+	# or whenever TextBlock elements could be changed
+	global uiaCandidatesGeneration
+	uiaCandidatesGeneration += 1
+
+def getCachedUIACandidates(config, refresh=False):
+	# refresh: to search elements again, e.g. when they changed
+	key = tuple(config.maxParent.UIAElement.GetRuntimeId())
+	entry = None if refresh else uiaCandidatesCache.get(key, token=uiaCandidatesGeneration)
+	if entry is None:
+		count("uiaCandidatesCache.misses")
+		elements = []
+		candidates = getStaticUIACandidates(config, elements)
+		entry = UIACandidatesEntry(candidates, elements)
+		uiaCandidatesCache.set(key, entry, token=uiaCandidatesGeneration)
+	else:
+		count("uiaCandidatesCache.hits")
+	return entry
 
 # to collect UIAElement of all TextBlock objs
-def getAllStaticUIAElements(parent):
+def getAllStaticUIAElements(parent, cacheRequest=None):
 	client = UIAHandler.handler.clientObject
 	classCondition = client.CreatePropertyCondition(UIAHandler.UIA_ClassNamePropertyId, "TextBlock")
-	cacheRequest = UIAHandler.handler.baseCacheRequest
-	UIAArray = parent.UIAElement.FindAllBuildCache(UIAHandler.TreeScope_Descendants, classCondition, cacheRequest)
-	results = [UIAArray.GetElement(n) for n in range(UIAArray.Length)]
+	cacheRequest = cacheRequest or UIAHandler.handler.baseCacheRequest
+	with span("enumeration"):
+		UIAArray = parent.UIAElement.FindAllBuildCache(UIAHandler.TreeScope_Descendants, classCondition, cacheRequest)
+		results = [UIAArray.GetElement(n) for n in range(UIAArray.Length)]
+	count("comObjects", len(results))
 	return results
+
+# cache request for what label search needs,
+# created at first use (UIAHandler could be not ready at import)
+labelCacheRequest = None
+def getLabelCacheRequest():
+	global labelCacheRequest
+	if not labelCacheRequest:
+		cacheRequest = UIAHandler.handler.clientObject.CreateCacheRequest()
+		for propertyId in (UIAHandler.UIA_NamePropertyId, UIAHandler.UIA_BoundingRectanglePropertyId):
+			cacheRequest.AddProperty(propertyId)
+		labelCacheRequest = cacheRequest
+	return labelCacheRequest
@@ -5,31 +5,183 @@
 
 import textInfos
 
+from comInterfaces import IAccessible2Lib as IA2
+from comtypes import COMError
 from controlTypes import Role as roles
+from locationHelper import RectLTRB
 from NVDAObjects.IAccessible import getNVDAObjectFromPoint
 
-from .explorers import ObjExplorer
-from .search import SearchConfig
-from .utils import debugLog, getReversedAncestors
+from .cache import LRUCache
+from .explorers import LabelCandidate, ObjExplorer
+from .search import SearchDirections, resolveConfig
+from .spatial import GridIndex
+from .tracing import count, span
+from .utils import debugLog, getReversedAncestors, isMainThread
 
 
 def getLabelFromWeb(obj, config):
-	# recreate config, to specify strategy
-	config = SearchConfig(oldConfig=config, obj=obj, strategy="web")
-	labelObjs = getLabelsFromWebContainer(config)
+	# resolve config for this strategy, if not already done
+	config = resolveConfig(config, obj, "web")
+	if config.webExtractor == "nearest":
+		return getNearestLabelFromWeb(config)
+	labelObjs, index = getLabelsFromWebContainer(config)
 	if not labelObjs:
 		debugLog("No web labels found!")
 		return
 	objRect = config.obj.location.toLTRB()
 	# explorer that looks for labels around obj
 	explorer = ObjExplorer(objRect, config)
-	res = explorer.getDistanceAndLabelText(labelObjs)
+	res = explorer.getDistanceAndLabelText(labelObjs, index)
 	return res
 
-webCache = {}
+def getOverviewFromWeb(obj, config, k=3):
+	# up to k nearest labels for each direction, see getLabelOverview;
+	# nearest extractor stops at the first label, so container is always used
+	config = resolveConfig(config, obj, "web")
+	labelObjs, index = getLabelsFromWebContainer(config)
+	if not labelObjs:
+		debugLog("No web labels found!")
+		return {}
+	explorer = ObjExplorer(config.obj.location.toLTRB(), config)
+	return explorer.getNearestLabels(labelObjs, index, k)
+
+# (ancestor, store class, whether in main thread) -> store of its label objs,
+# valid while its document is not reloaded;
+# see webCache.stats() to size it
+webCache = LRUCache(maxSize=32, ttl=30)
+
+def getDocumentToken(treeInterceptor):
+	# a reloaded document gets a new treeInterceptor, or at least a new buffer
+	return (treeInterceptor, getattr(treeInterceptor, "VBufHandle", None))
+
+def invalidateWebCache(treeInterceptor=None):
+	# to call on document load events;
+	# without treeInterceptor, clear the whole cache
+	if treeInterceptor is None:
+		webCache.clear()
+	else:
+		webCache.invalidateGroup(treeInterceptor)
+
+def updateWebCache(treeInterceptor=None):
+	# to call when part of a document changes (e.g. in single-page apps):
+	# cached containers are verified at next use, scanning again changed spans only;
+	# without treeInterceptor, for all documents
+	stores = webCache.values() if treeInterceptor is None else webCache.values(treeInterceptor)
+	for store in stores:
+		store.stale = True
+
+# VirtualBuffer method name -> (original method, its wrapper), while installed
+installedHooks = {}
+
+def installWebCacheHooks():
+	# keeps web cache in sync with documents, without calls from app modules:
+	# buffer updates mark cached containers for verification, loads discard them;
+	# to call explicitly (e.g. in app module __init__), see removeWebCacheHooks
+	try:
+		from virtualBuffers import VirtualBuffer
+	except ImportError:
+		return
+	if installedHooks:
+		return
+	hooks = {"_handleUpdate": updateWebCache, "_loadBufferDone": invalidateWebCache}
+	for name, hook in hooks.items():
+		original = getattr(VirtualBuffer, name, None)
+		if original is None:
+			continue
+		wrapper = makeHook(name, original, hook)
+		installedHooks[name] = (original, wrapper)
+		setattr(VirtualBuffer, name, wrapper)
+
+def makeHook(name, original, hook):
+	def wrapper(self, *args, **kwargs):
+		# a wrapper left in place by removeWebCacheHooks just passes through
+		if installedHooks.get(name, (None, None))[1] is wrapper:
+			hook(self)
+		return original(self, *args, **kwargs)
+	return wrapper
+
+def removeWebCacheHooks():
+	# restores VirtualBuffer methods, e.g. in app module terminate;
+	# if another add-on wrapped them in the meantime, its wrappers are kept
+	# (with ours disabled inside them)
+	if not installedHooks:
+		return
+	from virtualBuffers import VirtualBuffer
+	for name, (original, wrapper) in installedHooks.items():
+		if VirtualBuffer.__dict__.get(name) is wrapper:
+			setattr(VirtualBuffer, name, original)
+	installedHooks.clear()
+
+# roles of controls whose text is not a label (but e.g. their name or value)
+nonLabelRoles = (
+	roles.BUTTON, roles.CHECKBOX, roles.COMBOBOX, roles.EDITABLETEXT, roles.LINK,
+	roles.LIST, roles.MENUITEM, roles.RADIOBUTTON, roles.SLIDER, roles.SPINBUTTON,
+)
+
+# label objs of an ancestor, with their spatial index;
+# objs are kept by signature of their text span,
+# so to scan again only changed spans after a document update
+class WebCandidateStore:
+
+	__slots__ = ("spans", "labelObjs", "index", "stale")
+
+	def __init__(self):
+		# span signature -> (label obj, its name when found),
+		# or None if not a label, in text order
+		self.spans = {}
+		self.labelObjs = []
+		self.index = None
+		# whether spans must be verified before use
+		self.stale = False
+
+	def scan(self, parent):
+		# (re)build from parent text, reusing label objs of unchanged spans;
+		# returns the number of spans scanned again
+		spans = {}
+		scanned = 0
+		for signature, rect in iterSpans(parent):
+			if signature in self.spans:
+				found = self.spans[signature]
+				# a label re-rendered as a new node, with the same text at the same place,
+				# leaves a dead obj; so reused label objs are verified by name
+				if found and not hasName(*found):
+					found = getStaticChildAndNameAt(rect)
+					scanned += 1
+			else:
+				found = getStaticChildAndNameAt(rect)
+				scanned += 1
+			spans[signature] = found
+		self.spans = spans
+		self.labelObjs = [found[0] for found in spans.values() if found]
+		# rects of spans are those of their objs, no need of locations
+		self.index = GridIndex([RectLTRB(*signature[1]) for signature, found in spans.items() if found])
+		self.stale = False
+		return scanned
+
+# label candidates of an ancestor, from text runs of its treeInterceptor text
+# (see iterFieldLabels), with their spatial index
+class WebFieldStore:
+
+	__slots__ = ("labelObjs", "index", "stale")
+
+	def __init__(self):
+		self.labelObjs = []
+		self.index = None
+		self.stale = False
+
+	def scan(self, parent):
+		# (re)build from parent text, in bulk;
+		# returns the number of text runs found
+		self.labelObjs = list(iterFieldLabels(parent))
+		self.index = GridIndex.fromObjs(self.labelObjs)
+		self.stale = False
+		return len(self.labelObjs)
+
 def getLabelsFromWebContainer(config):
-	# find a labelContainer in obj ancestors that could provide label objs
+	# find a labelContainer in obj ancestors that could provide label objs,
+	# returning them with their spatial index
 	labelObjs = None
+	index = None
 	# obj containing labels as simple text
 	labelContainer = config.labelContainer
 	# obj to label
@@ -37,32 +189,283 @@ def getLabelsFromWebContainer(config):
 	# topmost limit for labelContainer search
 	maxParent = config.maxParent
 	ancestors = [labelContainer] if labelContainer else getReversedAncestors(obj, roleStop=roles.DOCUMENT)
+	treeInterceptor = obj.treeInterceptor
+	if treeInterceptor and not treeInterceptor.isAlive:
+		invalidateWebCache(treeInterceptor)
+	token = getDocumentToken(treeInterceptor)
+	# label objs found by hit tests, or text runs read with fields
+	storeClass = WebFieldStore if config.webExtractor == "fields" else WebCandidateStore
+	# label objs of main thread can't be used by workers, and vice versa
+	mainThread = isMainThread()
 	for ancestor in ancestors:
-		cachedObjs = webCache.get(ancestor, None)
-		tempObjs = [x for x in getAllStaticChildren(ancestor)] if (cachedObjs is None) else cachedObjs
-		if cachedObjs is None:
+		cacheKey = (ancestor, storeClass, mainThread)
+		store = webCache.get(cacheKey, token=token)
+		if store is None:
 			debugLog("Ancestor not cached")
-			webCache[ancestor] = tempObjs
-		if tempObjs:
-			labelObjs = tempObjs
+			count("webCache.misses")
+			# built once, reused for all fields in the same container
+			store = storeClass()
+			with span("enumeration"):
+				store.scan(ancestor)
+			webCache.set(cacheKey, store, token=token, group=treeInterceptor)
+		elif store.stale:
+			debugLog("Ancestor updated")
+			count("webCache.updates")
+			with span("enumeration"):
+				count("webCache.scannedSpans", store.scan(ancestor))
+			# renew its time to live
+			webCache.set(cacheKey, store, token=token, group=treeInterceptor)
+		else:
+			count("webCache.hits")
+		if store.labelObjs:
+			labelObjs, index = store.labelObjs, store.index
 			break
 		if ancestor == maxParent:
 			break
-	return labelObjs
+	return (labelObjs, index)
+
+def getNearestLabelFromWeb(config):
+	# like getLabelsFromWebContainer, but exploring each ancestor
+	# from text offsets around obj, without caching
+	labelContainer = config.labelContainer
+	obj = config.obj
+	maxParent = config.maxParent
+	objRect = obj.location.toLTRB()
+	ancestors = [labelContainer] if labelContainer else getReversedAncestors(obj, roleStop=roles.DOCUMENT)
+	for ancestor in ancestors:
+		explorer = ObjExplorer(objRect, config)
+		explorer.startStream()
+		with span("enumeration"):
+			for offset, rect, child in iterNearestStaticChildren(ancestor, obj, explorer):
+				# rect of offset is already known, no need of child location
+				explorer.consider(rect, child, offset)
+		# without labels around obj here, outer ancestors are tried
+		res = explorer.getStreamedDistanceAndLabelText()
+		if res:
+			return res
+		if ancestor == maxParent:
+			break
+
+# consecutive offsets out of reach, before stopping in a text direction;
+# layout is not always in reading order (e.g. multiple columns)
+streamPatience = 8
+
+def iterNearestStaticChildren(parent, obj, explorer):
+	# yield (offset, RectLTRB, static obj) from the text offset nearest to explorer obj,
+	# moving backward and forward, and stopping each way
+	# when no further offset could give a nearer label
+	if not parent.treeInterceptor:
+		return
+	info = parent.makeTextInfo(textInfos.POSITION_ALL)
+	# offsets of embedded objs, without bounding rects nor hit tests
+	offsets = [offset for offset in info._iterTextWithEmbeddedObjects(False) if isinstance(offset, int)]
+	if not offsets:
+		return
+	objLeft, objTop, objRight, objBottom = explorer.objRect
+	embeddingOffset = getEmbeddingOffset(parent, obj)
+	if embeddingOffset in offsets:
+		start = offsets.index(embeddingOffset)
+	else:
+		start = getNearestOffsetIndex(info, offsets, objTop)
+	# (next index, step, out of reach count) for backward and forward way
+	ways = [[start-1, -1, 0], [start, 1, 0]]
+	while ways:
+		for way in list(ways):
+			index, step, outOfReach = way
+			if not (0 <= index < len(offsets)):
+				ways.remove(way)
+				continue
+			way[0] += step
+			offset = offsets[index]
+			rect = getBoundingRect(info, offset)
+			if not rect:
+				continue
+			# text infos give rects as RectLTWH, explorer checks need LTRB
+			rect = rect.toLTRB()
+			if explorer.couldMatch(rect):
+				way[2] = 0
+				child = getStaticChildAt(rect)
+				if child:
+					yield (offset, rect, child)
+			elif isBeyondReach(explorer, rect, step):
+				way[2] += 1
+				if way[2] >= streamPatience:
+					ways.remove(way)
+
+def isBeyondReach(explorer, rect, step):
+	# whether labels farther than rect in text order
+	# (above for backward, below for forward) could not be nearer than those already found;
+	# rect in LTRB representation
+	objLeft, objTop, objRight, objBottom = explorer.objRect
+	left, top, right, bottom = rect
+	if step < 0:
+		if bottom >= objTop:
+			return False
+		direction, distance = SearchDirections.TOP[0], objTop-bottom
+	else:
+		if top <= objBottom:
+			return False
+		direction, distance = SearchDirections.BOTTOM[0], top-objBottom
+	return (
+		direction not in explorer.checkers
+		or distance > explorer.maxVerticalDistance
+		or explorer.hasNearerThan(direction, distance)
+	)
+
+def getEmbeddingOffset(parent, obj):
+	# offset of embedded char for obj (or its ancestor) in parent text
+	child = obj
+	while child and child.parent != parent:
+		child = child.parent
+	if not child:
+		return None
+	try:
+		return child.IAccessibleObject.QueryInterface(IA2.IAccessibleHyperlink).startIndex
+	except (AttributeError, COMError):
+		return None
+
+def getNearestOffsetIndex(info, offsets, objTop):
+	# binary search of first offset not above obj,
+	# assuming that text order follows vertical order
+	low, high = 0, len(offsets)
+	while low < high:
+		middle = (low+high)//2
+		rect = getBoundingRect(info, offsets[middle])
+		if rect and rect.toLTRB().bottom < objTop:
+			low = middle+1
+		else:
+			high = middle
+	return min(low, len(offsets)-1)
+
+def getBoundingRect(info, offset):
+	try:
+		return info._getBoundingRectFromOffset(offset)
+	except LookupError:  # it happens, for some reason
+		return None
 
 def getAllStaticChildren(parent):
+	for signature, rect in iterSpans(parent):
+		child = getStaticChildAt(rect)
+		if child:
+			yield child
+
+def iterSpans(parent):
+	# yield (signature, rect) for each embedded obj in parent text;
+	# signature is made of its rect and text preceding it,
+	# so without further calls than the rect
 	webParent = parent.treeInterceptor
 	if not webParent:
 		return
 	info = parent.makeTextInfo(textInfos.POSITION_ALL)
-	for offset in info._iterTextWithEmbeddedObjects(False):
-		if not isinstance(offset, int):
+	text = ""
+	for item in info._iterTextWithEmbeddedObjects(False):
+		if not isinstance(item, int):
+			text += item
 			continue
-		try:
-			rect = info._getBoundingRectFromOffset(offset)
-		except LookupError:  # it happens, for some reason
+		rect = getBoundingRect(info, item)
+		precedingText, text = text, ""
+		if rect:
+			yield ((precedingText, tuple(rect.toLTRB())), rect)
+
+def getStaticChildAt(rect):
+	# static text obj with name at rect center, if any
+	found = getStaticChildAndNameAt(rect)
+	return found[0] if found else None
+
+def getStaticChildAndNameAt(rect):
+	# (static text obj, its name) at rect center, if any
+	point = rect.center
+	count("comObjects")
+	child = getNVDAObjectFromPoint(point.x, point.y)
+	if not child or child.role != roles.STATICTEXT:
+		return None
+	name = child.name
+	return (child, name) if name else None
+
+def hasName(obj, name):
+	# whether obj is alive and still with name;
+	# objs of removed nodes fail or give no name
+	try:
+		return obj.name == name
+	except COMError:
+		return False
+
+def iterFieldLabels(parent):
+	# yield a LabelCandidate for each run of static text in parent,
+	# reading treeInterceptor text with its control fields in bulk:
+	# no hit tests and no NVDAObjects, so also labels covered by other content are found;
+	# a run is a line of text between control field boundaries,
+	# outside controls whose text is not a label
+	treeInterceptor = parent.treeInterceptor
+	if not treeInterceptor:
+		return
+	try:
+		info = treeInterceptor.makeTextInfo(parent)
+		with span("textExtraction"):
+			items = info.getTextWithFields()
+	except (LookupError, RuntimeError, COMError):
+		debugLog("No fields for %s", parent)
+		return
+	offset = info._startOffset
+	# for each control field enclosing current text, whether its text is not a label
+	nonLabelFields = []
+	# how many of them
+	nonLabelDepth = 0
+	# text and start offset of current run
+	runText, runStart = "", offset
+	for item in items:
+		if isinstance(item, str):
+			if nonLabelDepth:
+				offset += getOffsetLength(info, item)
+				runText, runStart = "", offset
+				continue
+			for line in item.splitlines(True):
+				runText += line
+				offset += getOffsetLength(info, line)
+				if line.endswith(("\n", "\r")):
+					candidate = getFieldLabel(info, runText, runStart, offset)
+					if candidate:
+						yield candidate
+					runText, runStart = "", offset
 			continue
-		point = rect.center
-		child = getNVDAObjectFromPoint(point.x, point.y)
-		if child and child.role == roles.STATICTEXT and child.name:
-			yield child
+		if not isinstance(item, textInfos.FieldCommand) or item.command not in ("controlStart", "controlEnd"):
+			# format changes do not split runs
+			continue
+		candidate = getFieldLabel(info, runText, runStart, offset)
+		if candidate:
+			yield candidate
+		runText, runStart = "", offset
+		if item.command == "controlStart":
+			isNonLabel = item.field.get("role") in nonLabelRoles
+			nonLabelFields.append(isNonLabel)
+			nonLabelDepth += isNonLabel
+		elif nonLabelFields:
+			nonLabelDepth -= nonLabelFields.pop()
+	candidate = getFieldLabel(info, runText, runStart, offset)
+	if candidate:
+		yield candidate
+
+def getOffsetLength(info, text):
+	# offsets of text infos with wide char encoding count UTF-16 code units
+	if getattr(info, "encoding", None) == "utf_16_le":
+		return len(text.encode("utf_16_le"))//2
+	return len(text)
+
+def getFieldLabel(info, runText, startOffset, endOffset):
+	# LabelCandidate of a text run, with rect enclosing its first and last chars
+	label = runText.strip()
+	if not label:
+		return None
+	# without leading and trailing spaces
+	startOffset += getOffsetLength(info, runText[:len(runText)-len(runText.lstrip())])
+	endOffset -= getOffsetLength(info, runText[len(runText.rstrip()):])
+	firstRect = getBoundingRect(info, startOffset)
+	lastRect = getBoundingRect(info, endOffset-1) if endOffset-1 > startOffset else firstRect
+	if not firstRect or not lastRect:
+		return None
+	firstRect, lastRect = firstRect.toLTRB(), lastRect.toLTRB()
+	count("webFields.runs")
+	return LabelCandidate(label, RectLTRB(
+		min(firstRect.left, lastRect.left), min(firstRect.top, lastRect.top),
+		max(firstRect.right, lastRect.right), max(firstRect.bottom, lastRect.bottom)
+	))
@@ -0,0 +1,187 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# opt-in persistent memory of found labels, for programs where they never change:
+# labels are remembered by control fingerprint, saved to a JSON file,
+# and verified on screen before reuse
+import json
+import os
+import threading
+
+from collections import OrderedDict
+from locationHelper import RectLTRB
+from logHandler import log
+
+from .explorers import LabelResult
+from .tracing import count, span
+from .utils import debugLog, getForegroundObject
+
+
+# strategies whose labels can be remembered
+# (web pages change too often)
+memoryStrategies = ("obj", "text", "uwp")
+
+
+class LabelMemory:
+
+	def __init__(self, path, maxEntries=5000):
+		self.path = path
+		# oldest entries are dropped beyond this limit
+		self.maxEntries = maxEntries
+		# fingerprint -> [distance, label, label rect relative to foreground, strategy]
+		self.entries = OrderedDict()
+		# app name -> number of its entries, to skip fingerprints for apps without them
+		self.appCounts = {}
+		self.lock = threading.Lock()
+		# whether entries changed since last save
+		self.changed = False
+
+	def load(self):
+		try:
+			with open(self.path, encoding="utf-8") as f:
+				entries = json.load(f)
+		except FileNotFoundError:
+			return
+		except (OSError, ValueError):
+			log.error("Unable to load label memory from %s"%self.path, exc_info=True)
+			return
+		with self.lock:
+			self.entries = OrderedDict(entries)
+			self.appCounts = {}
+			for fingerprint in self.entries:
+				self.countApp(fingerprint, 1)
+
+	def countApp(self, fingerprint, delta):
+		# with lock held
+		appName = fingerprint.split("|", 1)[0]
+		appCount = self.appCounts.get(appName, 0)+delta
+		if appCount > 0:
+			self.appCounts[appName] = appCount
+		else:
+			self.appCounts.pop(appName, None)
+
+	def save(self):
+		with self.lock:
+			if not self.changed:
+				return
+			entries = dict(self.entries)
+			self.changed = False
+		tempPath = self.path+".tmp"
+		try:
+			with open(tempPath, "w", encoding="utf-8") as f:
+				json.dump(entries, f, ensure_ascii=False, separators=(",", ":"))
+			os.replace(tempPath, self.path)
+		except OSError:
+			log.error("Unable to save label memory to %s"%self.path, exc_info=True)
+
+	def recall(self, obj, default=None):
+		# remembered result for obj, if still on screen, default otherwise
+		# (also in worker threads, see asyncLabel)
+		# web labels are never remembered, and fingerprint is not cheap
+		if obj.treeInterceptor or obj.appModule.appName not in self.appCounts:
+			count("memory.skipped")
+			return default
+		fg = getForegroundObject()
+		fingerprint = getFingerprint(obj, fg)
+		with self.lock:
+			entry = self.entries.get(fingerprint)
+		if not entry:
+			count("memory.misses")
+			return default
+		distance, label, relativeRect, strategy = entry
+		fgLeft, fgTop = fg.location.left, fg.location.top
+		left, top, right, bottom = relativeRect
+		rect = (left+fgLeft, top+fgTop, right+fgLeft, bottom+fgTop)
+		with span("verification"):
+			isValid = isLabelAt(label, rect, strategy, fg)
+		if not isValid:
+			debugLog("Remembered label not found: %s", label)
+			count("memory.invalid")
+			self.forget(fingerprint)
+			return default
+		count("memory.hits")
+		return LabelResult(distance, label, rect, strategy)
+
+	def remember(self, obj, res):
+		if not res or res.rect is None or res.strategy not in memoryStrategies:
+			return
+		fg = getForegroundObject()
+		fgLeft, fgTop = fg.location.left, fg.location.top
+		left, top, right, bottom = res.rect
+		relativeRect = [left-fgLeft, top-fgTop, right-fgLeft, bottom-fgTop]
+		fingerprint = getFingerprint(obj, fg)
+		with self.lock:
+			if fingerprint not in self.entries:
+				self.countApp(fingerprint, 1)
+			self.entries[fingerprint] = [res[0], res[1], relativeRect, res.strategy]
+			self.entries.move_to_end(fingerprint)
+			while len(self.entries) > self.maxEntries:
+				oldFingerprint, entry = self.entries.popitem(last=False)
+				self.countApp(oldFingerprint, -1)
+			self.changed = True
+
+	def forget(self, fingerprint):
+		with self.lock:
+			if self.entries.pop(fingerprint, None) is not None:
+				self.countApp(fingerprint, -1)
+				self.changed = True
+
+
+def getFingerprint(obj, fg):
+	# app, window class, control ID, role and rect relative to foreground window
+	objRect = obj.location
+	fgRect = fg.location
+	return "%s|%s|%s|%d|%d,%d,%d,%d"%(
+		obj.appModule.appName, obj.windowClassName, obj.windowControlID, obj.role,
+		objRect.left-fgRect.left, objRect.top-fgRect.top, objRect.width, objRect.height
+	)
+
+def isLabelAt(label, rect, strategy, fg):
+	# cheap check that label is still at rect
+	if strategy == "text":
+		from displayModel import DisplayModelTextInfo as DMTI
+		# text drawn in that rect only, from any window of foreground
+		info = DMTI(fg, RectLTRB(*rect))
+		return label.strip() in info.text
+	from NVDAObjects.IAccessible import getNVDAObjectFromPoint
+	left, top, right, bottom = rect
+	# obj created in current thread
+	labelObj = getNVDAObjectFromPoint((left+right)//2, (top+bottom)//2)
+	return bool(labelObj and labelObj.name == label)
+
+def getDefaultPath():
+	import globalVars
+	return os.path.join(globalVars.appArgs.configPath, "labelAutofinderMemory.json")
+
+
+# current memory, when enabled
+labelMemory = None
+
+def enableLabelMemory(path=None, maxEntries=5000):
+	# path: JSON file to use, default in NVDA user config folder
+	global labelMemory
+	disableLabelMemory()
+	labelMemory = LabelMemory(path or getDefaultPath(), maxEntries)
+	labelMemory.load()
+
+def disableLabelMemory(save=True):
+	global labelMemory
+	if labelMemory:
+		if save:
+			labelMemory.save()
+		labelMemory = None
+
+def saveLabelMemory():
+	if labelMemory:
+		labelMemory.save()
+
+def recallResult(obj, default=None):
+	if not labelMemory:
+		return default
+	return labelMemory.recall(obj, default)
+
+def rememberResult(obj, res):
+	if labelMemory:
+		labelMemory.remember(obj, res)
@@ -0,0 +1,171 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# opt-in label prefetch: when a window comes to foreground,
+# labels of its focusable unnamed controls are computed in background,
+# so that a later getLabel for them is just a lookup
+import api
+import comtypes
+import ctypes
+import threading
+import winUser
+
+from .tracing import count, span
+from .utils import debugLog, setThreadForeground
+
+
+# returned for objs without a prefetched result
+# (a prefetched result can be None, when no label was found)
+NOT_PREFETCHED = object()
+
+
+def initWorker():
+	# NVDAObjects are created in worker threads too
+	comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+
+class Prefetcher:
+
+	def __init__(self, maxWorkers=1, maxObjs=200, config=None):
+		# max windows prefetched at the same time
+		self.maxWorkers = maxWorkers
+		# max controls labelled for each window
+		self.maxObjs = maxObjs
+		# config for label search, as for getLabels
+		self.config = config
+		# imported here, prefetch is optional
+		from concurrent.futures import ThreadPoolExecutor
+		self.executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="labelAutofinderPrefetch", initializer=initWorker)
+		self.lock = threading.Lock()
+		# bumped on each foreground change, so work for previous ones stops
+		self.generation = 0
+		self.foregroundHandle = None
+		self.future = None
+		# obj key -> (obj location at prefetch time, result)
+		self.results = {}
+
+	def onForeground(self, fg):
+		with self.lock:
+			if fg.windowHandle == self.foregroundHandle:
+				return
+			self.generation += 1
+			self.foregroundHandle = fg.windowHandle
+			self.results = {}
+			# not yet started, so not needed anymore
+			if self.future:
+				self.future.cancel()
+			self.future = self.executor.submit(self.prefetch, fg.windowHandle, self.generation)
+
+	def isCurrent(self, generation):
+		return generation == self.generation
+
+	def prefetch(self, foregroundHandle, generation):
+		# import here, package imports this module
+		from . import getLabels
+		from NVDAObjects.IAccessible import getNVDAObjectFromEvent
+		debugLog("Prefetching labels for window %s", foregroundHandle)
+		# all objs used here are created in this thread, foreground included
+		fg = getNVDAObjectFromEvent(foregroundHandle, winUser.OBJID_CLIENT, 0)
+		if not fg:
+			return
+		setThreadForeground(fg)
+		try:
+			with span("prefetch"):
+				handles = enumFocusableWindows(foregroundHandle, self.maxObjs)
+				results = getLabels(self.iterObjs(handles, generation), self.config)
+		finally:
+			setThreadForeground(None)
+		with self.lock:
+			if not self.isCurrent(generation):
+				count("prefetch.cancelled")
+				return
+			for obj, res in results.items():
+				self.results[getObjKey(obj)] = (obj.location, res)
+		count("prefetch.objs", len(results))
+
+	def iterObjs(self, handles, generation):
+		# unnamed objs to label, until foreground changes
+		from NVDAObjects.IAccessible import getNVDAObjectFromEvent
+		for handle in handles:
+			if not self.isCurrent(generation):
+				debugLog("Prefetch cancelled")
+				return
+			obj = getNVDAObjectFromEvent(handle, winUser.OBJID_CLIENT, 0)
+			if obj and not obj.name:
+				yield obj
+
+	def lookup(self, obj, config):
+		# results are valid only for the config used to prefetch them
+		if not isSameConfig(config, self.config):
+			return NOT_PREFETCHED
+		with self.lock:
+			entry = self.results.get(getObjKey(obj))
+		# moved controls could have another label
+		if not entry or entry[0] != obj.location:
+			count("prefetch.misses")
+			return NOT_PREFETCHED
+		count("prefetch.hits")
+		return entry[1]
+
+	def stop(self):
+		with self.lock:
+			self.generation += 1
+			self.foregroundHandle = None
+			self.results = {}
+		self.executor.shutdown(wait=False)
+
+
+def getObjKey(obj):
+	# same for objs created for the same control,
+	# e.g. in prefetch and in focus event
+	return (obj.windowHandle, getattr(obj, "event_objectID", None), getattr(obj, "event_childID", None))
+
+def isSameConfig(config, otherConfig):
+	# whether configs (or None, for default one) have the same values
+	values = dict(config.config) if config else {}
+	otherValues = dict(otherConfig.config) if otherConfig else {}
+	return values == otherValues
+
+def enumFocusableWindows(parent, maxWindows):
+	# handles of visible and enabled windows with WS_TABSTOP style
+	from .labelFromObj import WNDENUMPROC
+	results = []
+	@WNDENUMPROC
+	def callback(window, data):
+		if (
+			winUser.isWindowVisible(window)
+			and winUser.isWindowEnabled(window)
+			and winUser.getWindowStyle(window) & winUser.WS_TABSTOP
+		):
+			results.append(window)
+		return len(results) < maxWindows
+	with span("enumeration"):
+		ctypes.windll.user32.EnumChildWindows(parent, callback, 0)
+	return results
+
+
+# current prefetcher, when enabled
+prefetcher = None
+
+def enablePrefetch(maxWorkers=1, maxObjs=200, config=None):
+	global prefetcher
+	disablePrefetch()
+	prefetcher = Prefetcher(maxWorkers, maxObjs, config)
+
+def disablePrefetch():
+	global prefetcher
+	if prefetcher:
+		prefetcher.stop()
+		prefetcher = None
+
+def prefetchForeground(fg=None):
+	# to call from event_foreground, when prefetch is enabled
+	if prefetcher:
+		prefetcher.onForeground(fg or api.getForegroundObject())
+
+def getPrefetchedResult(obj, config=None):
+	if not prefetcher:
+		return NOT_PREFETCHED
+	return prefetcher.lookup(obj, config)
@@ -0,0 +1,170 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# opt-in memo of getLabel results, for controls whose label is read again and again
+# (e.g. by _get_name of overlay classes): results are kept by control identity and config,
+# and searched again when the control or its container moves
+import threading
+
+from NVDAObjects import NVDAObject
+
+from .cache import LRUCache
+from .prefetch import getObjKey
+from .search import SearchConfig
+from .tracing import count
+from .utils import getForegroundObject
+
+
+# returned for objs without a cached result
+# (a cached result can be None, when no label was found)
+NOT_CACHED = object()
+
+
+def getObjIdentity(obj):
+	# the same for objs created again for the same control,
+	# None when unknown (so obj is not cached)
+	UIAElement = getattr(obj, "UIAElement", None)
+	if UIAElement is not None:
+		# runtime ID is read once for each obj
+		identity = getattr(obj, "_labelAutofinderIdentity", None)
+		if identity is None:
+			try:
+				identity = ("UIA", tuple(UIAElement.GetRuntimeId()))
+			except Exception:
+				return None
+			obj._labelAutofinderIdentity = identity
+		return identity
+	key = getObjKey(obj)
+	if key[1] is None or key[2] is None:
+		return None
+	return key
+
+def getConfigKey(config):
+	# resolved config values (defaults included) as hashable tuple,
+	# objs replaced by their identity; None if config has objs without identity;
+	# values that could need foreground (e.g. sys.maxsize distances) are kept as passed
+	global defaultConfigKey
+	if config is None and defaultConfigKey is not None:
+		return defaultConfigKey
+	isDefault = config is None
+	config = SearchConfig(oldConfig=config)
+	values = config.config
+	items = [
+		config.strategy, config.directions, config.webExtractor, config.textExtractor,
+		values.get("maxHorizontalDistance") if isinstance(values.get("maxHorizontalDistance"), int) else None,
+		values.get("maxVerticalDistance") if isinstance(values.get("maxVerticalDistance"), int) else None,
+	]
+	for key in ("labelContainer", "maxParent"):
+		value = values.get(key)
+		if isinstance(value, NVDAObject):
+			value = getObjIdentity(value)
+			if value is None:
+				return None
+		else:
+			value = None
+		items.append(value)
+	if isDefault:
+		defaultConfigKey = tuple(items)
+	return tuple(items)
+
+# key of default config, computed once (it never changes)
+defaultConfigKey = None
+
+def getContainer(config):
+	# what label is searched into: labelContainer or maxParent, when provided,
+	# foreground otherwise
+	if config is not None:
+		for key in ("labelContainer", "maxParent"):
+			value = config.config.get(key)
+			if isinstance(value, NVDAObject):
+				return value
+	return getForegroundObject()
+
+
+# current cache, when enabled
+resultCache = None
+# container identity -> container location, read once
+# while the same window is in foreground (or until invalidateResultCache)
+containerRects = {}
+containerForeground = None
+# also used by worker threads (see asyncLabel)
+containerLock = threading.Lock()
+
+def enableResultCache(maxSize=256, ttl=5):
+	# maxSize: max results kept; ttl: seconds after which a result is searched again anyway,
+	# for labels changing without moving (None to keep results until obj moves)
+	global resultCache
+	resultCache = LRUCache(maxSize, ttl)
+	invalidateContainerRects()
+
+def disableResultCache():
+	global resultCache
+	resultCache = None
+	invalidateContainerRects()
+
+def invalidateResultCache():
+	# to call when labels change in place, e.g. after a language switch of the program,
+	# or when a container moves without foreground changes
+	if resultCache is not None:
+		resultCache.clear()
+	invalidateContainerRects()
+
+def invalidateContainerRects():
+	global containerForeground
+	with containerLock:
+		containerRects.clear()
+		containerForeground = None
+
+def getContainerRect(container, containerIdentity):
+	global containerForeground
+	fgHandle = getForegroundObject().windowHandle
+	with containerLock:
+		if fgHandle != containerForeground:
+			# rects of another foreground window
+			containerRects.clear()
+			containerForeground = fgHandle
+		rect = containerRects.get(containerIdentity)
+	if rect is None:
+		rect = container.location
+		with containerLock:
+			if fgHandle == containerForeground:
+				containerRects[containerIdentity] = rect
+	return rect
+
+def getResultCacheEntry(obj, config):
+	# (key, token) to look up and store result of obj, or None if it can't be cached;
+	# token is the location of obj and its container, so that moving invalidates result
+	if resultCache is None or obj is None:
+		return None
+	identity = getObjIdentity(obj)
+	if identity is None:
+		return None
+	configKey = getConfigKey(config)
+	if configKey is None:
+		return None
+	container = getContainer(config)
+	containerIdentity = getObjIdentity(container)
+	if containerIdentity is None:
+		return None
+	objRect = obj.location
+	if not objRect:
+		return None
+	return ((identity, configKey), (objRect, containerIdentity, getContainerRect(container, containerIdentity)))
+
+def getCachedResult(entry):
+	# cache could be disabled meanwhile, e.g. from another thread
+	cache = resultCache
+	if cache is None:
+		return NOT_CACHED
+	key, token = entry
+	res = cache.get(key, NOT_CACHED, token)
+	count("resultCache.misses" if res is NOT_CACHED else "resultCache.hits")
+	return res
+
+def cacheResult(entry, res):
+	cache = resultCache
+	if cache is not None:
+		key, token = entry
+		cache.set(key, res, token)
@@ -6,9 +6,12 @@
 import api
 import sys
 
+from types import MappingProxyType
+
 from NVDAObjects import NVDAObject
 
-from .utils import debugLog
+from .strategies import getStrategyNames
+from .utils import debugLog, getForegroundObject
 
 
 # class to collect useful search direction tuples
@@ -35,7 +38,8 @@ class SearchConfig:
 		# obj: based to static objs with the label as name (verify with object review);
 		# text: based to text retrieval from parent obj containing labels as simple text (verify with screen review);
 		# uwp: based to UIA TextBlock objs with label as name in UWP applications (verify with object review);
-		# web: based to treeInterceptor presence (very similar to obj, but into web pages)
+		# web: based to treeInterceptor presence (very similar to obj, but into web pages);
+		# or any strategy added with registerStrategy
 		"strategy",
 		# (text and web strategy) obj that contains the label
 		"labelContainer",
@@ -48,13 +52,24 @@ class SearchConfig:
 		# max horizontal distance between an obj point (left or right) and the outside comparison point
 		"maxHorizontalDistance",
 		# max vertical distance between an obj point (top or bottom) and the outside comparison point
-		"maxVerticalDistance"
+		"maxVerticalDistance",
+		# (web strategy) how to find label objs in labelContainer
+		# hitTest (default): all objs at text offsets of labelContainer, cached for next searches;
+		# nearest: only objs around obj to label, starting from the nearest text offset;
+		# fields: text runs of labelContainer, read in bulk with their rects, without objs
+		"webExtractor",
+		# (text strategy) which text to read from labelContainer
+		# whole (default): all text of labelContainer, reused for next searches in the same window;
+		# region: only text around obj to label, according to directions and max distances
+		"textExtractor",
 	)
 
 	def __init__(self, oldConfig=None, **kwargs):
 		self.config = {}
+		# foreground obj, retrieved once during resolve
+		self._foreground = None
 		# derive from an old config
-		if isinstance(oldConfig, SearchConfig):
+		if isinstance(oldConfig, (SearchConfig, ResolvedSearchConfig)):
 			self.config = {k:v for k,v in oldConfig.config.items() if k in self.configKeys}
 		# integrate new passed values
 		# overriding those already present
@@ -63,6 +78,15 @@ class SearchConfig:
 			if val:
 				self.config[key] = val
 
+	def resolve(self):
+		# evaluate all values once, into an immutable snapshot
+		resolving = SearchConfig(oldConfig=self)
+		resolving._foreground = getForegroundObject()
+		return ResolvedSearchConfig(resolving)
+
+	def getForeground(self):
+		return self._foreground or getForegroundObject()
+
 	@property
 	def obj(self):
 		val = self.config.get("obj", None)
@@ -76,7 +100,7 @@ class SearchConfig:
 	@property
 	def strategy(self):
 		val = self.config.get("strategy", None)
-		if val in ("auto", "obj", "text", "uwp", "web"):
+		if val == "auto" or val in getStrategyNames():
 			return val
 		return "auto"
 
@@ -95,7 +119,7 @@ class SearchConfig:
 			return val
 		if self.strategy == "web":
 			return None
-		fg = api.getForegroundObject()
+		fg = self.getForeground()
 		if self.strategy == "uwp":
 			for child in fg.children:
 				if child.windowClassName == "Windows.UI.Core.CoreWindow":
@@ -105,7 +129,7 @@ class SearchConfig:
 	@property
 	def directions(self):
 		val = self.config.get("directions", None)
-		if isinstance(val, tuple) and all([isinstance(i, int) for i in val]):
+		if isinstance(val, tuple) and all(isinstance(i, int) for i in val):
 			return val
 		# labels are usally on left, or top
 		return SearchDirections.LEFT_TOP
@@ -115,7 +139,7 @@ class SearchConfig:
 		val = self.config.get("maxHorizontalDistance", None)
 		if isinstance(val, int):
 			if val == sys.maxsize and self.strategy in ("obj", "text", "uwp", "web"):
-				fg = api.getForegroundObject()
+				fg = self.getForeground()
 				return fg.location.width if self.strategy != "text" else 10000
 			return val
 		elif self.strategy == "auto":
@@ -131,10 +155,10 @@ class SearchConfig:
 
 	@property
 	def maxVerticalDistance(self):
-		val = self.config.get("maxHorizontalDistance", None)
+		val = self.config.get("maxVerticalDistance", None)
 		if isinstance(val, int):
 			if val == sys.maxsize and self.strategy in ("obj", "text", "uwp", "web"):
-				fg = api.getForegroundObject()
+				fg = self.getForeground()
 				return fg.location.height if self.strategy != "text" else 10000
 			return val
 		elif self.strategy == "auto":
@@ -146,3 +170,54 @@ class SearchConfig:
 			return 150
 		elif self.strategy == "text":
 			return None
+
+	@property
+	def webExtractor(self):
+		val = self.config.get("webExtractor", None)
+		if val in ("hitTest", "nearest", "fields"):
+			return val
+		return "hitTest"
+
+	@property
+	def textExtractor(self):
+		val = self.config.get("textExtractor", None)
+		if val in ("whole", "region"):
+			return val
+		return "whole"
+
+
+# immutable snapshot of a SearchConfig, with all values evaluated once
+# (see SearchConfig.resolve), to read as plain attributes
+class ResolvedSearchConfig:
+
+	__slots__ = ("config", *SearchConfig.configKeys)
+
+	def __init__(self, searchConfig):
+		# original values, to derive other configs
+		object.__setattr__(self, "config", MappingProxyType(dict(searchConfig.config)))
+		for key in SearchConfig.configKeys:
+			object.__setattr__(self, key, getattr(searchConfig, key))
+
+	def __setattr__(self, name, value):
+		raise AttributeError("ResolvedSearchConfig is immutable, derive a new SearchConfig instead")
+
+	def __delattr__(self, name):
+		raise AttributeError("ResolvedSearchConfig is immutable, derive a new SearchConfig instead")
+
+	def __repr__(self):
+		values = ", ".join("%s=%r"%(key, getattr(self, key)) for key in SearchConfig.configKeys)
+		return "ResolvedSearchConfig(%s)"%values
+
+	def resolve(self):
+		return self
+
+
+# to get a resolved config for a strategy, reusing passed config when possible
+def resolveConfig(config, obj=None, strategy=None):
+	if (
+		isinstance(config, ResolvedSearchConfig)
+		and (strategy is None or config.strategy == strategy)
+		and (obj is None or config.obj is obj)
+	):
+		return config
+	return SearchConfig(oldConfig=config, obj=obj, strategy=strategy).resolve()
@@ -0,0 +1,230 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+from .search import SearchDirections
+
+
+# uniform grid of label (or char) rects, to build once per container
+# and query for each obj to label, instead of scanning all rects;
+# query returns indexes of rects that may pass explorer checks,
+# explorers still run their exact checks on them
+class GridIndex:
+
+	# cell side, in pixels
+	defaultCellSize = 64
+
+	def __init__(self, rects, cellSize=None):
+		# rects in (left, top, right, bottom) representation
+		self.rects = rects
+		self.cellSize = cellSize or self.defaultCellSize
+		# (column, row) -> indexes of rects overlapping that cell
+		self.cells = {}
+		# max rect height, used for char checks without max vertical distance
+		self.maxHeight = 0
+		# grid bounds, in cells
+		self.bounds = None
+		for index, rect in enumerate(rects):
+			left, top, right, bottom = rect
+			self.maxHeight = max(self.maxHeight, bottom-top)
+			firstColumn, firstRow, lastColumn, lastRow = self.toCells(rect)
+			for column in range(firstColumn, lastColumn+1):
+				for row in range(firstRow, lastRow+1):
+					self.cells.setdefault((column, row), []).append(index)
+			if not self.bounds:
+				self.bounds = [firstColumn, firstRow, lastColumn, lastRow]
+			else:
+				self.bounds = [min(self.bounds[0], firstColumn), min(self.bounds[1], firstRow), max(self.bounds[2], lastColumn), max(self.bounds[3], lastRow)]
+
+	@classmethod
+	def fromObjs(cls, labelObjs, cellSize=None):
+		return cls([labelObj.location.toLTRB() for labelObj in labelObjs], cellSize)
+
+	def __len__(self):
+		return len(self.rects)
+
+	def toCells(self, rect):
+		# cells (inclusive) covered by a rect
+		left, top, right, bottom = rect
+		cellSize = self.cellSize
+		return (left//cellSize, top//cellSize, right//cellSize, bottom//cellSize)
+
+	def getSearchRects(self, objRect, directions, maxHorizontalDistance, maxVerticalDistance):
+		# areas where a label rect must have at least a point
+		# to pass checks in each direction
+		objLeft, objTop, objRight, objBottom = objRect
+		if not maxVerticalDistance:
+			# char checks use char height in this case
+			maxVerticalDistance = self.maxHeight
+		searchRects = []
+		for direction in directions:
+			if direction in SearchDirections.LEFT:
+				searchRects.append((objLeft-maxHorizontalDistance, objTop, objRight, objBottom))
+			elif direction in SearchDirections.TOP:
+				searchRects.append((objLeft, objTop-maxVerticalDistance, objRight, objTop))
+			elif direction in SearchDirections.RIGHT:
+				searchRects.append((objLeft, objTop, objRight+maxHorizontalDistance, objBottom))
+			elif direction in SearchDirections.BOTTOM:
+				searchRects.append((objLeft, objBottom, objRight, objBottom+maxVerticalDistance))
+		return searchRects
+
+	def query(self, objRect, directions, maxHorizontalDistance, maxVerticalDistance):
+		# returns sorted indexes of candidate rects,
+		# to preserve the original order in explorers
+		if not self.bounds:
+			return []
+		minColumn, minRow, maxColumn, maxRow = self.bounds
+		found = set()
+		for searchRect in self.getSearchRects(objRect, directions, maxHorizontalDistance, maxVerticalDistance):
+			firstColumn, firstRow, lastColumn, lastRow = self.toCells(searchRect)
+			# restrict to populated area
+			firstColumn, firstRow = max(firstColumn, minColumn), max(firstRow, minRow)
+			lastColumn, lastRow = min(lastColumn, maxColumn), min(lastRow, maxRow)
+			if firstColumn > lastColumn or firstRow > lastRow:
+				continue
+			if (lastColumn-firstColumn+1)*(lastRow-firstRow+1) > len(self.cells):
+				# huge search area (e.g. with sys.maxsize distances),
+				# cheaper to visit populated cells only
+				for (column, row), indexes in self.cells.items():
+					if firstColumn <= column <= lastColumn and firstRow <= row <= lastRow:
+						found.update(indexes)
+				continue
+			for column in range(firstColumn, lastColumn+1):
+				for row in range(firstRow, lastRow+1):
+					indexes = self.cells.get((column, row))
+					if indexes:
+						found.update(indexes)
+		return sorted(found)
+
+
+# char rects of a labelContainer as int columns (16 bytes per char),
+# instead of a list of rect objects; to convert once per text snapshot.
+# Items are (left, top, right, bottom) tuples, like rect objects,
+# but explorers and indexes read columns directly
+class CharRectArray:
+
+	__slots__ = ("lefts", "tops", "rights", "bottoms")
+
+	def __init__(self, charRects=()):
+		# flatten in C, then split in columns
+		# (from a list, faster than from an iterator)
+		flatRects = array("i", list(chain.from_iterable(charRects)))
+		self.lefts = flatRects[0::4]
+		self.tops = flatRects[1::4]
+		self.rights = flatRects[2::4]
+		self.bottoms = flatRects[3::4]
+
+	@property
+	def columns(self):
+		return (self.lefts, self.tops, self.rights, self.bottoms)
+
+	def __len__(self):
+		return len(self.lefts)
+
+	def __getitem__(self, offset):
+		if isinstance(offset, slice):
+			return self.select(range(len(self))[offset])
+		return (self.lefts[offset], self.tops[offset], self.rights[offset], self.bottoms[offset])
+
+	def __iter__(self):
+		return zip(self.lefts, self.tops, self.rights, self.bottoms)
+
+	def __eq__(self, other):
+		if not isinstance(other, CharRectArray):
+			return NotImplemented
+		return self.columns == other.columns
+
+	def index(self, rect):
+		# offset of first rect equal to rect, as list.index
+		left, top, right, bottom = rect
+		for offset, item in enumerate(self):
+			if item == (left, top, right, bottom):
+				return offset
+		raise ValueError("rect not found")
+
+	def select(self, offsets):
+		# new array with rects at offsets only
+		selected = CharRectArray()
+		for column, selectedColumn in zip(self.columns, selected.columns):
+			selectedColumn.extend(column[offset] for offset in offsets)
+		return selected
+
+	def iterItems(self, offsets=None):
+		# (offset, rect) pairs, for all rects or those at offsets
+		if offsets is None:
+			return enumerate(self)
+		lefts, tops, rights, bottoms = self.columns
+		return ((offset, (lefts[offset], tops[offset], rights[offset], bottoms[offset])) for offset in offsets)
+
+
+# index of char rects grouped by rows (same bottom),
+# with chars of each row sorted by left and right;
+# left/right queries are binary searches into rows overlapping obj,
+# top/bottom queries touch adjacent rows only
+class RowIndex:
+
+	def __init__(self, charRects):
+		if not isinstance(charRects, CharRectArray):
+			charRects = CharRectArray(charRects)
+		self.rects = charRects
+		lefts, tops, rights, bottoms = charRects.columns
+		# max char height, used for checks without max vertical distance
+		self.maxHeight = max(map(int.__sub__, bottoms, tops), default=0)
+		rows = {}
+		for offset, bottom in enumerate(bottoms):
+			rows.setdefault(bottom, []).append(offset)
+		# sorted row bottoms, and for each row, as int arrays
+		# (sorted lefts, offsets by left, sorted rights, offsets by right)
+		self.bottoms = array("i", sorted(rows))
+		self.rows = []
+		for bottom in self.bottoms:
+			offsets = rows[bottom]
+			byLeft = array("i", sorted(offsets, key=lefts.__getitem__))
+			byRight = array("i", sorted(offsets, key=rights.__getitem__))
+			self.rows.append((
+				array("i", map(lefts.__getitem__, byLeft)), byLeft,
+				array("i", map(rights.__getitem__, byRight)), byRight,
+			))
+
+	def __len__(self):
+		return len(self.rects)
+
+	def getRows(self, minBottom, maxBottom):
+		# rows with minBottom < bottom <= maxBottom
+		first = bisect_right(self.bottoms, minBottom)
+		last = bisect_right(self.bottoms, maxBottom)
+		return self.rows[first:last]
+
+	def query(self, objRect, directions, maxHorizontalDistance, maxVerticalDistance):
+		# returns sorted offsets of chars that may pass CharExplorer checks
+		objLeft, objTop, objRight, objBottom = objRect
+		if not maxVerticalDistance:
+			# checks use char height in this case
+			maxVerticalDistance = self.maxHeight
+		found = []
+		for direction in directions:
+			if direction in SearchDirections.LEFT:
+				# rights in [objLeft-maxHorizontalDistance, objLeft)
+				for lefts, byLeft, rights, byRight in self.getRows(objTop, objBottom):
+					found.extend(byRight[bisect_left(rights, objLeft-maxHorizontalDistance):bisect_left(rights, objLeft)])
+			elif direction in SearchDirections.RIGHT:
+				# lefts in (objRight, objRight+maxHorizontalDistance]
+				for lefts, byLeft, rights, byRight in self.getRows(objTop, objBottom):
+					found.extend(byLeft[bisect_right(lefts, objRight):bisect_right(lefts, objRight+maxHorizontalDistance)])
+			else:
+				if direction in SearchDirections.TOP:
+					# bottoms in [objTop-maxVerticalDistance, objTop)
+					rows = self.getRows(objTop-maxVerticalDistance-1, objTop-1)
+				else:
+					# tops in (objBottom, objBottom+maxVerticalDistance],
+					# so bottoms no further than a char height
+					rows = self.getRows(objBottom, objBottom+maxVerticalDistance+self.maxHeight)
+				# lefts in [objLeft, objRight)
+				for lefts, byLeft, rights, byRight in rows:
+					found.extend(byLeft[bisect_left(lefts, objLeft):bisect_left(lefts, objRight)])
+		return sorted(set(found))
@@ -0,0 +1,69 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# registry of label search strategies, used by getLabel to dispatch;
+# a strategy is a function that gets (obj, config) and returns
+# a (distance, label) tuple, or None if no label is found;
+# it can have an overview function too, that gets (obj, config, k)
+# and returns up to k (distance, label) tuples for each direction
+import importlib
+
+
+# strategy name -> label function,
+# or "module:function" path, imported at first use
+# (module is relative to this package, if starting with a dot)
+registry = {
+	"obj": ".labelFromObj:getLabelFromObj",
+	"text": ".labelFromText:getLabelFromText",
+	"uwp": ".labelFromUWPObj:getLabelFromUWPObj",
+	"web": ".labelFromWeb:getLabelFromWeb",
+}
+
+# builtin label functions, that accept also data shared between objs by getLabels
+# (strategies replaced with registerStrategy get just obj and config)
+builtinRegistry = dict(registry)
+
+# strategy name -> overview function, as above
+overviewRegistry = {
+	"obj": ".labelFromObj:getOverviewFromObj",
+	"text": ".labelFromText:getOverviewFromText",
+	"uwp": ".labelFromUWPObj:getOverviewFromUWPObj",
+	"web": ".labelFromWeb:getOverviewFromWeb",
+}
+
+def registerStrategy(name, func, overviewFunc=None):
+	# to add (or replace) a strategy, usable as strategy in SearchConfig;
+	# func and overviewFunc can be functions or "module:function" paths
+	if name == "auto":
+		raise ValueError("auto is not a strategy, but the detection of one")
+	registry[name] = func
+	if overviewFunc is None:
+		overviewRegistry.pop(name, None)
+	else:
+		overviewRegistry[name] = overviewFunc
+
+def getStrategyFunction(name):
+	return loadFunction(registry, name, "Unknown strategy: %s")
+
+def isBuiltinStrategy(name, func):
+	# whether func is the builtin label function of strategy name
+	return name in builtinRegistry and func is loadFunction(builtinRegistry, name, "Unknown strategy: %s")
+
+def getOverviewFunction(name):
+	return loadFunction(overviewRegistry, name, "No overview for strategy: %s")
+
+def loadFunction(functions, name, errorMessage):
+	func = functions.get(name)
+	if func is None:
+		raise LookupError(errorMessage%name)
+	if isinstance(func, str):
+		moduleName, funcName = func.split(":")
+		module = importlib.import_module(moduleName, __package__)
+		func = getattr(module, funcName)
+		functions[name] = func
+	return func
+
+def getStrategyNames():
+	return tuple(registry)
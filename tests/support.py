@@ -0,0 +1,42 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# shared setup of tests: the module is loaded as in benchmarks,
+# with stand-in versions of NVDA modules
+import os
+import sys
+
+benchmarksDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+if benchmarksDir not in sys.path:
+	sys.path.insert(0, benchmarksDir)
+
+import environment
+
+laf = environment.loadPackage()
+
+
+# minimal config for explorers
+class ExplorerConfig:
+
+	def __init__(self, directions, maxHorizontalDistance, maxVerticalDistance):
+		self.directions = directions
+		self.maxHorizontalDistance = maxHorizontalDistance
+		self.maxVerticalDistance = maxVerticalDistance
+
+
+# direction sets to try, from search.SearchDirections
+directionSets = ((0,), (1,), (2,), (3,), (0, 1), (0, 2), (1, 3), (0, 1, 2, 3))
+
+def randomScene(rng, rectsNumber, maxVerticalDistances=(5, 100)):
+	# obj rect, label (or char) rects and explorer config,
+	# all in (left, top, right, bottom) representation
+	rects = []
+	for n in range(rectsNumber):
+		left, top = rng.randint(0, 400), rng.randint(0, 400)
+		rects.append((left, top, left+rng.randint(0, 60), top+rng.randint(0, 20)))
+	left, top = rng.randint(50, 300), rng.randint(50, 300)
+	objRect = (left, top, left+rng.randint(1, 80), top+rng.randint(1, 25))
+	config = ExplorerConfig(rng.choice(directionSets), rng.choice((8, 100, sys.maxsize)), rng.choice(maxVerticalDistances))
+	return objRect, rects, config
@@ -0,0 +1,132 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import threading
+import time
+import unittest
+
+from support import laf
+
+import layouts
+import queueHandler
+
+from labelAutofinderCore import asyncLabel, strategies, tracing
+from labelAutofinderCore.search import SearchConfig
+
+
+class AsyncLabelTest(unittest.TestCase):
+
+	def setUp(self):
+		self.fg, self.objs = layouts.makeDialog(4)
+		# (obj, label, in main thread) for each callback
+		self.delivered = []
+		# gated strategy: its searches start, then wait for the gate
+		self.started = threading.Event()
+		self.gate = threading.Event()
+		strategies.registerStrategy("gated", self.gatedStrategy)
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		self.gate.set()
+		laf.stopLabelAsync()
+		strategies.registry.pop("gated")
+		tracing.ENABLED = False
+		queueHandler.pumpAll()
+
+	def gatedStrategy(self, obj, config):
+		self.started.set()
+		self.gate.wait(5)
+		return (1, "Gated")
+
+	def callback(self, obj, label):
+		self.delivered.append((obj, label, threading.current_thread() is threading.main_thread()))
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def pumpUntil(self, condition):
+		# plays NVDA main loop, until condition or a generous limit
+		end = time.monotonic()+5
+		while not condition() and time.monotonic() < end:
+			queueHandler.pumpAll()
+			time.sleep(0.005)
+		self.assertTrue(condition())
+
+	def testDelivered(self):
+		request = laf.getLabelAsync(self.objs[1], callback=self.callback)
+		self.pumpUntil(lambda: self.delivered)
+		self.assertEqual(self.delivered, [(self.objs[1], "Label 1", True)])
+		self.assertEqual(request.state, asyncLabel.DONE)
+
+	def testSuperseded(self):
+		first = laf.getLabelAsync(self.objs[1], callback=self.callback)
+		second = laf.getLabelAsync(self.objs[1], callback=self.callback, overview=True)
+		# superseded at once, without callback
+		self.assertEqual(first.state, asyncLabel.SUPERSEDED)
+		self.pumpUntil(lambda: self.delivered)
+		self.assertEqual(self.delivered, [(self.objs[1], laf.getLabel(self.objs[1], overview=True), True)])
+		self.assertEqual(second.state, asyncLabel.DONE)
+		self.assertEqual(self.getCount("async.superseded"), 1)
+
+	def testTimedOut(self):
+		slow = laf.getLabelAsync(self.objs[0], SearchConfig(strategy="gated"), callback=self.callback, timeout=0.01)
+		# timeout handled when search is surely running
+		self.assertTrue(self.started.wait(5))
+		self.pumpUntil(lambda: self.delivered)
+		self.assertEqual(self.delivered, [(self.objs[0], None, True)])
+		self.assertEqual(slow.state, asyncLabel.TIMED_OUT)
+		self.assertEqual(self.getCount("async.abandonedWorkers"), 1)
+		# the blocked worker doesn't block later requests
+		later = laf.getLabelAsync(self.objs[1], callback=self.callback)
+		self.pumpUntil(lambda: len(self.delivered) == 2)
+		self.assertEqual(self.delivered[1], (self.objs[1], "Label 1", True))
+		self.assertEqual(later.state, asyncLabel.DONE)
+		# and its late result is dropped
+		self.gate.set()
+		self.pumpUntil(lambda: self.getCount("async.dropped") == 1)
+		self.assertEqual(len(self.delivered), 2)
+
+	def testAbandonedLimit(self):
+		asyncLabel.maxAbandonedWorkers = 1
+		self.addCleanup(setattr, asyncLabel, "maxAbandonedWorkers", 2)
+		laf.getLabelAsync(self.objs[0], SearchConfig(strategy="gated"), callback=self.callback, timeout=0.01)
+		self.assertTrue(self.started.wait(5))
+		self.pumpUntil(lambda: self.delivered)
+		# no new thread while the abandoned search runs
+		skipped = laf.getLabelAsync(self.objs[1], callback=self.callback)
+		self.assertEqual(skipped.state, asyncLabel.SKIPPED)
+		self.assertIsNone(skipped.future)
+		self.pumpUntil(lambda: len(self.delivered) == 2)
+		self.assertEqual(self.delivered[1], (self.objs[1], None, True))
+		self.assertEqual(self.getCount("async.skipped"), 1)
+		# once it ends, searches start again
+		self.gate.set()
+		self.pumpUntil(lambda: not asyncLabel.labeller.isAtAbandonedLimit())
+		later = laf.getLabelAsync(self.objs[1], callback=self.callback)
+		self.pumpUntil(lambda: len(self.delivered) == 3)
+		self.assertEqual(self.delivered[2], (self.objs[1], "Label 1", True))
+		self.assertEqual(later.state, asyncLabel.DONE)
+
+	def testCancelled(self):
+		slow = laf.getLabelAsync(self.objs[0], SearchConfig(strategy="gated"), callback=self.callback, timeout=None)
+		self.assertTrue(self.started.wait(5))
+		# waiting behind the slow one, with one worker
+		waiting = laf.getLabelAsync(self.objs[1], callback=self.callback, timeout=None)
+		waiting.cancel()
+		self.assertEqual(waiting.state, asyncLabel.CANCELLED)
+		self.assertTrue(waiting.future.cancelled())
+		self.gate.set()
+		self.pumpUntil(lambda: self.delivered)
+		self.assertEqual(self.delivered, [(self.objs[0], "Gated", True)])
+		self.assertEqual(slow.state, asyncLabel.DONE)
+
+	def testCallbackRequired(self):
+		with self.assertRaises(TypeError):
+			laf.getLabelAsync(self.objs[0])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import unittest
+
+from unittest import mock
+
+from support import laf
+
+from labelAutofinderCore.cache import LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+
+	def testEvictsLeastRecentlyUsed(self):
+		cache = LRUCache(maxSize=2)
+		cache.set("a", 1)
+		cache.set("b", 2)
+		# "a" becomes the most recently used
+		self.assertEqual(cache.get("a"), 1)
+		cache.set("c", 3)
+		self.assertNotIn("b", cache)
+		self.assertEqual(cache.get("a"), 1)
+		self.assertEqual(cache.get("c"), 3)
+		self.assertEqual(cache.evictions, 1)
+
+	def testCachedNone(self):
+		cache = LRUCache()
+		missing = object()
+		cache.set("a", None)
+		self.assertIsNone(cache.get("a", missing))
+		self.assertIs(cache.get("b", missing), missing)
+		# empty cache is falsy, callers must check for None
+		self.assertFalse(LRUCache())
+
+	def testTtl(self):
+		cache = LRUCache(ttl=5)
+		with mock.patch("time.monotonic", return_value=100.0):
+			cache.set("a", 1)
+		with mock.patch("time.monotonic", return_value=104.0):
+			self.assertEqual(cache.get("a"), 1)
+		with mock.patch("time.monotonic", return_value=105.5):
+			self.assertIsNone(cache.get("a"))
+		self.assertEqual(cache.expirations, 1)
+		self.assertEqual(len(cache), 0)
+
+	def testToken(self):
+		cache = LRUCache()
+		cache.set("a", 1, token=(0, 0))
+		self.assertEqual(cache.get("a", token=(0, 0)), 1)
+		# without token, not checked
+		self.assertEqual(cache.get("a"), 1)
+		self.assertIsNone(cache.get("a", token=(1, 0)))
+		# stale entry is dropped
+		self.assertNotIn("a", cache)
+		self.assertEqual(cache.invalidations, 1)
+
+	def testGroups(self):
+		cache = LRUCache()
+		cache.set("a", 1, group="x")
+		cache.set("b", 2, group="y")
+		cache.set("c", 3, group="x")
+		self.assertEqual(cache.values("x"), [1, 3])
+		self.assertEqual(cache.values(), [1, 2, 3])
+		cache.invalidateGroup("x")
+		self.assertEqual(cache.values(), [2])
+		self.assertEqual(cache.invalidations, 2)
+
+	def testStats(self):
+		cache = LRUCache(maxSize=1)
+		cache.set("a", 1)
+		cache.get("a")
+		cache.get("b")
+		# membership test does not count
+		"a" in cache
+		cache.set("b", 2)
+		cache.clear()
+		self.assertEqual(cache.stats(), {
+			"size": 0, "maxSize": 1, "hits": 1, "misses": 1,
+			"evictions": 1, "expirations": 0, "invalidations": 1,
+		})
+		cache.resetStats()
+		self.assertEqual(cache.hits, 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import os
+import tempfile
+import unittest
+
+from support import laf
+
+import layouts
+import replay
+
+from labelAutofinderCore.search import SearchConfig
+
+
+# scenes captured on stand-in layouts must give the same label when replayed,
+# also after saving and loading them
+class CaptureReplayTest(unittest.TestCase):
+
+	def setUp(self):
+		self.folder = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		laf.disableCapture()
+		self.folder.cleanup()
+
+	def roundTrip(self, obj, config=None):
+		path = os.path.join(self.folder.name, "scene.json")
+		scene = laf.captureLabel(obj, config, path)
+		expected = laf.getLabel(obj, config, overview=True)
+		self.assertEqual(scene["result"], list(expected))
+		loaded = replay.loadScene(path)
+		self.assertEqual(replay.replayScene(loaded), loaded["result"])
+		return loaded
+
+	def testObj(self):
+		fg, objs = layouts.makeDialog(20)
+		scene = self.roundTrip(objs[5])
+		self.assertEqual(scene["config"]["strategy"], "obj")
+		self.assertEqual(scene["result"][1], "Label 5")
+
+	def testText(self):
+		fg, objs = layouts.makeTextPane(200)
+		scene = self.roundTrip(objs[5])
+		self.assertEqual(scene["config"]["strategy"], "text")
+
+	def testTextRegion(self):
+		fg, objs = layouts.makeTextPane(200)
+		scene = self.roundTrip(objs[5], SearchConfig(textExtractor="region"))
+		self.assertTrue(scene["text"]["isRegion"])
+
+	def testWebAndUWP(self):
+		for maker, strategy in ((layouts.makeWebForm, "web"), (layouts.makeUWPPage, "uwp")):
+			fg, objs = maker(20)
+			scene = self.roundTrip(objs[5])
+			self.assertEqual(scene["config"]["strategy"], strategy)
+			self.assertEqual(scene["result"][1], "Label 5")
+
+	def testEnableCapture(self):
+		fg, objs = layouts.makeDialog(20)
+		laf.enableCapture(self.folder.name, minTime=0, maxScenes=2)
+		labels = [laf.getLabel(obj) for obj in objs[:3]]
+		paths = sorted(replay.iterScenePaths([self.folder.name]))
+		self.assertEqual(len(paths), 2)
+		for path, label in zip(paths, labels):
+			self.assertEqual(replay.replayScene(replay.loadScene(path))[1], label)
+
+
+if __name__ == "__main__":
+	unittest.main()
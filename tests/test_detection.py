@@ -0,0 +1,74 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import unittest
+
+from support import laf
+
+import layouts
+
+from labelAutofinderCore import tracing
+from labelAutofinderCore.detection import detectStrategy
+from labelAutofinderCore.search import SearchConfig
+
+
+class DetectionMemoTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.invalidateStrategyMemo()
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def detect(self, obj):
+		return detectStrategy(SearchConfig(obj=obj))
+
+	def testStrategies(self):
+		for maker, strategy in (
+			(layouts.makeDialog, "obj"), (layouts.makeTextPane, "text"),
+			(layouts.makeWebForm, "web"), (layouts.makeUWPPage, "uwp"),
+		):
+			fg, objs = maker(20)
+			self.assertEqual(self.detect(objs[0]), strategy)
+
+	def testMemoized(self):
+		fg, objs = layouts.makeDialog(20)
+		self.assertEqual([self.detect(obj) for obj in objs], ["obj"]*20)
+		self.assertEqual(self.getCount("detection.memoHits"), 19)
+		key = (objs[0].processID, fg.windowHandle, "Edit", False)
+		self.assertEqual(laf.getStrategyMemo(), {key: ("obj", "static windows in foreground window")})
+
+	def testForegroundChanged(self):
+		fg, objs = layouts.makeDialog(20)
+		self.detect(objs[0])
+		# same window class and process, in another foreground window
+		fg, objs = layouts.makeTextPane(20)
+		for obj in objs:
+			obj.windowClassName = "Edit"
+		self.assertEqual(self.detect(objs[0]), "text")
+		self.assertEqual(self.getCount("detection.memoHits"), 0)
+		self.assertEqual(list(laf.getStrategyMemo().values()), [("text", "no static windows in foreground window")])
+
+	def testInvalidated(self):
+		fg, objs = layouts.makeDialog(20)
+		self.detect(objs[0])
+		laf.invalidateStrategyMemo()
+		self.assertEqual(laf.getStrategyMemo(), {})
+		self.detect(objs[1])
+		self.assertEqual(self.getCount("detection.memoHits"), 0)
+
+	def testExplicitStrategy(self):
+		fg, objs = layouts.makeDialog(20)
+		self.assertEqual(detectStrategy(SearchConfig(obj=objs[0], strategy="text")), "text")
+		self.assertEqual(laf.getStrategyMemo(), {})
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,68 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import random
+import unittest
+
+from support import laf, randomScene
+
+from labelAutofinderCore import geometry
+from labelAutofinderCore.explorers import CharExplorer, LabelCandidate, ObjExplorer
+from labelAutofinderCore.spatial import CharRectArray, GridIndex, RowIndex
+from locationHelper import RectLTRB
+
+
+# NumPy and pure Python checks must give the same results,
+# also in ties (first found wins) and with huge distances
+@unittest.skipIf(geometry.loadNumpy() is None, "NumPy not available")
+class NumpyParityTest(unittest.TestCase):
+
+	def setUp(self):
+		self.useNumpy = geometry.useNumpy
+
+	def tearDown(self):
+		geometry.useNumpy = self.useNumpy
+
+	def getResults(self, search):
+		# results of search, with pure Python checks then NumPy ones
+		results = []
+		for useNumpy in (False, True):
+			geometry.useNumpy = useNumpy
+			results.append(search())
+		return results
+
+	def testObjNearest(self):
+		rng = random.Random(5)
+		for trial in range(500):
+			objRect, rects, config = randomScene(rng, rng.choice((geometry.vectorizeThreshold, 100, 400)))
+			self.assertTrue(geometry.isAvailable(len(rects)))
+			labelObjs = [LabelCandidate(rng.choice(("a", "b", " ", "")), RectLTRB(*rect)) for rect in rects]
+			index = GridIndex(rects)
+			pure, vectorized = self.getResults(lambda: ObjExplorer(objRect, config).getDistanceAndLabelText(labelObjs))
+			self.assertEqual(vectorized, pure)
+			if pure:
+				self.assertEqual(vectorized.rect, pure.rect)
+			pure, vectorized = self.getResults(lambda: ObjExplorer(objRect, config).getDistanceAndLabelText(labelObjs, index))
+			self.assertEqual(vectorized, pure)
+
+	def testCharNearest(self):
+		rng = random.Random(6)
+		for trial in range(500):
+			objRect, rects, config = randomScene(rng, rng.choice((geometry.vectorizeThreshold, 100, 400)), (None, 5, 100))
+			charRects = CharRectArray(rects)
+			index = RowIndex(charRects)
+			for searchRects, searchIndex in ((rects, None), (charRects, None), (charRects, index)):
+				pure, vectorized = self.getResults(lambda: CharExplorer(objRect, config).getDistanceAndCharOffsets(searchRects, searchIndex))
+				self.assertEqual(vectorized, pure)
+
+	def testBelowThreshold(self):
+		geometry.useNumpy = True
+		self.assertFalse(geometry.isAvailable(geometry.vectorizeThreshold-1))
+		geometry.useNumpy = False
+		self.assertFalse(geometry.isAvailable(geometry.vectorizeThreshold))
+
+
+if __name__ == "__main__":
+	unittest.main()
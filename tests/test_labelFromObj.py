@@ -0,0 +1,67 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import unittest
+
+from support import laf
+
+import layouts
+import winUser
+
+from labelAutofinderCore import tracing
+from locationHelper import RectLTRB
+
+
+class StaticWindowsTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.invalidateStaticWindows()
+		self.fg, self.objs = layouts.makeDialog(400)
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def testIndexCached(self):
+		for n in (0, 123, 399):
+			self.assertEqual(laf.getLabel(self.objs[n]), "Label %d"%n)
+		self.assertEqual(self.getCount("staticWindowsCache.misses"), 1)
+		# nearest statics only, not all 400 for each search
+		self.assertLess(self.getCount("candidatesScanned"), 100)
+
+	def testSharedWithGetLabels(self):
+		results = laf.getLabels(self.objs[:10])
+		self.assertEqual([results[obj][1] for obj in self.objs[:10]], ["Label %d"%n for n in range(10)])
+		self.assertEqual(laf.getLabel(self.objs[10]), "Label 10")
+		self.assertEqual(self.getCount("staticWindowsCache.misses"), 1)
+
+	def getStatic(self, n):
+		return [window for window in winUser.windows.values() if window.name == "Label %d"%n][0]
+
+	def testHiddenLabel(self):
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 3")
+		# another tab page shown, with its static in the same place
+		static = self.getStatic(3)
+		static.visible = False
+		winUser.createWindow(static.parent, "Static", static.rect, name="Other page")
+		self.assertEqual(laf.getLabel(self.objs[3]), "Other page")
+		self.assertEqual(self.getCount("staticWindowsCache.stale"), 1)
+		self.assertEqual(self.getCount("staticWindowsCache.misses"), 2)
+
+	def testMovedLabel(self):
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 3")
+		static = self.getStatic(3)
+		left, top, right, bottom = static.rect
+		static.rect = RectLTRB(left-30, top, right-30, bottom)
+		self.assertEqual(laf.getLabel(self.objs[3], overview=True), (34, "Label 3"))
+		self.assertEqual(self.getCount("staticWindowsCache.stale"), 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
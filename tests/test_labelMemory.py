@@ -0,0 +1,111 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import json
+import os
+import tempfile
+import unittest
+
+from support import laf
+
+import displayModel
+import layouts
+import winUser
+
+from labelAutofinderCore import tracing
+from labelAutofinderCore.explorers import LabelResult
+from labelAutofinderCore.labelMemory import LabelMemory, getFingerprint
+from locationHelper import RectLTWH
+
+
+class LabelMemoryTest(unittest.TestCase):
+
+	def setUp(self):
+		self.folder = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.folder.name, "memory.json")
+		self.memory = LabelMemory(self.path)
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+		self.folder.cleanup()
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def testFingerprint(self):
+		fg, objs = layouts.makeDialog(4)
+		labelRect, fieldRect = list(layouts.formGeometry(4))[1]
+		left, top, right, bottom = fieldRect
+		self.assertEqual(getFingerprint(objs[1], fg), "app|Edit|1001|%d|%d,%d,%d,%d"%(objs[1].role, left, top, right-left, bottom-top))
+		# relative to foreground, so the same if window moves
+		fg.location = RectLTWH(50, 50, fg.location.width, fg.location.height)
+		self.assertEqual(getFingerprint(objs[1], fg), "app|Edit|1001|%d|%d,%d,%d,%d"%(objs[1].role, left-50, top-50, right-left, bottom-top))
+
+	def testRecallVerified(self):
+		fg, objs = layouts.makeDialog(4)
+		res = laf.getLabel(objs[1], overview=True)
+		self.memory.remember(objs[1], res)
+		recalled = self.memory.recall(objs[1])
+		self.assertEqual(recalled, res)
+		self.assertEqual((recalled.rect, recalled.strategy), (res.rect, "obj"))
+		self.assertEqual(self.getCount("memory.hits"), 1)
+		# label changed on screen, so forgotten
+		static = [window for window in winUser.windows.values() if window.name == "Label 1"][0]
+		static.name = "Changed"
+		self.assertIsNone(self.memory.recall(objs[1]))
+		self.assertEqual(self.getCount("memory.invalid"), 1)
+		self.assertEqual((len(self.memory.entries), self.memory.appCounts), (0, {}))
+
+	def testTextVerified(self):
+		fg, objs = layouts.makeTextPane(40)
+		res = laf.getLabel(objs[1], overview=True)
+		self.assertEqual(res.strategy, "text")
+		self.memory.remember(objs[1], res)
+		self.assertEqual(self.memory.recall(objs[1]), res)
+		chunks = list(displayModel.chunks.values())[0]
+		text, charRects = chunks[1]
+		chunks[1] = ("Other".ljust(len(text), "."), charRects)
+		self.assertIsNone(self.memory.recall(objs[1]))
+
+	def testSkipped(self):
+		fg, objs = layouts.makeDialog(4)
+		# no entries for this app, fingerprint not computed
+		self.assertIsNone(self.memory.recall(objs[0]))
+		self.assertEqual(self.getCount("memory.skipped"), 1)
+		fg, objs = layouts.makeWebForm(4)
+		res = LabelResult(4, "Label 0", (10, 10, 110, 34), "obj")
+		self.memory.remember(objs[0], res)
+		self.assertIsNone(self.memory.recall(objs[0]))
+		self.assertEqual(self.getCount("memory.skipped"), 2)
+		# web results are never remembered
+		self.memory.remember(objs[1], LabelResult(4, "Label 1", (10, 40, 110, 64), "web"))
+		self.assertEqual(len(self.memory.entries), 1)
+
+	def testSaveAndLoad(self):
+		fg, objs = layouts.makeDialog(4)
+		results = [laf.getLabel(obj, overview=True) for obj in objs]
+		for obj, res in zip(objs, results):
+			self.memory.remember(obj, res)
+		self.memory.save()
+		with open(self.path, encoding="utf-8") as f:
+			self.assertEqual(len(json.load(f)), 4)
+		memory = LabelMemory(self.path)
+		memory.load()
+		self.assertEqual(memory.appCounts, {"app": 4})
+		self.assertEqual([memory.recall(obj) for obj in objs], results)
+
+	def testMaxEntries(self):
+		fg, objs = layouts.makeDialog(4)
+		memory = LabelMemory(self.path, maxEntries=2)
+		for obj in objs:
+			memory.remember(obj, laf.getLabel(obj, overview=True))
+		self.assertEqual(list(memory.entries), [getFingerprint(obj, fg) for obj in objs[2:]])
+		self.assertEqual(memory.appCounts, {"app": 2})
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import random
+import unittest
+
+from support import laf, randomScene
+
+import layouts
+
+from labelAutofinderCore.explorers import CharExplorer, ObjExplorer
+from labelAutofinderCore.search import SearchConfig, SearchDirections
+from labelAutofinderCore.spatial import CharRectArray, GridIndex, RowIndex
+
+
+# k nearest results must be those of a brute force scan,
+# with and without spatial indexes
+class KNearestTest(unittest.TestCase):
+
+	def getDistances(self, explorer, rects):
+		# direction -> sorted (distance, index) of all rects in that direction
+		distances = {}
+		for direction, checker in explorer.checkers.items():
+			distances[direction] = sorted((checker(rect), n) for n, rect in enumerate(rects) if checker(rect))
+		return distances
+
+	def testIndexes(self):
+		rng = random.Random(7)
+		for trial in range(300):
+			objRect, rects, config = randomScene(rng, rng.choice((5, 50, 200)))
+			k = rng.randint(1, 5)
+			explorer = ObjExplorer(objRect, config)
+			expected = {direction: items[:k] for direction, items in self.getDistances(explorer, rects).items()}
+			self.assertEqual(explorer.getKNearestIndexes(rects, None, k), expected)
+			self.assertEqual(explorer.getKNearestIndexes(rects, GridIndex(rects), k), expected)
+			# the nearest one is the label of getLabel
+			nearest = {direction: items[0] for direction, items in expected.items() if items}
+			self.assertEqual(explorer.getNearestIndexes(rects, GridIndex(rects)), nearest)
+
+	def testOffsets(self):
+		rng = random.Random(8)
+		for trial in range(300):
+			objRect, rects, config = randomScene(rng, rng.choice((5, 50, 200)), (None, 5, 100))
+			k = rng.randint(1, 5)
+			explorer = CharExplorer(objRect, config)
+			expected = {}
+			for direction, items in self.getDistances(explorer, rects).items():
+				offsetsByDistance = {}
+				for distance, offset in items:
+					offsetsByDistance.setdefault(distance, []).append(offset)
+				expected[direction] = sorted(offsetsByDistance.items())[:k]
+			charRects = CharRectArray(rects)
+			for searchRects, index in ((rects, None), (charRects, None), (charRects, RowIndex(charRects))):
+				res = explorer.getKNearestOffsets(searchRects, index, k)
+				self.assertEqual({direction: [(distance, sorted(offsets)) for distance, offsets in items] for direction, items in res.items()}, expected)
+
+
+class OverviewTest(unittest.TestCase):
+
+	def testDialog(self):
+		fg, objs = layouts.makeDialog(6)
+		obj = objs[3]
+		overview = laf.getLabelOverview(obj, k=2)
+		self.assertEqual(set(overview), set(SearchDirections.ALL))
+		left = overview[SearchDirections.LEFT[0]]
+		self.assertEqual(left[0], laf.getLabel(obj, SearchConfig(directions=SearchDirections.LEFT), overview=True))
+		# nearest first
+		for labels in overview.values():
+			self.assertLessEqual(len(labels), 2)
+			self.assertEqual(labels, sorted(labels, key=lambda item: item[0]))
+
+	def testText(self):
+		fg, objs = layouts.makeTextPane(120)
+		obj = objs[3]
+		overview = laf.getLabelOverview(obj, k=3)
+		left = overview[SearchDirections.LEFT[0]]
+		self.assertEqual(left[0], laf.getLabel(obj, SearchConfig(directions=SearchDirections.LEFT), overview=True))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import threading
+import unittest
+
+from support import laf
+
+import layouts
+
+from labelAutofinderCore import prefetch, strategies, tracing
+from labelAutofinderCore.search import SearchConfig
+from locationHelper import RectLTWH
+
+
+class PrefetchTest(unittest.TestCase):
+
+	def setUp(self):
+		self.fg, self.objs = layouts.makeDialog(10)
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		laf.disablePrefetch()
+		tracing.ENABLED = False
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def prefetchForeground(self, fg):
+		laf.prefetchForeground(fg)
+		prefetch.prefetcher.future.result(5)
+
+	def testPrefetched(self):
+		laf.enablePrefetch()
+		self.prefetchForeground(self.fg)
+		self.assertEqual(self.getCount("prefetch.objs"), 10)
+		self.assertEqual(laf.getPrefetchedResult(self.objs[3]), (4, "Label 3"))
+		# a lookup, without search
+		self.assertEqual(laf.getLabel(self.objs[4]), "Label 4")
+		self.assertEqual(self.getCount("prefetch.hits"), 2)
+		self.assertEqual(self.getCount("staticWindowsCache.hits")+self.getCount("staticWindowsCache.misses"), 1)
+
+	def testNotMatching(self):
+		laf.enablePrefetch()
+		self.prefetchForeground(self.fg)
+		# another config
+		self.assertIs(laf.getPrefetchedResult(self.objs[3], SearchConfig(directions=(0,))), laf.NOT_PREFETCHED)
+		# moved obj
+		left, top, width, height = self.objs[3].location
+		self.objs[3].location = RectLTWH(left+10, top, width, height)
+		self.assertIs(laf.getPrefetchedResult(self.objs[3]), laf.NOT_PREFETCHED)
+		# another foreground
+		fg, objs = layouts.makeDialog(4)
+		laf.prefetchForeground(fg)
+		self.assertIs(laf.getPrefetchedResult(self.objs[2]), laf.NOT_PREFETCHED)
+
+	def testForegroundChanged(self):
+		started = threading.Event()
+		gate = threading.Event()
+		def gatedStrategy(obj, config):
+			started.set()
+			gate.wait(5)
+			return (1, "Gated")
+		strategies.registerStrategy("gated", gatedStrategy)
+		try:
+			laf.enablePrefetch(config=SearchConfig(strategy="gated"))
+			laf.prefetchForeground(self.fg)
+			future = prefetch.prefetcher.future
+			self.assertTrue(started.wait(5))
+			# while the first control is labelled
+			fg, objs = layouts.makeDialog(4)
+			laf.prefetchForeground(fg)
+			gate.set()
+			future.result(5)
+			prefetch.prefetcher.future.result(5)
+		finally:
+			strategies.registry.pop("gated")
+		# old window stopped after its first control, and its results dropped
+		self.assertEqual(self.getCount("prefetch.cancelled"), 1)
+		self.assertEqual(self.getCount("prefetch.objs"), 4)
+		config = SearchConfig(strategy="gated")
+		self.assertIs(laf.getPrefetchedResult(self.objs[0], config), laf.NOT_PREFETCHED)
+		self.assertEqual(laf.getPrefetchedResult(objs[0], config), (1, "Gated"))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,100 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import time
+import unittest
+
+from support import laf
+
+import layouts
+import winUser
+
+from labelAutofinderCore import tracing
+from labelAutofinderCore.search import SearchConfig, SearchDirections
+from locationHelper import RectLTWH
+
+
+class ResultCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.enableResultCache()
+		self.fg, self.objs = layouts.makeDialog(10)
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+		laf.disableResultCache()
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def renameStatic(self, name, newName):
+		static = [window for window in winUser.windows.values() if window.name == name][0]
+		static.name = newName
+
+	def move(self, obj, dx, dy):
+		location = obj.location
+		obj.location = RectLTWH(location.left+dx, location.top+dy, location.width, location.height)
+
+	def testHit(self):
+		first = [laf.getLabel(obj, overview=True) for obj in self.objs]
+		second = [laf.getLabel(obj, overview=True) for obj in self.objs]
+		self.assertEqual(first, second)
+		self.assertEqual((self.getCount("resultCache.misses"), self.getCount("resultCache.hits")), (10, 10))
+		# labels changed in place are seen after invalidation only
+		self.renameStatic("Label 3", "Renamed")
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 3")
+		laf.invalidateResultCache()
+		self.assertEqual(laf.getLabel(self.objs[3]), "Renamed")
+
+	def testObjMoved(self):
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 3")
+		self.move(self.objs[3], 0, 30)
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 4")
+		self.assertEqual(self.getCount("resultCache.misses"), 2)
+
+	def testContainerMoved(self):
+		laf.getLabel(self.objs[3])
+		# container rect is read once while the same window is in foreground
+		self.move(self.fg, 10, 0)
+		laf.getLabel(self.objs[3])
+		self.assertEqual(self.getCount("resultCache.hits"), 1)
+		laf.invalidateResultCache()
+		laf.getLabel(self.objs[3])
+		self.assertEqual(self.getCount("resultCache.misses"), 2)
+		# with the new rect read again
+		laf.getLabel(self.objs[3])
+		self.assertEqual(self.getCount("resultCache.hits"), 2)
+
+	def testTimeToLive(self):
+		laf.enableResultCache(ttl=0.05)
+		laf.getLabel(self.objs[3])
+		laf.getLabel(self.objs[3])
+		self.assertEqual(self.getCount("resultCache.hits"), 1)
+		time.sleep(0.06)
+		laf.getLabel(self.objs[3])
+		self.assertEqual(self.getCount("resultCache.misses"), 2)
+
+	def testConfigKey(self):
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 3")
+		# same values as defaults, or as passed in another form
+		laf.getLabel(self.objs[3], SearchConfig(directions=SearchDirections.LEFT_TOP))
+		laf.getLabel(self.objs[3], SearchConfig(directions=list(SearchDirections.LEFT_TOP)))
+		self.assertEqual(self.getCount("resultCache.hits"), 2)
+		# other directions, another result
+		self.assertIsNone(laf.getLabel(self.objs[3], SearchConfig(directions=SearchDirections.RIGHT)))
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 3")
+		self.assertEqual(self.getCount("resultCache.misses"), 2)
+
+	def testDisabled(self):
+		laf.disableResultCache()
+		laf.getLabel(self.objs[3])
+		laf.getLabel(self.objs[3])
+		self.assertEqual(self.getCount("resultCache.misses")+self.getCount("resultCache.hits"), 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,68 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import sys
+import unittest
+
+from support import laf
+
+import api
+import layouts
+
+from labelAutofinderCore.search import ResolvedSearchConfig, SearchConfig, SearchDirections, resolveConfig
+
+
+class ResolvedConfigTest(unittest.TestCase):
+
+	def setUp(self):
+		self.fg, self.objs = layouts.makeDialog(4)
+
+	def testDefaults(self):
+		for strategy, distances in (("obj", (100, 100)), ("uwp", (150, 150)), ("text", (8, None))):
+			config = SearchConfig(obj=self.objs[0], strategy=strategy).resolve()
+			self.assertIsInstance(config, ResolvedSearchConfig)
+			self.assertEqual((config.maxHorizontalDistance, config.maxVerticalDistance), distances)
+			self.assertEqual(config.directions, SearchDirections.LEFT_TOP)
+			self.assertIs(config.obj, self.objs[0])
+			self.assertEqual((config.webExtractor, config.textExtractor), ("hitTest", "whole"))
+
+	def testForegroundReadOnce(self):
+		config = SearchConfig(obj=self.objs[0], strategy="obj", maxHorizontalDistance=sys.maxsize).resolve()
+		self.assertEqual(config.maxHorizontalDistance, self.fg.location.width)
+		self.assertIs(config.maxParent, self.fg)
+		# a later foreground change doesn't affect the snapshot
+		api.setForegroundObject(layouts.makeDialog(40)[0])
+		self.assertEqual(config.maxHorizontalDistance, self.fg.location.width)
+		self.assertIs(config.maxParent, self.fg)
+
+	def testImmutable(self):
+		config = SearchConfig(obj=self.objs[0], strategy="obj").resolve()
+		with self.assertRaises(AttributeError):
+			config.directions = SearchDirections.ALL
+		with self.assertRaises(AttributeError):
+			del config.strategy
+		with self.assertRaises(TypeError):
+			config.config["strategy"] = "text"
+		self.assertIs(config.resolve(), config)
+
+	def testDerived(self):
+		config = SearchConfig(obj=self.objs[0], strategy="obj", maxVerticalDistance=5).resolve()
+		# from passed values, not resolved ones
+		derived = SearchConfig(oldConfig=config, strategy="uwp")
+		self.assertEqual((derived.maxHorizontalDistance, derived.maxVerticalDistance), (150, 5))
+		self.assertIs(derived.obj, self.objs[0])
+
+	def testResolveConfig(self):
+		config = SearchConfig(obj=self.objs[0], strategy="obj").resolve()
+		self.assertIs(resolveConfig(config, self.objs[0], "obj"), config)
+		self.assertIs(resolveConfig(config), config)
+		other = resolveConfig(config, self.objs[1], "obj")
+		self.assertIsNot(other, config)
+		self.assertIs(other.obj, self.objs[1])
+		self.assertEqual(resolveConfig(config, strategy="text").maxHorizontalDistance, 8)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,79 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import random
+import unittest
+
+from array import array
+
+from support import laf, randomScene
+
+from labelAutofinderCore.explorers import LabelCandidate, ObjExplorer
+from labelAutofinderCore.spatial import CharRectArray, GridIndex
+from locationHelper import RectLTRB
+
+
+def getPassingIndexes(explorer, rects):
+	# indexes of rects passing the exact checks of explorer, in any direction
+	return [index for index, rect in enumerate(rects) if any(checker(rect) for checker in explorer.checkers.values())]
+
+
+class GridIndexTest(unittest.TestCase):
+
+	def testQueryFindsAllPassingRects(self):
+		rng = random.Random(1)
+		for trial in range(300):
+			objRect, rects, config = randomScene(rng, rng.choice((0, 5, 40, 200)))
+			index = GridIndex(rects, rng.choice((8, 64)))
+			candidates = index.query(objRect, config.directions, config.maxHorizontalDistance, config.maxVerticalDistance)
+			self.assertEqual(candidates, sorted(candidates))
+			self.assertTrue(set(getPassingIndexes(ObjExplorer(objRect, config), rects)).issubset(candidates))
+
+	def testExplorerResultWithIndex(self):
+		rng = random.Random(2)
+		for trial in range(300):
+			objRect, rects, config = randomScene(rng, rng.choice((5, 40, 200)))
+			labelObjs = [LabelCandidate(rng.choice(("a", "b", " ", "")), RectLTRB(*rect)) for rect in rects]
+			expected = ObjExplorer(objRect, config).getDistanceAndLabelText(labelObjs)
+			index = GridIndex.fromObjs(labelObjs)
+			self.assertEqual(ObjExplorer(objRect, config).getDistanceAndLabelText(labelObjs, index), expected)
+
+	def testEmpty(self):
+		index = GridIndex([])
+		self.assertEqual(len(index), 0)
+		self.assertEqual(index.query((0, 0, 10, 10), (0, 1, 2, 3), 100, 100), [])
+
+
+class CharRectArrayTest(unittest.TestCase):
+
+	rects = [(0, 0, 8, 16), (8, 0, 16, 16), (16, 0, 24, 16), (0, 24, 8, 40)]
+
+	def testSequence(self):
+		charRects = CharRectArray(RectLTRB(*rect) for rect in self.rects)
+		self.assertEqual(len(charRects), 4)
+		self.assertEqual(charRects[1], (8, 0, 16, 16))
+		self.assertEqual(charRects[-1], (0, 24, 8, 40))
+		self.assertEqual(list(charRects), self.rects)
+		self.assertEqual(charRects.columns[0], array("i", [0, 8, 16, 0]))
+		self.assertEqual(len(CharRectArray()), 0)
+
+	def testSelect(self):
+		charRects = CharRectArray(self.rects)
+		self.assertEqual(list(charRects.select([3, 0])), [self.rects[3], self.rects[0]])
+		self.assertEqual(charRects[1:3], CharRectArray(self.rects[1:3]))
+		self.assertNotEqual(charRects[1:3], CharRectArray(self.rects[:2]))
+		self.assertEqual(list(charRects.iterItems()), list(enumerate(self.rects)))
+		self.assertEqual(list(charRects.iterItems([2])), [(2, self.rects[2])])
+
+	def testIndex(self):
+		charRects = CharRectArray(self.rects+self.rects[:1])
+		self.assertEqual(charRects.index(RectLTRB(*self.rects[2])), 2)
+		self.assertEqual(charRects.index(self.rects[0]), 0)
+		with self.assertRaises(ValueError):
+			charRects.index((1, 2, 3, 4))
+
+
+if __name__ == "__main__":
+	unittest.main()
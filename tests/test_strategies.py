@@ -0,0 +1,113 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import subprocess
+import sys
+import unittest
+
+from support import benchmarksDir, laf
+
+import layouts
+
+from labelAutofinderCore import strategies
+from labelAutofinderCore.search import SearchConfig
+
+
+# label function imported by path, see testPath
+def getLabelFromPath(obj, config):
+	return (1, "From path")
+
+
+class StrategiesTest(unittest.TestCase):
+
+	def setUp(self):
+		self.registry = dict(strategies.registry)
+		self.overviewRegistry = dict(strategies.overviewRegistry)
+		self.fg, self.objs = layouts.makeDialog(4)
+
+	def tearDown(self):
+		strategies.registry.clear()
+		strategies.registry.update(self.registry)
+		strategies.overviewRegistry.clear()
+		strategies.overviewRegistry.update(self.overviewRegistry)
+
+	def testRegister(self):
+		calls = []
+		def getLabelFromTooltip(obj, config):
+			calls.append((obj, config.strategy))
+			return (3, "Tooltip")
+		laf.registerStrategy("tooltip", getLabelFromTooltip)
+		self.assertIn("tooltip", laf.getStrategyNames())
+		self.assertEqual(laf.getLabel(self.objs[0], SearchConfig(strategy="tooltip")), "Tooltip")
+		self.assertEqual(calls, [(self.objs[0], "tooltip")])
+		# auto mode never chooses it
+		self.assertEqual(laf.getLabel(self.objs[0]), "Label 0")
+		# no overview, unless registered
+		with self.assertRaises(LookupError):
+			laf.getLabelOverview(self.objs[0], SearchConfig(strategy="tooltip"))
+		laf.registerStrategy("tooltip", getLabelFromTooltip, lambda obj, config, k: {0: [(3, "Tooltip")]})
+		self.assertEqual(laf.getLabelOverview(self.objs[0], SearchConfig(strategy="tooltip")), {0: [(3, "Tooltip")]})
+
+	def testPath(self):
+		laf.registerStrategy("path", "test_strategies:getLabelFromPath")
+		self.assertEqual(laf.getLabel(self.objs[0], SearchConfig(strategy="path")), "From path")
+		# imported once
+		self.assertIs(strategies.registry["path"], sys.modules["test_strategies"].getLabelFromPath)
+
+	def testReplaceBuiltin(self):
+		calls = []
+		def getLabelFromObj(obj, config):
+			calls.append(obj)
+			return (1, "Replaced")
+		self.assertTrue(laf.isBuiltinStrategy("obj", laf.getStrategyFunction("obj")))
+		laf.registerStrategy("obj", getLabelFromObj)
+		self.assertFalse(laf.isBuiltinStrategy("obj", laf.getStrategyFunction("obj")))
+		# getLabels calls it with obj and config only
+		results = laf.getLabels(self.objs)
+		self.assertEqual([results[obj][1] for obj in self.objs], ["Replaced"]*4)
+		self.assertEqual(calls, self.objs)
+
+	def testErrors(self):
+		with self.assertRaises(ValueError):
+			laf.registerStrategy("auto", getLabelFromPath)
+		with self.assertRaises(LookupError):
+			laf.getStrategyFunction("missing")
+		with self.assertRaises(AttributeError):
+			laf.missingName
+
+
+# imports the package in a new interpreter, printing its strategy modules
+# after each statement
+lazySnippet = """
+import sys
+sys.path.insert(0, %(benchmarksDir)r)
+import environment
+package = environment.loadPackage()
+def loaded():
+	print(sorted(name.split(".")[1] for name in sys.modules if name.startswith("labelAutofinderCore.labelFrom")))
+loaded()
+package.getStrategyFunction("obj")
+loaded()
+package.webCache
+loaded()
+"""
+
+
+class LazyLoadingTest(unittest.TestCase):
+
+	def testLoadedAtFirstUse(self):
+		output = subprocess.run(
+			[sys.executable, "-c", lazySnippet%{"benchmarksDir": benchmarksDir}],
+			capture_output=True, text=True, check=True
+		).stdout.splitlines()
+		self.assertEqual(output, [
+			"[]",
+			"['labelFromObj']",
+			"['labelFromObj', 'labelFromWeb']",
+		])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,150 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import random
+import unittest
+
+from support import laf, randomScene
+
+import displayModel
+import layouts
+
+from labelAutofinderCore import tracing
+from labelAutofinderCore.explorers import CharExplorer
+from labelAutofinderCore.labelFromText import RestrictedDMTI, getCharRects, getLineInfo, getSearchRect
+from labelAutofinderCore.search import SearchConfig, SearchDirections
+from labelAutofinderCore.spatial import CharRectArray, RowIndex
+
+
+def getPassingIndexes(explorer, rects):
+	# indexes of rects passing the exact checks of explorer, in any direction
+	return [index for index, rect in enumerate(rects) if any(checker(rect) for checker in explorer.checkers.values())]
+
+
+class RowIndexTest(unittest.TestCase):
+
+	def testQueryFindsAllPassingRects(self):
+		rng = random.Random(3)
+		for trial in range(300):
+			objRect, rects, config = randomScene(rng, rng.choice((0, 5, 40, 200)), (None, 5, 100))
+			index = RowIndex(rects)
+			self.assertEqual(len(index), len(rects))
+			candidates = index.query(objRect, config.directions, config.maxHorizontalDistance, config.maxVerticalDistance)
+			self.assertEqual(candidates, sorted(set(candidates)))
+			self.assertTrue(set(getPassingIndexes(CharExplorer(objRect, config), rects)).issubset(candidates))
+
+	def testExplorerResultWithIndex(self):
+		rng = random.Random(4)
+		for trial in range(300):
+			objRect, rects, config = randomScene(rng, rng.choice((5, 40, 200)), (None, 5, 100))
+			expected = CharExplorer(objRect, config).getDistanceAndCharOffsets(rects)
+			charRects = CharRectArray(rects)
+			for index in (RowIndex(rects), RowIndex(charRects)):
+				res = CharExplorer(objRect, config).getDistanceAndCharOffsets(charRects, index)
+				self.assertEqual(res, expected)
+
+
+class RowIndexCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.invalidateRowIndexes()
+		self.fg, self.objs = layouts.makeTextPane(400)
+		self.chunks = list(displayModel.chunks.values())[0]
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def testReused(self):
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 3".ljust(12, "."))
+		self.assertEqual(laf.getLabel(self.objs[7]), "Label 7".ljust(12, "."))
+		self.assertEqual(self.getCount("rowIndex.hits"), 1)
+
+	def testScrolled(self):
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 3".ljust(12, "."))
+		# same chars, each chunk drawn one row below
+		rects = [charRects for text, charRects in self.chunks]
+		self.chunks[:] = [(text, charRects) for (text, oldRects), charRects in zip(self.chunks, rects[1:]+rects[:1])]
+		self.assertEqual(laf.getLabel(self.objs[3]), "Label 2".ljust(12, "."))
+		self.assertEqual(self.getCount("rowIndex.stale"), 1)
+		self.assertEqual(self.getCount("rowIndex.hits"), 0)
+
+
+class CharRectsTest(unittest.TestCase):
+
+	def setUp(self):
+		self.fg, self.objs = layouts.makeTextPane(400)
+		self.pane = self.objs[0].parent
+
+	def testConvertedOnce(self):
+		info = RestrictedDMTI(self.pane, self.pane.location.toLTRB())
+		rects = [tuple(rect) for rect in info._storyFieldsAndRects[1]]
+		charRects = getCharRects(info)
+		self.assertEqual(list(charRects), rects)
+		# rect objects released
+		self.assertEqual(info._storyFieldsAndRects[1], [])
+		self.assertIs(getCharRects(info), charRects)
+
+	def testLineInfo(self):
+		# text of a region, and of the whole line of one of its chars
+		left, top, right, bottom = self.objs[3].location.toLTRB()
+		info = RestrictedDMTI(self.pane, layouts.RectLTRB(0, top, left, bottom))
+		offset = info.text.index("3")
+		lineInfo, lineOffset = getLineInfo(info, offset)
+		self.assertEqual(lineInfo.text[lineOffset], "3")
+		self.assertEqual(getCharRects(lineInfo)[lineOffset], getCharRects(info)[offset])
+		self.assertEqual(lineInfo._storyFieldsAndRects[1], [])
+
+
+class RegionTest(unittest.TestCase):
+
+	def testSearchRect(self):
+		# chars passing the checks have their center in search rect,
+		# as required to be read by display model
+		rng = random.Random(7)
+		for trial in range(300):
+			objRect, rects, config = randomScene(rng, 200, (None, 5, 100))
+			# chars not bigger than obj, as search rect assumes
+			rects = [(left, top, left+rng.randint(4, 12), top+rng.randint(8, 16)) for left, top, right, bottom in rects]
+			objLeft, objTop, objRight, objBottom = objRect
+			objRect = (objLeft, objTop, objRight, objTop+rng.randint(16, 30))
+			left, top, right, bottom = getSearchRect(objRect, config)
+			explorer = CharExplorer(objRect, config)
+			for index in getPassingIndexes(explorer, rects):
+				charLeft, charTop, charRight, charBottom = rects[index]
+				self.assertTrue(left <= (charLeft+charRight)//2 < right and top <= (charTop+charBottom)//2 < bottom)
+
+	def testSameLabels(self):
+		fg, objs = layouts.makeTextPane(400)
+		for directions in (SearchDirections.LEFT_TOP, SearchDirections.ALL):
+			whole = [laf.getLabel(obj, SearchConfig(directions=directions), overview=True) for obj in objs]
+			region = [laf.getLabel(obj, SearchConfig(directions=directions, textExtractor="region"), overview=True) for obj in objs]
+			self.assertEqual(region, whole)
+			# labels are longer than region, so completed from their line
+			self.assertEqual(region[3], (8, "Label 3".ljust(12, ".")))
+
+	def testLessText(self):
+		fg, objs = layouts.makeTextPane(400)
+		readTexts = []
+		originalInit = displayModel.DisplayModelTextInfo.__init__
+		def init(info, *args, **kwargs):
+			originalInit(info, *args, **kwargs)
+			readTexts.append(info.text)
+		displayModel.DisplayModelTextInfo.__init__ = init
+		try:
+			laf.getLabel(objs[20], SearchConfig(textExtractor="region"))
+		finally:
+			displayModel.DisplayModelTextInfo.__init__ = originalInit
+		# region, then line of the label
+		self.assertEqual(len(readTexts), 2)
+		self.assertLess(sum(map(len, readTexts)), 100)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import unittest
+
+from support import laf
+
+import layouts
+import UIAHandler
+
+from labelAutofinderCore import tracing
+from labelAutofinderCore.labelFromUWPObj import getAllStaticUIAElements, getLabelCacheRequest, getStaticUIACandidates
+from labelAutofinderCore.search import SearchConfig
+
+
+# UWP strategy against a fake UIA element array
+class UWPTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.invalidateUIACandidates()
+		self.fg, self.objs = layouts.makeUWPPage(10)
+		self.page = self.objs[0].parent
+
+	def testElementArray(self):
+		UIAHandler.uiaStats["calls"] = 0
+		elements = getAllStaticUIAElements(self.page, getLabelCacheRequest())
+		# one cross-process call for all TextBlock elements
+		self.assertEqual(UIAHandler.uiaStats["calls"], 1)
+		self.assertEqual([element.CurrentName for element in elements], ["Label %d"%n for n in range(10)])
+
+	def testCandidates(self):
+		# an offscreen TextBlock, without rect
+		self.page.UIAElement.descendants.append(UIAHandler.FakeUIAElement("Offscreen", ()))
+		config = SearchConfig(obj=self.objs[0], maxParent=self.page, strategy="uwp")
+		candidates = getStaticUIACandidates(config)
+		self.assertEqual([candidate.name for candidate in candidates], ["Label %d"%n for n in range(10)])
+		labelRect, fieldRect = next(layouts.formGeometry(10))
+		self.assertEqual(candidates[0].location.toLTRB(), labelRect)
+
+	def testLabels(self):
+		labels = [laf.getLabel(obj) for obj in self.objs]
+		self.assertEqual(labels, ["Label %d"%n for n in range(10)])
+		# candidates shared by all objs
+		results = laf.getLabels(self.objs)
+		self.assertEqual([results[obj][1] for obj in self.objs], labels)
+
+
+class UIACandidatesCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.invalidateUIACandidates()
+		self.fg, self.objs = layouts.makeUWPPage(400)
+		self.page = self.objs[0].parent
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def getLabelElement(self, n):
+		return [element for element in self.page.UIAElement.descendants if element.CurrentName == "Label %d"%n][0]
+
+	def testIndexCached(self):
+		for n in (0, 42, 99):
+			self.assertEqual(laf.getLabel(self.objs[n]), "Label %d"%n)
+		self.assertEqual(self.getCount("uiaCandidatesCache.misses"), 1)
+		# nearest TextBlocks only, not all 400 for each search
+		self.assertLess(self.getCount("candidatesScanned"), 100)
+
+	def testChangedLabel(self):
+		self.assertEqual(laf.getLabel(self.objs[5]), "Label 5")
+		self.getLabelElement(5).CurrentName = "Changed"
+		self.assertEqual(laf.getLabel(self.objs[5]), "Changed")
+		self.assertEqual(self.getCount("uiaCandidatesCache.stale"), 1)
+
+	def testRemovedLabel(self):
+		self.assertEqual(laf.getLabel(self.objs[5]), "Label 5")
+		# e.g. another page shown in the same window
+		element = self.getLabelElement(5)
+		self.page.UIAElement.descendants.remove(element)
+		element.CurrentBoundingRectangle = ()
+		self.assertIsNone(laf.getLabel(self.objs[5]))
+		self.assertEqual(self.getCount("uiaCandidatesCache.misses"), 2)
+
+
+if __name__ == "__main__":
+	unittest.main()
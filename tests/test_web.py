@@ -0,0 +1,216 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+import unittest
+
+from support import laf
+
+import layouts
+
+from controlTypes import Role
+from NVDAObjects import comStats
+from NVDAObjects.IAccessible import IAccessible, addPointTarget, clearPointTargets
+from virtualBuffers import VirtualBuffer
+
+from labelAutofinderCore import tracing
+from labelAutofinderCore.search import SearchConfig
+
+
+class WebExtractorsTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.invalidateWebCache()
+		self.fg, self.objs = layouts.makeWebForm(60)
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def getLabels(self, webExtractor):
+		config = SearchConfig(webExtractor=webExtractor)
+		return [laf.getLabel(obj, config, overview=True) for obj in self.objs]
+
+	def testNearest(self):
+		# rects of text offsets come as RectLTWH, like in NVDA
+		labels = self.getLabels("nearest")
+		self.assertEqual([label for distance, label in labels], ["Label %d"%n for n in range(60)])
+		# hit tests at offsets around each field, not at all of them
+		self.assertLess(self.getCount("comObjects"), 60*10)
+		self.assertEqual(labels, self.getLabels("hitTest"))
+
+	def testFields(self):
+		labels = self.getLabels("fields")
+		# text runs read in bulk, without hit tests
+		self.assertEqual(self.getCount("comObjects"), 0)
+		self.assertEqual(self.getCount("webFields.runs"), 60)
+		self.assertEqual(labels, self.getLabels("hitTest"))
+
+	def testFieldsCoveredLabel(self):
+		# small obj over the center of label 5, so hit tests miss it
+		label = self.objs[5].parent.children[10]
+		center = label.location.toLTRB().center
+		cover = IAccessible(location=(center.x-2, center.y-2, 4, 4), role=Role.GROUPING)
+		addPointTarget(cover)
+		self.assertEqual(laf.getLabel(self.objs[5], SearchConfig(webExtractor="fields")), "Label 5")
+		self.assertNotEqual(laf.getLabel(self.objs[5], SearchConfig(webExtractor="hitTest")), "Label 5")
+
+	def testFieldsNonLabelText(self):
+		# static text inside a button is not a label
+		form = self.objs[5].parent
+		label = form.children[10]
+		button = IAccessible(location=tuple(label._location), role=Role.BUTTON)
+		button.children.append(label)
+		form.children[10] = button
+		self.assertNotEqual(laf.getLabel(self.objs[5], SearchConfig(webExtractor="fields")), "Label 5")
+
+
+class WebCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.invalidateWebCache()
+		self.fg, self.objs = layouts.makeWebForm(50, columns=1)
+		self.form = self.objs[0].parent
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def getLabels(self):
+		return [laf.getLabel(obj) for obj in self.objs]
+
+	def getContainerCalls(self):
+		# COM calls of a scan, or of a verification after update
+		calls = comStats["calls"]
+		laf.getLabel(self.objs[0])
+		return comStats["calls"]-calls
+
+	def replaceLabel(self, n, name):
+		# label n re-rendered as a new node, at the same place
+		old = self.form.children[2*n]
+		new = IAccessible(name=name, location=tuple(old._location), role=Role.STATICTEXT, treeInterceptor=old.treeInterceptor)
+		new.parent = self.form
+		self.form.children[2*n] = new
+		# removed nodes give no name, as in NVDA
+		old.name = None
+		self.resetPointTargets()
+
+	def resetPointTargets(self):
+		clearPointTargets()
+		for child in self.form.children:
+			if child.role == Role.STATICTEXT:
+				addPointTarget(child)
+
+	def testColdScan(self):
+		# text, then rect and hit test for each span, and name of labels only
+		spans = len(self.form.children)
+		self.assertLessEqual(self.getContainerCalls(), 1+2*spans+spans//2+5)
+
+	def testUnchanged(self):
+		self.getLabels()
+		laf.updateWebCache()
+		calls = self.getContainerCalls()
+		self.assertEqual(self.getCount("webCache.updates"), 1)
+		self.assertEqual(self.getCount("webCache.scannedSpans"), 0)
+		# no hit tests: rects, and names of reused labels
+		spans = len(self.form.children)
+		self.assertLessEqual(calls, 1+spans+spans//2+5)
+
+	def testMovedLabel(self):
+		before = self.getLabels()
+		label = self.form.children[10]
+		left, top, width, height = label._location
+		label.location = layouts.RectLTRB(left-20, top, left-20+width, top+height).toLTWH()
+		self.resetPointTargets()
+		laf.updateWebCache()
+		after = self.getLabels()
+		self.assertEqual(self.getCount("webCache.scannedSpans"), 1)
+		self.assertEqual(after, before)
+
+	def testRenamedLabel(self):
+		self.getLabels()
+		self.form.children[10].name = "Renamed"
+		laf.updateWebCache()
+		self.assertEqual(self.getLabels()[5], "Renamed")
+		self.assertEqual(self.getCount("webCache.scannedSpans"), 1)
+
+	def testRerenderedLabel(self):
+		before = self.getLabels()
+		self.replaceLabel(5, "Rerendered")
+		laf.updateWebCache()
+		after = self.getLabels()
+		self.assertEqual(after[5], "Rerendered")
+		self.assertEqual(sum(a != b for a, b in zip(before, after)), 1)
+
+
+class WebCacheHooksTest(unittest.TestCase):
+
+	def setUp(self):
+		laf.invalidateWebCache()
+		self.fg, self.objs = layouts.makeWebForm(10)
+		self.treeInterceptor = self.objs[0].treeInterceptor
+		self.originals = {name: VirtualBuffer.__dict__[name] for name in ("_handleUpdate", "_loadBufferDone")}
+		tracing.ENABLED = True
+		tracing.resetStats()
+
+	def tearDown(self):
+		tracing.ENABLED = False
+		laf.removeWebCacheHooks()
+		for name, original in self.originals.items():
+			setattr(VirtualBuffer, name, original)
+
+	def getCount(self, name):
+		return tracing.getStats()["counters"].get(name, 0)
+
+	def testNotInstalled(self):
+		# importing the package changes nothing
+		self.assertIs(VirtualBuffer._handleUpdate, self.originals["_handleUpdate"])
+		laf.getLabel(self.objs[0])
+		self.treeInterceptor._handleUpdate()
+		laf.getLabel(self.objs[0])
+		self.assertEqual(self.getCount("webCache.updates"), 0)
+
+	def testInstalled(self):
+		laf.installWebCacheHooks()
+		laf.getLabel(self.objs[0])
+		self.treeInterceptor._handleUpdate()
+		laf.getLabel(self.objs[0])
+		self.assertEqual(self.getCount("webCache.updates"), 1)
+		self.treeInterceptor._loadBufferDone()
+		laf.getLabel(self.objs[0])
+		self.assertEqual(self.getCount("webCache.misses"), 2)
+		laf.removeWebCacheHooks()
+		self.assertIs(VirtualBuffer._handleUpdate, self.originals["_handleUpdate"])
+		self.assertIs(VirtualBuffer._loadBufferDone, self.originals["_loadBufferDone"])
+
+	def testWrappedByOther(self):
+		laf.installWebCacheHooks()
+		# another add-on wraps the hooked method
+		wrapped = VirtualBuffer._handleUpdate
+		updates = []
+		def other(self):
+			updates.append(self)
+			return wrapped(self)
+		VirtualBuffer._handleUpdate = other
+		laf.removeWebCacheHooks()
+		# its wrapper is kept, ours is disabled inside it
+		self.assertIs(VirtualBuffer._handleUpdate, other)
+		self.assertIs(VirtualBuffer._loadBufferDone, self.originals["_loadBufferDone"])
+		laf.getLabel(self.objs[0])
+		self.treeInterceptor._handleUpdate()
+		laf.getLabel(self.objs[0])
+		self.assertEqual(updates, [self.treeInterceptor])
+		self.assertEqual(self.getCount("webCache.updates"), 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: UTF-8 -*-
+# LabelAutofinder module
+# Copyright (C) 2025 Alberto Buffolino
+# Released under GPL 2
+
+# timing of pipeline stages and counters of work done,
+# to find which stage is slow in a given program;
+# when disabled, span and count do nothing
+import threading
+import time
+
+from logHandler import log
+
+
+# to enable tracing
+ENABLED = False
+
+# stage name -> [calls, total seconds, max seconds]
+spans = {}
+# counter name -> value
+counters = {}
+lock = threading.Lock()
+
+
+# shared span for disabled tracing, that records nothing
+class NullSpan:
+
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *excInfo):
+		return False
+
+nullSpan = NullSpan()
+
+
+class Span:
+
+	__slots__ = ("name", "start")
+
+	def __init__(self, name):
+		self.name = name
+		self.start = None
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *excInfo):
+		elapsed = time.perf_counter()-self.start
+		with lock:
+			record = spans.get(self.name)
+			if record is None:
+				spans[self.name] = [1, elapsed, elapsed]
+			else:
+				record[0] += 1
+				record[1] += elapsed
+				if elapsed > record[2]:
+					record[2] = elapsed
+		return False
+
+
+def span(name):
+	# to use as: with span("stage"): ...
+	if not ENABLED:
+		return nullSpan
+	return Span(name)
+
+def count(name, n=1):
+	if not ENABLED:
+		return
+	with lock:
+		counters[name] = counters.get(name, 0)+n
+
+def getStats():
+	# returns {"spans": {name: {calls, total, mean, max}}, "counters": {name: value}},
+	# with times in seconds
+	with lock:
+		spanStats = {
+			name: {"calls": calls, "total": total, "mean": total/calls, "max": maxTime}
+			for name, (calls, total, maxTime) in spans.items()
+		}
+		return {"spans": spanStats, "counters": dict(counters)}
+
+def resetStats():
+	with lock:
+		spans.clear()
+		counters.clear()
+
+def dumpStats(toLog=True):
+	# aggregate report, slowest stages first;
+	# written to NVDA log too, unless toLog is False
+	stats = getStats()
+	lines = ["LabelAutofinder stats:"]
+	for name, spanStats in sorted(stats["spans"].items(), key=lambda i: -i[1]["total"]):
+		lines.append("%s: %d calls, total %.3f ms, mean %.3f ms, max %.3f ms"%(
+			name, spanStats["calls"], spanStats["total"]*1000, spanStats["mean"]*1000, spanStats["max"]*1000
+		))
+	for name, value in sorted(stats["counters"].items()):
+		lines.append("%s: %d"%(name, value))
+	report = "\n".join(lines)
+	if toLog:
+		log.info(report)
+	return report
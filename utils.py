@@ -3,27 +3,51 @@
 # Copyright (C) 2025 Alberto Buffolino
 # Released under GPL 2
 
+import api
+import threading
 import time
 
 from contextlib import contextmanager
 from ctypes import windll
 from logHandler import log
 
+from .tracing import span
+
 
 # to enable debug
 DEBUG = False
 
-# for logging
-def debugLog(message):
+# for logging; message is formatted with args
+# only when DEBUG is enabled, so pass them apart, e.g.
+# debugLog("Label: %s", label)
+def debugLog(message, *args):
 	if DEBUG:
-		log.info(message)
+		log.info(message%args if args else message)
+
+# objs of current thread, for worker threads (see prefetch and asyncLabel):
+# COM objs of NVDA main thread can't be used there
+threadObjs = threading.local()
+
+def getForegroundObject():
+	# foreground obj created in current worker thread, if any, NVDA one otherwise
+	return getattr(threadObjs, "foreground", None) or api.getForegroundObject()
+
+def setThreadForeground(fg):
+	# fg: foreground obj created in current worker thread, or None when done
+	threadObjs.foreground = fg
+
+def isMainThread():
+	# whether COM objs are of NVDA main thread (STA), or of workers (MTA)
+	return threading.current_thread() is threading.main_thread()
 
-# for testing performances
+# for testing performances;
+# see also tracing module, to collect timings instead of logging them
 @contextmanager
 def measureTime(label):
 	start = time.time()
 	try:
-		yield
+		with span(label):
+			yield
 	finally:
 		end = time.time()
 		log.info("%s: %.3f s"%(label, end-start))